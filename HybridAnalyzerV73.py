@@ -4,11 +4,120 @@ import numpy as np
 import math
 import sys
 import os
+from bisect import bisect_left, bisect_right
+
+# =============================================================================
+# ORDINEA LINIILOR ÎN LADDER (ORICE LUNGIME)
+# =============================================================================
+
+BASE_LADDER_SIZE = 7  # m3..p3: pragurile de numărare sunt calibrate pe 7 linii
+
+def ladder_order(keys):
+    """
+    Ordinea liniilor unui ladder de orice lungime: m<k> descrescător, close, p<k> crescător
+    (la 7 linii: m3, m2, m1, close, p1, p2, p3).
+    """
+    minus, plus = [], []
+    has_close = False
+    for key in keys:
+        key = key.lower()
+        if key == 'close':
+            has_close = True
+        elif key[:1] in ('m', 'p') and key[1:].isdigit() and int(key[1:]) > 0:
+            (minus if key[0] == 'm' else plus).append(int(key[1:]))
+        else:
+            raise ValueError(f"Cheie de linie necunoscută: {key}")
+    if not has_close:
+        raise ValueError("Ladder-ul nu are linia 'close'")
+    if not minus and not plus:
+        raise ValueError("Ladder-ul trebuie să aibă cel puțin o linie alternativă pe lângă 'close'")
+    return [f'm{k}' for k in sorted(minus, reverse=True)] + ['close'] + [f'p{k}' for k in sorted(plus)]
+
+def ladder_line_names(n_per_side):
+    """Cheile unui ladder simetric cu n_per_side linii alternative de fiecare parte."""
+    return [f'm{k}' for k in range(n_per_side, 0, -1)] + ['close'] + [f'p{k}' for k in range(1, n_per_side + 1)]
+
+def ladder_thresholds(n_lines, ecc_threshold):
+    """
+    Pragurile de numărare scalate cu lungimea ladder-ului: ceil(prag · n / 7) pentru linii,
+    ceil(prag · (n-1) / 6) pentru liniile alternative; pragul de entropie crește cu log2(n).
+    """
+    n_alt = max(1, n_lines - 1)
+    base_alt = BASE_LADDER_SIZE - 1
+    return {
+        'steam_min_lines': math.ceil(3 * n_lines / BASE_LADDER_SIZE),
+        'steam_exceptional_lines': math.ceil(5 * n_lines / BASE_LADDER_SIZE),
+        'severe_trap_count': math.ceil(3 * n_alt / base_alt),
+        'aggressive_trap_count': math.ceil(2 * n_alt / base_alt),
+        'ecc_threshold': ecc_threshold * math.log2(n_lines) / math.log2(BASE_LADDER_SIZE)
+    }
+
+# =============================================================================
+# REGISTRUL DE MARKET-URI (DIRECȚII + REGULI DE BUFFER PER MARKET)
+# =============================================================================
+
+# Tipuri de market: (chei direcții în ladder, nume direcții)
+MARKET_KINDS = {
+    'total': (('over', 'under'), ('OVER', 'UNDER')),
+    'handicap': (('home', 'away'), ('HOME', 'AWAY')),
+}
+
+class MarketSpec:
+    """Un market cu ladder: perechea de direcții, buffer-ul per direcție și regulile specifice."""
+    __slots__ = ('name', 'kind', 'dir_keys', 'dir_names', 'buffers', 'historic_penalty')
+
+    def __init__(self, name, kind, buffers, historic_penalty=False):
+        if kind not in MARKET_KINDS:
+            raise ValueError(f"Tip de market necunoscut: {kind}")
+        self.name = name.upper()
+        self.kind = kind
+        self.dir_keys, self.dir_names = MARKET_KINDS[kind]
+        self.buffers = dict(zip(self.dir_names, buffers))
+        # Penalizarea istorică V3.0.2 (mișcare ≥ 5 puncte, Triple-Check / Forced) - doar TOTAL
+        self.historic_penalty = historic_penalty
+
+    def opposite(self, direction):
+        """Direcția opusă (pentru inversarea KLD)."""
+        return self.dir_names[1] if direction == self.dir_names[0] else self.dir_names[0]
+
+    def buffer_reason(self, original_line, buffered_line, direction):
+        """Textul explicativ al buffer-ului aplicat pe direcția finală."""
+        buffer = self.buffers[direction]
+        if self.kind == 'total':
+            return f'Buffer V7.3: {original_line:.1f} → {buffered_line:.1f} ({direction}: L{buffer:+g})'
+        return f'Buffer V7.3: {original_line:.1f} → {buffered_line:.1f} (Handicap: +{buffer})'
+
+MARKET_REGISTRY = {}
+
+def register_market(name, kind, buffers, historic_penalty=False):
+    """Înregistrează un market (buffers = (buffer direcția 1, buffer direcția 2))."""
+    spec = MarketSpec(name, kind, buffers, historic_penalty)
+    MARKET_REGISTRY[spec.name] = spec
+    return spec
+
+def split_market_key(key):
+    """'TEAM_TOTAL_HOME_OVER' → ('TEAM_TOTAL_HOME', 'OVER') (numele market-ului poate conține '_')."""
+    market, direction = key.rsplit('_', 1)
+    return market, direction
+
+# Meciul întreg (buffer-ele V7.3 originale)
+register_market('TOTAL', 'total', (-5.0, 7.0), historic_penalty=True)
+register_market('HANDICAP', 'handicap', (2.5, 2.5))
+# Totaluri pe echipă și reprize: buffer-e scalate cu proporția de puncte (1/2 meci, 1/4 meci)
+register_market('TEAM_TOTAL_HOME', 'total', (-2.5, 3.5))
+register_market('TEAM_TOTAL_AWAY', 'total', (-2.5, 3.5))
+register_market('H1_TOTAL', 'total', (-2.5, 3.5))
+register_market('H1_HANDICAP', 'handicap', (1.5, 1.5))
+for _quarter in range(1, 5):
+    register_market(f'Q{_quarter}_TOTAL', 'total', (-1.5, 2.0))
+    register_market(f'Q{_quarter}_HANDICAP', 'handicap', (1.0, 1.0))
 
 # =============================================================================
 # CLASA PRINCIPALĂ DE ANALIZĂ HIBRIDĂ (V7.3 - VERIFICARE ISTORIC)
 # =============================================================================
 
+ANALYZER_VERSION = 'V7.3_HISTORIC_CHECK'  # câmpul 'Version' din datele salvate
+
 class HybridAnalyzerV73:
     """
     Analizator Hibrid Baschet V7.3 - VERIFICARE CONFLICT ISTORIC:
@@ -16,9 +125,14 @@ class HybridAnalyzerV73:
     2. ✅ Praguri KLD recalibrate (0.03 / 0.06)
     3. ✅ KLD bidimensional corect
     4. ✅ NOU: Verificare conflict între Steam și Mișcare Istorică
+    5. ✅ Ladder-e de orice lungime (praguri scalate; la 7 linii rezultate identice)
+    6. ✅ Market-uri suplimentare din MARKET_REGISTRY (totaluri pe echipă, repriză, sfert)
+    7. ✅ Calibrare opțională a încrederii (mapare izotonică din calibration.py -> probabilitate de câștig)
+    8. ✅ Percentile opționale ale caracteristicilor față de propria ligă (schițe KLL din league_sketches.py)
     """
     
-    def __init__(self, league, home_team, away_team, total_lines_data, handicap_lines_data):
+    def __init__(self, league, home_team, away_team, total_lines_data, handicap_lines_data, build_reasoning=True,
+                 markets=None, calibration=None, league_sketches=None):
         self.LEAGUE = league
         self.HOME_TEAM = home_team
         self.AWAY_TEAM = away_team
@@ -26,6 +140,17 @@ class HybridAnalyzerV73:
         self.TOTAL_LINES = {k.lower(): v for k, v in total_lines_data.items()}
         self.HANDICAP_LINES = {k.lower(): v for k, v in handicap_lines_data.items()}
         
+        # Toate market-urile analizate: TOTAL, HANDICAP + cele suplimentare ({nume: ladder})
+        self.MARKETS = {'TOTAL': self.TOTAL_LINES, 'HANDICAP': self.HANDICAP_LINES}
+        for name, lines_data in (markets or {}).items():
+            name = name.upper()
+            if name not in MARKET_REGISTRY:
+                raise ValueError(f"Market necunoscut: {name}")
+            if name in self.MARKETS:
+                raise ValueError(f"Market duplicat: {name}")
+            self.MARKETS[name] = {k.lower(): v for k, v in lines_data.items()}
+        self.MARKET_SPECS = {name: MARKET_REGISTRY[name] for name in self.MARKETS}
+        
         # Constante de Ponderare V3.0.2 (Păstrate)
         self.WEIGHT_CONSENSUS = 0.50
         self.WEIGHT_GRADIENT = 0.15
@@ -45,16 +170,35 @@ class HybridAnalyzerV73:
         self.KLD_THRESHOLD_SAFE = 0.03
         self.KLD_THRESHOLD_SHOCK = 0.06
         
-        # Buffer-uri (aplicate DUPĂ inversare KLD)
-        self.BUFFER_TOTAL_OVER = -5.0
-        self.BUFFER_TOTAL_UNDER = 7.0
-        self.BUFFER_HANDICAP = 2.5
+        # Buffer-uri (aplicate DUPĂ inversare KLD) - regulile per market sunt în MARKET_REGISTRY
+        self.BUFFER_TOTAL_OVER = MARKET_REGISTRY['TOTAL'].buffers['OVER']
+        self.BUFFER_TOTAL_UNDER = MARKET_REGISTRY['TOTAL'].buffers['UNDER']
+        self.BUFFER_HANDICAP = MARKET_REGISTRY['HANDICAP'].buffers['HOME']
         
         # ✅ NOU V7.3: Constante pentru Verificare Istoric
         self.THRESHOLD_HISTORIC_CONFLICT = 2.0 # Mișcare semnificativă (puncte)
         self.PENALTY_HISTORIC_CONFLICT = 30.0 # Penalizare pentru conflict
         self.CONSENSUS_OVERHEAT_THRESHOLD = 65.0 # Consensus supraîncălzit
         
+        # Praguri de detecție per linie (comune cu modul Live)
+        self.CONSENSUS_ODDS_THRESHOLD = 1.85
+        self.CONSENSUS_MOVE_THRESHOLD = 0.05
+        self.STEAM_THRESHOLD = 0.08
+        self.GRADIENT_ANOMALY_THRESHOLD = 0.15
+        self.TRAP_GAP_THRESHOLD = 0.20
+        self.ECC_THRESHOLD = 1.2
+        
+        # Mod sumar: fără texte explicative (reasoning/reason), doar valorile
+        self.build_reasoning = build_reasoning
+        
+        # Maparea încredere -> probabilitate (CalibrationMap), aplicată doar la raportare, nu la decizie
+        self.calibration = calibration
+        # Schițele de cuantile per ligă (LeagueSketches), pentru percentilele din raport
+        self.league_sketches = league_sketches
+        
+        # Structura ladder-elor (ordine, praguri scalate, index sortat pentru căutarea liniilor)
+        self.LADDERS = {market: self._build_ladder_config(lines_data) for market, lines_data in self.MARKETS.items()}
+        
         # Analize de precizie (V3.0.2)
         self.consensus_score = self._calculate_consensus_score()
         self.steam_detection = self._detect_steam_moves()
@@ -73,38 +217,68 @@ class HybridAnalyzerV73:
         
         self.decision = {}
     
+    def _build_ladder_config(self, lines_data):
+        """Ordinea liniilor, pragurile scalate cu lungimea ladder-ului și indexul sortat după valoarea liniei."""
+        order = ladder_order(lines_data.keys())
+        
+        # Index sortat după valoarea liniei; poziția = ordinea din dict (la egalitate câștigă prima)
+        positions = {key: i for i, key in enumerate(lines_data)}
+        indexed = sorted((lines_data[key]['line'], positions[key], key) for key in order)
+        
+        return {
+            'order': order,
+            'steam_keys': ['close'] + [k for k in order if k != 'close'],
+            'trap_keys': [k for k in order if k != 'close'],
+            **ladder_thresholds(len(order), self.ECC_THRESHOLD),
+            'line_values': [v for v, _, _ in indexed],
+            'line_positions': [p for _, p, _ in indexed],
+            'line_keys': [k for _, _, k in indexed]
+        }
+    
+    def _find_line_key(self, market, line_value, tolerance=0.1):
+        """Cheia liniei cu |linie - line_value| < tolerance (căutare binară; la egalitate, prima din ladder)."""
+        ladder = self.LADDERS[market]
+        values = ladder['line_values']
+        lo = bisect_left(values, line_value - 2 * tolerance)
+        hi = bisect_right(values, line_value + 2 * tolerance)
+        best = None
+        for j in range(lo, hi):
+            if abs(values[j] - line_value) < tolerance and (best is None or ladder['line_positions'][j] < ladder['line_positions'][best]):
+                best = j
+        return ladder['line_keys'][best] if best is not None else None
+    
+    def _index_trap_lines(self, flags):
+        """Liniile trap sortate per market_direcție (pentru verificarea prin căutare binară)."""
+        index = {}
+        for flag in flags:
+            index.setdefault(flag['type'][len('TRAP_LINE_'):], []).append(flag['line'])
+        return {key: sorted(lines) for key, lines in index.items()}
+    
     def _calculate_consensus_score(self):
         """Calculează scorul de consens pentru fiecare direcție."""
-        consensus = {'TOTAL': {'OVER': 0, 'UNDER': 0}, 'HANDICAP': {'HOME': 0, 'AWAY': 0}}
-        max_score = 7 * 5 
-        LINE_KEYS = ['close', 'm3', 'm2', 'm1', 'p1', 'p2', 'p3']
+        consensus = {market: {name: 0 for name in spec.dir_names} for market, spec in self.MARKET_SPECS.items()}
         
-        for market, lines_data in [('TOTAL', self.TOTAL_LINES), ('HANDICAP', self.HANDICAP_LINES)]:
-            if market == 'TOTAL':
-                dir_keys = ('over', 'under')
-            else:
-                dir_keys = ('home', 'away')
+        for market, lines_data in self.MARKETS.items():
+            dir_keys = self.MARKET_SPECS[market].dir_keys
+            dir_names = self.MARKET_SPECS[market].dir_names
                 
-            for line_key in LINE_KEYS:
+            for line_key in self.LADDERS[market]['steam_keys']:
                 line_data = lines_data[line_key]
                 score1, score2 = 0, 0
                 
-                if line_data[f'{dir_keys[0]}_close'] < 1.85: score1 += 3
-                if line_data[f'{dir_keys[1]}_close'] < 1.85: score2 += 3
+                if line_data[f'{dir_keys[0]}_close'] < self.CONSENSUS_ODDS_THRESHOLD: score1 += 3
+                if line_data[f'{dir_keys[1]}_close'] < self.CONSENSUS_ODDS_THRESHOLD: score2 += 3
                 
                 move1 = line_data[f'{dir_keys[0]}_open'] - line_data[f'{dir_keys[0]}_close']
                 move2 = line_data[f'{dir_keys[1]}_open'] - line_data[f'{dir_keys[1]}_close']
-                if move1 > 0.05: score1 += 2
-                if move2 > 0.05: score2 += 2
+                if move1 > self.CONSENSUS_MOVE_THRESHOLD: score1 += 2
+                if move2 > self.CONSENSUS_MOVE_THRESHOLD: score2 += 2
                 
-                if market == 'TOTAL':
-                    consensus['TOTAL']['OVER'] += score1
-                    consensus['TOTAL']['UNDER'] += score2
-                else:
-                    consensus['HANDICAP']['HOME'] += score1
-                    consensus['HANDICAP']['AWAY'] += score2
+                consensus[market][dir_names[0]] += score1
+                consensus[market][dir_names[1]] += score2
         
-        for market in ['TOTAL', 'HANDICAP']:
+        for market in consensus:
+            max_score = len(self.LADDERS[market]['order']) * 5
             for direction in consensus[market]:
                 consensus[market][direction] = (consensus[market][direction] / max_score) * 100
         
@@ -112,20 +286,16 @@ class HybridAnalyzerV73:
     
     def _detect_steam_moves(self):
         """Detectează mișcările Steam (sharp money)."""
-        steam = {'TOTAL': None, 'HANDICAP': None}
-        STEAM_THRESHOLD = 0.08
-        LINE_KEYS = ['close', 'm3', 'm2', 'm1', 'p1', 'p2', 'p3']
-
-        for market, lines_data in [('TOTAL', self.TOTAL_LINES), ('HANDICAP', self.HANDICAP_LINES)]:
-            if market == 'TOTAL':
-                dir_keys = ('over', 'under')
-                dir_names = ('OVER', 'UNDER')
-            else:
-                dir_keys = ('home', 'away')
-                dir_names = ('HOME', 'AWAY')
+        steam = {market: None for market in self.MARKETS}
+        STEAM_THRESHOLD = self.STEAM_THRESHOLD
+
+        for market, lines_data in self.MARKETS.items():
+            dir_keys = self.MARKET_SPECS[market].dir_keys
+            dir_names = self.MARKET_SPECS[market].dir_names
                 
             moves1, moves2 = [], []
-            for k in LINE_KEYS:
+            min_lines = self.LADDERS[market]['steam_min_lines']
+            for k in self.LADDERS[market]['steam_keys']:
                 d = lines_data[k]
                 move1 = d[f'{dir_keys[0]}_open'] - d[f'{dir_keys[0]}_close']
                 move2 = d[f'{dir_keys[1]}_open'] - d[f'{dir_keys[1]}_close']
@@ -133,14 +303,14 @@ class HybridAnalyzerV73:
                 if move1 > STEAM_THRESHOLD: moves1.append({'line': d['line'], 'move': move1})
                 if move2 > STEAM_THRESHOLD: moves2.append({'line': d['line'], 'move': move2})
             
-            if len(moves1) >= 3: 
+            if len(moves1) >= min_lines: 
                 steam[market] = {
                     'direction': dir_names[0], 
                     'strength': len(moves1), 
                     'avg_move': np.mean([m['move'] for m in moves1]), 
                     'lines_affected': moves1
                 }
-            elif len(moves2) >= 3: 
+            elif len(moves2) >= min_lines: 
                 steam[market] = {
                     'direction': dir_names[1], 
                     'strength': len(moves2), 
@@ -152,17 +322,13 @@ class HybridAnalyzerV73:
 
     def _analyze_line_gradient(self):
         """Analizează uniformitatea gradientului de cote."""
-        gradient = {'TOTAL': {'uniformity': 0, 'anomalies': []}, 'HANDICAP': {'uniformity': 0, 'anomalies': []}}
-        LINE_ORDER = ['m3', 'm2', 'm1', 'close', 'p1', 'p2', 'p3']
+        gradient = {market: {'uniformity': 0, 'anomalies': []} for market in self.MARKETS}
         
-        for market, lines_data in [('TOTAL', self.TOTAL_LINES), ('HANDICAP', self.HANDICAP_LINES)]:
-            if market == 'TOTAL':
-                dir_keys = ('over', 'under')
-                dir_names = ('OVER', 'UNDER')
-            else:
-                dir_keys = ('home', 'away')
-                dir_names = ('HOME', 'AWAY')
+        for market, lines_data in self.MARKETS.items():
+            dir_keys = self.MARKET_SPECS[market].dir_keys
+            dir_names = self.MARKET_SPECS[market].dir_names
                 
+            LINE_ORDER = self.LADDERS[market]['order']
             closes1 = [lines_data[k][f'{dir_keys[0]}_close'] for k in LINE_ORDER]
             closes2 = [lines_data[k][f'{dir_keys[1]}_close'] for k in LINE_ORDER]
             
@@ -172,14 +338,14 @@ class HybridAnalyzerV73:
             gradient[market]['uniformity'] = max(0, 100 - (std1 + std2) * 100)
             
             for i, diff in enumerate(diffs1):
-                if abs(diff) > 0.15: 
+                if abs(diff) > self.GRADIENT_ANOMALY_THRESHOLD: 
                     gradient[market]['anomalies'].append({
                         'type': dir_names[0], 
                         'between': f"{LINE_ORDER[i]} și {LINE_ORDER[i+1]}", 
                         'diff': diff
                     })
             for i, diff in enumerate(diffs2):
-                if abs(diff) > 0.15: 
+                if abs(diff) > self.GRADIENT_ANOMALY_THRESHOLD: 
                     gradient[market]['anomalies'].append({
                         'type': dir_names[1], 
                         'between': f"{LINE_ORDER[i]} și {LINE_ORDER[i+1]}", 
@@ -191,21 +357,16 @@ class HybridAnalyzerV73:
     def _detect_manipulation(self):
         """Detectează trap lines (manipulări de piață)."""
         flags = []
-        LINE_KEYS = ['m3', 'm2', 'm1', 'p1', 'p2', 'p3']
         
-        for market, lines_data in [('TOTAL', self.TOTAL_LINES), ('HANDICAP', self.HANDICAP_LINES)]:
+        for market, lines_data in self.MARKETS.items():
             close_data = lines_data['close']
-            if market == 'TOTAL':
-                dir_keys = ('over', 'under')
-                dir_names = ('TOTAL_OVER', 'TOTAL_UNDER')
-            else:
-                dir_keys = ('home', 'away')
-                dir_names = ('HANDICAP_HOME', 'HANDICAP_AWAY')
+            dir_keys = self.MARKET_SPECS[market].dir_keys
+            dir_names = tuple(f'{market}_{name}' for name in self.MARKET_SPECS[market].dir_names)
             
-            for line_key in LINE_KEYS:
+            for line_key in self.LADDERS[market]['trap_keys']:
                 line_data = lines_data[line_key]
                 
-                if line_data[f'{dir_keys[0]}_close'] < close_data[f'{dir_keys[0]}_close'] - 0.20:
+                if line_data[f'{dir_keys[0]}_close'] < close_data[f'{dir_keys[0]}_close'] - self.TRAP_GAP_THRESHOLD:
                     flags.append({
                         'type': f'TRAP_LINE_{dir_names[0]}', 
                         'line': line_data['line'], 
@@ -215,7 +376,7 @@ class HybridAnalyzerV73:
                         'move_open_close': round(line_data[f'{dir_keys[0]}_open'] - line_data[f'{dir_keys[0]}_close'], 3)
                     })
                 
-                if line_data[f'{dir_keys[1]}_close'] < close_data[f'{dir_keys[1]}_close'] - 0.20:
+                if line_data[f'{dir_keys[1]}_close'] < close_data[f'{dir_keys[1]}_close'] - self.TRAP_GAP_THRESHOLD:
                     flags.append({
                         'type': f'TRAP_LINE_{dir_names[1]}', 
                         'line': line_data['line'], 
@@ -225,6 +386,7 @@ class HybridAnalyzerV73:
                         'move_open_close': round(line_data[f'{dir_keys[1]}_open'] - line_data[f'{dir_keys[1]}_close'], 3)
                     })
         
+        self._trap_lines = self._index_trap_lines(flags)
         return flags
         
     def _calculate_shannon_entropy(self, probabilities):
@@ -239,22 +401,20 @@ class HybridAnalyzerV73:
 
     def _analyze_entropy(self):
         """Analizează entropia pentru a detecta concentrarea de probabilități."""
-        alerts = {'TOTAL': None, 'HANDICAP': None}
-        LINE_ORDER = ['m3', 'm2', 'm1', 'close', 'p1', 'p2', 'p3']
-        ECC_THRESHOLD = 1.2 
-        
-        for market, lines_data in [('TOTAL', self.TOTAL_LINES), ('HANDICAP', self.HANDICAP_LINES)]:
-            if market == 'TOTAL':
-                dir_keys = ('over', 'under')
-                dir_names = ('OVER', 'UNDER')
-            else:
-                dir_keys = ('home', 'away')
-                dir_names = ('HOME', 'AWAY')
+        alerts = {market: None for market in self.MARKETS}
+        self.entropy_values = {}
+        
+        for market, lines_data in self.MARKETS.items():
+            dir_keys = self.MARKET_SPECS[market].dir_keys
+            dir_names = self.MARKET_SPECS[market].dir_names
+            LINE_ORDER = self.LADDERS[market]['order']
+            ECC_THRESHOLD = self.LADDERS[market]['ecc_threshold']
 
             probs1 = [1.0 / lines_data[k][f'{dir_keys[0]}_close'] for k in LINE_ORDER]
             probs2 = [1.0 / lines_data[k][f'{dir_keys[1]}_close'] for k in LINE_ORDER]
             entropy1 = self._calculate_shannon_entropy(probs1)
             entropy2 = self._calculate_shannon_entropy(probs2)
+            self.entropy_values[market] = (entropy1, entropy2)
             
             if self.consensus_score[market][dir_names[0]] > self.consensus_score[market][dir_names[1]] and entropy1 < ECC_THRESHOLD:
                 alerts[market] = {'direction': dir_names[0], 'entropy': entropy1}
@@ -269,8 +429,9 @@ class HybridAnalyzerV73:
         """
         historic = {}
         
-        for market, lines_data in [('TOTAL', self.TOTAL_LINES), ('HANDICAP', self.HANDICAP_LINES)]:
+        for market, lines_data in self.MARKETS.items():
             close_data = lines_data['close']
+            dir_names = self.MARKET_SPECS[market].dir_names
             
             # Extrage linia istorică (open_line_value)
             open_line = close_data.get('open_line_value')
@@ -282,11 +443,11 @@ class HybridAnalyzerV73:
                 
                 # Determină direcția dominantă istorică
                 if movement > self.THRESHOLD_HISTORIC_CONFLICT:
-                    # Linia a urcat → Banii inițiali pe UNDER
-                    dominant_direction = 'UNDER' if market == 'TOTAL' else 'AWAY'
+                    # Linia a urcat → Banii inițiali pe UNDER / AWAY
+                    dominant_direction = dir_names[1]
                 elif movement < -self.THRESHOLD_HISTORIC_CONFLICT:
-                    # Linia a coborât → Banii inițiali pe OVER
-                    dominant_direction = 'OVER' if market == 'TOTAL' else 'HOME'
+                    # Linia a coborât → Banii inițiali pe OVER / HOME
+                    dominant_direction = dir_names[0]
                 else:
                     dominant_direction = None # Mișcare neutră
                 
@@ -323,10 +484,10 @@ class HybridAnalyzerV73:
         steam_strength = steam_data['strength'] if has_steam_on_trap else 0
         
         historic_move = 0.0
-        if market == 'TOTAL':
+        if self.MARKET_SPECS[market].historic_penalty:
             try:
-                open_line = self.TOTAL_LINES['close'].get('open_line_value')
-                close_line = self.TOTAL_LINES['close']['line']
+                open_line = self.MARKETS[market]['close'].get('open_line_value')
+                close_line = self.MARKETS[market]['close']['line']
                 if open_line is not None:
                     historic_move = abs(open_line - close_line)
             except:
@@ -341,12 +502,13 @@ class HybridAnalyzerV73:
         if consensus_score > 65: contrarion_score += 30
         elif consensus_score > 55: contrarion_score += 15
         
+        ladder = self.LADDERS[market]
         if has_steam_on_trap:
             contrarion_score += 25
-            if steam_strength >= 5: contrarion_score += 10
+            if steam_strength >= ladder['steam_exceptional_lines']: contrarion_score += 10
         
         if gradient_uniformity > 70: contrarion_score += 15
-        if aggressive_traps >= 2: contrarion_score += 10
+        if aggressive_traps >= ladder['aggressive_trap_count']: contrarion_score += 10
         if historic_move < 3.0: contrarion_score += 10
         
         if consensus_score < 40: real_trap_score += 30
@@ -354,7 +516,7 @@ class HybridAnalyzerV73:
         if steam_data and steam_data['direction'] != direction: real_trap_score += 15
         if gradient_uniformity < 50: real_trap_score += 20
         if entropy_alert and entropy_alert['direction'] == direction: real_trap_score += 15
-        if severe_traps >= 3: real_trap_score += 20
+        if severe_traps >= ladder['severe_trap_count']: real_trap_score += 20
         if historic_move > 5.0: real_trap_score += 15
         
         if contrarion_score > real_trap_score + 20:
@@ -364,7 +526,7 @@ class HybridAnalyzerV73:
             reasoning = self._build_contrarion_reasoning(
                 consensus_score, steam_strength, gradient_uniformity, 
                 aggressive_traps, historic_move
-            )
+            ) if self.build_reasoning else ''
         elif real_trap_score > contrarion_score + 20:
             trap_type = 'REAL'
             confidence = min(100, (real_trap_score / 100) * 100)
@@ -372,12 +534,12 @@ class HybridAnalyzerV73:
             reasoning = self._build_real_trap_reasoning(
                 consensus_score, has_steam_on_trap, gradient_uniformity,
                 severe_traps, entropy_alert, historic_move
-            )
+            ) if self.build_reasoning else ''
         else:
             trap_type = 'AMBIGUOUS'
             confidence = 50
             action = 'CAUTION'
-            reasoning = f"Semnale mixte: Contrarion={contrarion_score}, Real={real_trap_score}. Prudență."
+            reasoning = f"Semnale mixte: Contrarion={contrarion_score}, Real={real_trap_score}. Prudență." if self.build_reasoning else ''
         
         return {
             'type': trap_type,
@@ -422,29 +584,42 @@ class HybridAnalyzerV73:
             reasons.append(f"✗ Linie instabilă istoric ({historic:.1f}pt) = risc major")
         return " | ".join(reasons)
 
+    def _trap_flags(self, market, direction):
+        """Trap-urile unui market_direcție, în ordinea ladder-ului."""
+        return [f for f in self.manipulation_flags if f.get('type', '') == f'TRAP_LINE_{market}_{direction}']
+
     def _calculate_score_components(self):
         """
         Calculează componentele scorului pentru fiecare direcție (V7.3 logic cu Verificare Istoric).
         """
         scores = {}
+        for market in self.MARKET_SPECS:
+            scores.update(self._market_score_components(market))
+        return scores
+
+    def _market_score_components(self, market):
+        """Componentele scorului pentru direcțiile unui market (depind doar de etapele acelui market)."""
+        scores = {}
+        spec = self.MARKET_SPECS[market]
+        
+        # Penalizarea istorică V3.0.2, pe market-urile care o au în registru (TOTAL)
         historic_penalty_applied = 0
         historic_move_diff = 0.0
         is_historic_risk = False
-        is_historic_aligned_with_direction = False
+        if spec.historic_penalty:
+            try:
+                open_line = self.MARKETS[market]['close'].get('open_line_value') 
+                close_line = self.MARKETS[market]['close']['line']
+                if open_line is not None:
+                    historic_move_diff = close_line - open_line
+                    if abs(historic_move_diff) >= self.THRESHOLD_HISTORIC_MOVE:
+                        historic_penalty_applied = self.PENALTY_HISTORIC_MOVE
+                        is_historic_risk = True
+            except (KeyError, TypeError, ValueError):
+                pass 
         
-        try:
-            open_line = self.TOTAL_LINES['close'].get('open_line_value') 
-            close_line = self.TOTAL_LINES['close']['line']
-            if open_line is not None:
-                historic_move_diff = close_line - open_line
-                if abs(historic_move_diff) >= self.THRESHOLD_HISTORIC_MOVE:
-                    historic_penalty_applied = self.PENALTY_HISTORIC_MOVE
-                    is_historic_risk = True
-        except (KeyError, TypeError, ValueError):
-            pass 
-        
-        for market_dir in ['TOTAL_OVER', 'TOTAL_UNDER', 'HANDICAP_HOME', 'HANDICAP_AWAY']:
-            market, direction = market_dir.split('_')
+        for direction in spec.dir_names:
+            market_dir = f'{market}_{direction}'
             cons_score = self.consensus_score[market][direction]
             uniformity = self.gradient_analysis[market]['uniformity']
             cons_points = cons_score * self.WEIGHT_CONSENSUS
@@ -458,7 +633,7 @@ class HybridAnalyzerV73:
             
             trap_penalty = 0
             contrarion_bonus = 0
-            trap_flags = [f for f in self.manipulation_flags if direction in f.get('type', '')] 
+            trap_flags = self._trap_flags(market, direction)
             trap_analysis = {
                 'flags': trap_flags, 
                 'points': 0, 
@@ -510,12 +685,12 @@ class HybridAnalyzerV73:
                     is_historic_conflict = True
                     historic_conflict_penalty = self.PENALTY_HISTORIC_CONFLICT
 
-            if market == 'TOTAL':
+            if spec.historic_penalty:
                 current_historic_penalty = historic_penalty_applied
                 
                 is_historic_aligned_with_direction = \
-                    (historic_move_diff > 0 and direction == 'OVER') or \
-                    (historic_move_diff < 0 and direction == 'UNDER')
+                    (historic_move_diff > 0 and direction == spec.dir_names[0]) or \
+                    (historic_move_diff < 0 and direction == spec.dir_names[1])
                 
                 if contrarion_bonus > 0 and is_historic_risk and is_historic_aligned_with_direction and is_steam:
                     if uniformity >= self.GRADIENT_CONFLUENCE_THRESHOLD:
@@ -543,9 +718,9 @@ class HybridAnalyzerV73:
                     'Confluence_Bonus': {'is_active': (confluence_bonus > 0), 'points': confluence_bonus}, 
                     'Entropy_Alert': {'is_active': (entropy_penalty > 0), 'points': entropy_penalty},
                     'Historic_Penalty': {
-                        'is_active': is_historic_risk and market == 'TOTAL', 
+                        'is_active': is_historic_risk and spec.historic_penalty, 
                         'points': current_historic_penalty, 
-                        'diff': abs(historic_move_diff) if market == 'TOTAL' else 0.0
+                        'diff': abs(historic_move_diff) if spec.historic_penalty else 0.0
                     },
                     'Historic_Conflict': {
                         'is_active': is_historic_conflict,
@@ -571,13 +746,9 @@ class HybridAnalyzerV73:
         """
         kld_scores = {}
         
-        for market, lines_data in [('TOTAL', self.TOTAL_LINES), ('HANDICAP', self.HANDICAP_LINES)]:
-            if market == 'TOTAL':
-                dir_keys = ('over', 'under')
-                dir_names = ('OVER', 'UNDER')
-            else:
-                dir_keys = ('home', 'away')
-                dir_names = ('HOME', 'AWAY')
+        for market, lines_data in self.MARKETS.items():
+            dir_keys = self.MARKET_SPECS[market].dir_keys
+            dir_names = self.MARKET_SPECS[market].dir_names
             
             close_data = lines_data['close']
             
@@ -617,7 +788,7 @@ class HybridAnalyzerV73:
         Aplică Filtrele KLD Tri-Zone cu Override Logic îmbunătățit (V7.3).
         """
         
-        market, direction = market_key.split('_')
+        market, direction = split_market_key(market_key)
         v3_score = self.confidence_matrix.get(market_key, 0)
         
         if v3_score < 50:
@@ -638,7 +809,7 @@ class HybridAnalyzerV73:
             gradient = self.gradient_analysis[market]['uniformity']
             consensus = self.consensus_score[market][direction]
             
-            steam_exceptional = (steam and steam['direction'] == direction and steam['strength'] >= 5)
+            steam_exceptional = bool(steam and steam['direction'] == direction and steam['strength'] >= self.LADDERS[market]['steam_exceptional_lines'])
             gradient_exceptional = (gradient > 95)
             consensus_safe = (consensus < self.CONSENSUS_OVERHEAT_THRESHOLD)
             historic_aligned = False
@@ -652,20 +823,20 @@ class HybridAnalyzerV73:
             confluence_count = sum(confluence_checks)
             
             if confluence_count >= 3: # 3 din 4 criterii
-                return 'KEEP_V3_OVERRIDE', f'Confluence {confluence_count}/4: Steam={steam_exceptional}, Gradient={gradient_exceptional}, Consensus Safe={consensus_safe}, Historic Aligned={historic_aligned}'
+                return 'KEEP_V3_OVERRIDE', f'Confluence {confluence_count}/4: Steam={steam_exceptional}, Gradient={gradient_exceptional}, Consensus Safe={consensus_safe}, Historic Aligned={historic_aligned}' if self.build_reasoning else ''
         
         # NIVEL 2: Evaluare KLD
         kld_data = self._kld_scores.get(market, {})
         kld_score = abs(kld_data.get(direction, 0.0))
         
         if kld_score <= self.KLD_THRESHOLD_SAFE:
-            return 'KEEP_V3', f'KLD sigur ({kld_score:.4f})'
+            return 'KEEP_V3', f'KLD sigur ({kld_score:.4f})' if self.build_reasoning else ''
         
         elif self.KLD_THRESHOLD_SAFE < kld_score < self.KLD_THRESHOLD_SHOCK:
-            return 'SKIP_KLD_MEDIUM_RISK', f'KLD zona neutră ({kld_score:.4f})'
+            return 'SKIP_KLD_MEDIUM_RISK', f'KLD zona neutră ({kld_score:.4f})' if self.build_reasoning else ''
         
         elif kld_score >= self.KLD_THRESHOLD_SHOCK:
-            return 'INVERT_V3', f'KLD șoc ({kld_score:.4f})'
+            return 'INVERT_V3', f'KLD șoc ({kld_score:.4f})' if self.build_reasoning else ''
             
         return 'SKIP_DEFAULT', 'Nicio condiție îndeplinită'
 
@@ -674,24 +845,18 @@ class HybridAnalyzerV73:
         Selectează linia finală și aplică Buffer-ul CORECT (după inversare KLD).
         """
         
+        spec = self.MARKET_SPECS[market_type]
+        
         # 1. Determinare direcție finală (DUPĂ filtrare KLD)
         if v7_action == 'INVERT_V3':
-            if market_type == 'TOTAL':
-                final_direction = 'UNDER' if direction == 'OVER' else 'OVER'
-            else:
-                final_direction = 'AWAY' if direction == 'HOME' else 'HOME'
+            final_direction = spec.opposite(direction)
         else:
             final_direction = direction
 
         # 2. Selectare linie de bază (Steam sau Close)
-        if market_type == 'TOTAL':
-            lines_data = self.TOTAL_LINES
-            steam = self.steam_detection['TOTAL']
-            dir_key_lower = final_direction.lower() + '_close'
-        else:
-            lines_data = self.HANDICAP_LINES
-            steam = self.steam_detection['HANDICAP']
-            dir_key_lower = final_direction.lower() + '_close'
+        lines_data = self.MARKETS[market_type]
+        steam = self.steam_detection[market_type]
+        dir_key_lower = final_direction.lower() + '_close'
         
         original_line = lines_data['close']['line']
         cota = lines_data['close'][dir_key_lower]
@@ -700,45 +865,30 @@ class HybridAnalyzerV73:
         if steam and steam['direction'] == final_direction:
             best_steam_line = max(steam['lines_affected'], key=lambda x: x['move'])
             
-            for key, data in lines_data.items():
-                if abs(data['line'] - best_steam_line['line']) < 0.1:
-                    original_line = data['line']
-                    cota = data[dir_key_lower]
-                    source = f'Steam Line ({key.upper()})'
-                    break
-        
-        # 3. ✅ APLICARE BUFFER PE DIRECȚIA FINALĂ
-        if market_type == 'TOTAL':
-            if final_direction == 'OVER':
-                buffered_line = original_line + self.BUFFER_TOTAL_OVER
-                buffer_reason = f'Buffer V7.3: {original_line:.1f} → {buffered_line:.1f} (OVER: L-5)'
-            else:
-                buffered_line = original_line + self.BUFFER_TOTAL_UNDER
-                buffer_reason = f'Buffer V7.3: {original_line:.1f} → {buffered_line:.1f} (UNDER: L+7)'
+            key = self._find_line_key(market_type, best_steam_line['line'])
+            if key is not None:
+                data = lines_data[key]
+                original_line = data['line']
+                cota = data[dir_key_lower]
+                source = f'Steam Line ({key.upper()})'
         
-        else:
-            if original_line < 0:
-                buffered_line = original_line + self.BUFFER_HANDICAP
-            else:
-                buffered_line = original_line + self.BUFFER_HANDICAP
-            
-            buffer_reason = f'Buffer V7.3: {original_line:.1f} → {buffered_line:.1f} (Handicap: +{self.BUFFER_HANDICAP})'
+        # 3. ✅ APLICARE BUFFER PE DIRECȚIA FINALĂ (regula market-ului din registru)
+        buffer = spec.buffers[final_direction]
+        buffered_line = original_line + buffer
+        buffer_reason = spec.buffer_reason(original_line, buffered_line, final_direction) if self.build_reasoning else ''
 
         # 4. Verificare trap real pe linia finală
         trap_analysis = self._score_data.get(f'{market_type}_{final_direction}', {}).get('Components', {}).get('Trap_Analysis', {})
         classification = trap_analysis.get('classification')
         
         if classification and classification['type'] == 'REAL':
-            for flag in trap_analysis.get('flags', []):
-                if abs(flag.get('line', -999) - original_line) < 0.1:
-                    buffered_line = lines_data['close']['line']
-                    if market_type == 'TOTAL':
-                        buffered_line += self.BUFFER_TOTAL_OVER if final_direction == 'OVER' else self.BUFFER_TOTAL_UNDER
-                    else:
-                        buffered_line += self.BUFFER_HANDICAP
-                    
-                    buffer_reason = f'TRAP REAL detectat → Revenire la Close cu buffer'
-                    break
+            trap_lines = self._trap_lines.get(f'{market_type}_{final_direction}', [])
+            lo = bisect_left(trap_lines, original_line - 0.2)
+            hi = bisect_right(trap_lines, original_line + 0.2)
+            if any(abs(line - original_line) < 0.1 for line in trap_lines[lo:hi]):
+                buffered_line = lines_data['close']['line'] + buffer
+                
+                buffer_reason = f'TRAP REAL detectat → Revenire la Close cu buffer' if self.build_reasoning else ''
 
         return {
             'line': round(buffered_line, 1),
@@ -749,6 +899,42 @@ class HybridAnalyzerV73:
             'final_direction': final_direction
         }
 
+    def get_signals(self):
+        """
+        Returnează semnalele scalare ale analizei, cu chei plate ('TOTAL.kld_max', 'TOTAL_OVER.confidence').
+        Folosit de alerte și agregări, fără a reconstrui raportul complet.
+        """
+        signals = {}
+        for market, spec in self.MARKET_SPECS.items():
+            dir_names = spec.dir_names
+            steam = self.steam_detection[market]
+            historic = self.historic_analysis.get(market) or {}
+            kld = self._kld_scores[market]
+            dominant_historic = historic.get('dominant_direction') if historic.get('is_significant') else None
+
+            signals[f'{market}.kld_max'] = kld['max']
+            signals[f'{market}.kld_dominant_direction'] = kld['dominant_direction']
+            signals[f'{market}.steam_direction'] = steam['direction'] if steam else None
+            signals[f'{market}.steam_strength'] = steam['strength'] if steam else 0
+            signals[f'{market}.steam_avg_move'] = float(steam['avg_move']) if steam else 0.0
+            signals[f'{market}.gradient_uniformity'] = self.gradient_analysis[market]['uniformity']
+            signals[f'{market}.entropy_alert'] = self.entropy_alerts[market]['direction'] if self.entropy_alerts[market] else None
+            signals[f'{market}.entropy_min'] = min(self.entropy_values[market])
+            signals[f'{market}.historic_movement'] = historic.get('movement', 0.0)
+            signals[f'{market}.historic_dominant_direction'] = dominant_historic
+            # Conflict Steam vs Mișcare Istorică (tema V7.3)
+            signals[f'{market}.historic_conflict'] = bool(steam and dominant_historic and steam['direction'] != dominant_historic)
+
+            for direction in dir_names:
+                key = f'{market}_{direction}'
+                signals[f'{key}.confidence'] = self.confidence_matrix[key]
+                signals[f'{key}.consensus'] = self.consensus_score[market][direction]
+                signals[f'{key}.kld'] = abs(kld[direction])
+                signals[f'{key}.v7_action'] = self._determine_v7_3_action(key)[0]
+                signals[f'{key}.trap_count'] = sum(1 for f in self.manipulation_flags if f['type'] == f'TRAP_LINE_{key}')
+
+        return signals
+
     def _select_final_decision(self):
         """
         Alege decizia finală, filtrată de KLD V7.3 cu verificare istoric.
@@ -777,7 +963,7 @@ class HybridAnalyzerV73:
                 'key': best_key_v3, 
                 'confidence': max_confidence, 
                 'type': best_action,
-                'reason': f'Decizie Hibrid V7.3: {best_action} | {best_reason}'
+                'reason': f'Decizie Hibrid V7.3: {best_action} | {best_reason}' if self.build_reasoning else ''
             }
         
         max_confidence_all = max(self.confidence_matrix.values())
@@ -802,7 +988,7 @@ class HybridAnalyzerV73:
             }
             
         best_direction_key = final_decision['key']
-        market, direction = best_direction_key.split('_')
+        market, direction = split_market_key(best_direction_key)
         v7_action = final_decision['type']
         
         optimal_line = self._select_optimal_line_FIXED(market, direction, v7_action) 
@@ -833,10 +1019,31 @@ class HybridAnalyzerV73:
                 'score_data': self._score_data
             }
         }
+        if self.league_sketches is not None:
+            result['details']['league_percentiles'] = self.league_sketches.percentiles(self)
+        if self.calibration is not None:
+            result['calibrated_probability'] = self.calibration.probability(final_decision['confidence'], market)
         
         self._save_decision_data(market, direction, optimal_line, final_decision['type'], final_decision['confidence'])
         return result
 
+    def _market_signals(self):
+        """Regimul pieței per market, compact (direcție Steam, KLD maxim, tipurile de trap) - pentru agregate."""
+        signals = {}
+        for market, spec in self.MARKET_SPECS.items():
+            steam = self.steam_detection[market]
+            traps = []
+            for direction in spec.dir_names:
+                classification = self._score_data[f'{market}_{direction}']['Components']['Trap_Analysis']['classification']
+                if classification:
+                    traps.append(classification['type'].split(' ', 1)[0])
+            signals[market] = {
+                'steam': steam['direction'] if steam else None,
+                'kld': float(self._kld_scores[market]['max']),
+                'traps': traps,
+            }
+        return signals
+
     def _save_decision_data(self, market, direction_initial, optimal_line, decision_type, final_confidence):
         """Salvează datele de decizie în format structurat."""
         
@@ -847,7 +1054,7 @@ class HybridAnalyzerV73:
             'HomeTeam': self.HOME_TEAM,
             'AwayTeam': self.AWAY_TEAM,
             'Data_Analiza_Salvare': datetime.now(),
-            'Version': 'V7.3_HISTORIC_CHECK',
+            'Version': ANALYZER_VERSION,
             'Decision_Type': decision_type,
             'Decision_Market': market,
             'Decision_Direction_Initial_V3': direction_initial,
@@ -865,3 +1072,14 @@ class HybridAnalyzerV73:
             'All_Total_Lines': self.TOTAL_LINES,
             'All_Handicap_Lines': self.HANDICAP_LINES
         }
+        classification = self._score_data[f'{market}_{direction_initial}']['Components']['Trap_Analysis']['classification']
+        self.decision['Decision_Trap_Type'] = classification['type'].split(' ', 1)[0] if classification else 'NONE'
+        if self.calibration is not None:
+            self.decision['Decision_Probability_Calibrated'] = self.calibration.probability(final_confidence, market)
+        self.decision['Market_Signals'] = self._market_signals()
+        self.decision['Decision_Historic_Conflict'] = bool(
+            self._score_data[f'{market}_{direction_initial}']['Components']['Historic_Conflict']['is_active'])
+        extra_markets = {market: lines_data for market, lines_data in self.MARKETS.items()
+                         if market not in ('TOTAL', 'HANDICAP')}
+        if extra_markets:
+            self.decision['All_Market_Lines'] = extra_markets
@@ -0,0 +1,396 @@
+import bisect
+import json
+import queue
+import re
+import threading
+import time
+import urllib.request
+from collections import deque
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+
+# =============================================================================
+# ALERTE PE PRAG PENTRU IEȘIRILE ANALIZORULUI (INDEX DE REGULI COMPILAT)
+# =============================================================================
+
+NUMERIC_OPS = ('>=', '>', '<=', '<')
+CROSS_OPS = ('crosses_above', 'crosses_below')
+ALL_OPS = NUMERIC_OPS + ('==', '!=') + CROSS_OPS
+
+_CONDITION_RE = re.compile(r'^\s*([A-Z][A-Z0-9_]*(?:\.[a-z_0-9]+))\s*(>=|<=|==|!=|>|<|crosses_above|crosses_below)\s*(\S+)\s*$')
+
+
+class Condition:
+    """O condiție pe un semnal din HybridAnalyzerV73.get_signals()."""
+
+    __slots__ = ('metric', 'op', 'value')
+
+    def __init__(self, metric, op, value):
+        if op not in ALL_OPS:
+            raise ValueError(f"Operator necunoscut: {op}")
+        self.metric = metric
+        self.op = op
+        self.value = value
+
+    def holds(self, current, previous=None):
+        if current is None and self.op not in ('==', '!='):
+            return False
+        if self.op == '>=': return current >= self.value
+        if self.op == '>': return current > self.value
+        if self.op == '<=': return current <= self.value
+        if self.op == '<': return current < self.value
+        if self.op == '==': return current == self.value
+        if self.op == '!=': return current != self.value
+        if previous is None:
+            return False
+        if self.op == 'crosses_above': return previous < self.value <= current
+        return previous > self.value >= current
+
+    def __repr__(self):
+        return f"{self.metric} {self.op} {self.value}"
+
+
+def _parse_value(text):
+    lowered = text.lower()
+    if lowered == 'true': return True
+    if lowered == 'false': return False
+    if lowered in ('none', 'null'): return None
+    try:
+        return float(text)
+    except ValueError:
+        return text.strip('\'"')
+
+
+def parse_conditions(expression):
+    """
+    Parsează o expresie de forma:
+      "TOTAL.kld_max >= KLD_THRESHOLD_SHOCK"
+      "TOTAL.steam_strength >= 5 and TOTAL.historic_conflict == true"
+      "TOTAL_OVER.confidence crosses_above 60"
+    Valorile simbolice (ex. KLD_THRESHOLD_SHOCK) sunt rezolvate din constantele analizorului.
+    """
+    conditions = []
+    for part in re.split(r'\s+and\s+', expression.strip()):
+        match = _CONDITION_RE.match(part)
+        if not match:
+            raise ValueError(f"Condiție invalidă: '{part}'")
+        metric, op, value = match.groups()
+        conditions.append(Condition(metric, op, _parse_value(value)))
+    return conditions
+
+
+@lru_cache(maxsize=1)
+def analyzer_constants():
+    """Constantele numerice ale HybridAnalyzerV73 (praguri, ponderi), citite o singură dată dintr-o instanță."""
+    from HybridAnalyzerV73 import HybridAnalyzerV73
+    from synthetic_ladders import generate_match
+    match = generate_match(np.random.default_rng(0), scenario='normal')
+    analyzer = HybridAnalyzerV73(match['league'], match['home_team'], match['away_team'],
+                                 match['total_lines'], match['handicap_lines'], build_reasoning=False)
+    return {name: float(value) for name, value in vars(analyzer).items()
+            if name.isupper() and isinstance(value, (int, float)) and not isinstance(value, bool)}
+
+
+class AlertRule:
+    """Regulă de alertă: toate condițiile trebuie îndeplinite (AND)."""
+
+    __slots__ = ('rule_id', 'name', 'conditions', 'severity')
+
+    def __init__(self, rule_id, name, conditions, severity='INFO'):
+        self.rule_id = rule_id
+        self.name = name
+        self.conditions = conditions
+        self.severity = severity
+
+    @property
+    def primary(self):
+        """Condiția folosită pentru indexare (prima pe prag numeric sau traversare)."""
+        for condition in self.conditions:
+            if condition.op in NUMERIC_OPS + CROSS_OPS and isinstance(condition.value, (int, float)):
+                return condition
+        return self.conditions[0]
+
+
+# -----------------------------------------------------------------------------
+# Destinații (sinks)
+# -----------------------------------------------------------------------------
+
+class FileSink:
+    """Scrie alertele în format JSON lines."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def deliver(self, alert):
+        with self._lock, open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(alert, default=str) + '\n')
+
+
+class CallbackSink:
+    """Trimite alertele către o funcție Python."""
+
+    def __init__(self, callback):
+        self.callback = callback
+
+    def deliver(self, alert):
+        self.callback(alert)
+
+
+class WebhookSink:
+    """POST JSON către un webhook; livrarea rulează într-un thread ca să nu blocheze evaluarea."""
+
+    def __init__(self, url, timeout=2.0, max_pending=10000):
+        self.url = url
+        self.timeout = timeout
+        self.delivered = 0
+        self.failed = 0
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._run, name='alert-webhook', daemon=True)
+        self._thread.start()
+
+    def deliver(self, alert):
+        try:
+            self._queue.put_nowait(alert)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        while True:
+            alert = self._queue.get()
+            if alert is None:
+                return
+            request = urllib.request.Request(
+                self.url, data=json.dumps(alert, default=str).encode('utf-8'),
+                headers={'Content-Type': 'application/json'}, method='POST'
+            )
+            try:
+                urllib.request.urlopen(request, timeout=self.timeout).close()
+                self.delivered += 1
+            except OSError:
+                self.failed += 1
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        self._queue.join()
+
+    def close(self):
+        self.flush()
+        self._queue.put(None)
+        self._thread.join()
+
+
+class LocalWebhookStub:
+    """Server HTTP local care doar memorează alertele primite (pentru teste fără rețea)."""
+
+    def __init__(self, host='127.0.0.1', port=0):
+        received = self.received = []
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                received.append(json.loads(self.rfile.read(length)))
+                self.send_response(204)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self.url = f"http://{host}:{self._server.server_address[1]}/alerts"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+# -----------------------------------------------------------------------------
+# Motorul de reguli
+# -----------------------------------------------------------------------------
+
+class AlertEngine:
+    """
+    Motor de alerte pe ieșirile analizorului:
+    1. ✅ Reguli înregistrate ca expresii (prag, egalitate, traversare de prag)
+    2. ✅ Index compilat per semnal: o analiză e verificată doar contra regulilor care pot potrivi
+    3. ✅ Alertă doar la tranziția inactiv → activ (fără spam la fiecare re-analiză)
+    4. ✅ Destinații configurabile (fișier, webhook, callback) și latență tick → alertă măsurată
+    """
+
+    LATENCY_WINDOW = 10000
+
+    def __init__(self, sinks=None, constants=None):
+        self.sinks = list(sinks or [])
+        self.constants = constants
+        self.rules = {}
+        self._next_id = 0
+        self._index = None
+        self._active = {}
+        self._previous = {}
+        self._cross_metrics = set()
+        self._latencies = deque(maxlen=self.LATENCY_WINDOW)
+        self.evaluations = 0
+        self.candidates_checked = 0
+        self.alerts_fired = 0
+
+    def add_rule(self, name, expression, severity='INFO'):
+        """
+        Înregistrează o regulă; `expression` e un string (vezi parse_conditions) sau o listă de Condition.
+        Pragurile simbolice sunt rezolvate aici - un nume de constantă necunoscut ridică ValueError.
+        """
+        conditions = parse_conditions(expression) if isinstance(expression, str) else list(expression)
+        self._resolve_constants(name, conditions)
+        rule = AlertRule(self._next_id, name, conditions, severity)
+        self.rules[rule.rule_id] = rule
+        self._next_id += 1
+        self._index = None
+        return rule.rule_id
+
+    def remove_rule(self, rule_id):
+        self.rules.pop(rule_id, None)
+        self._index = None
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+
+    def _resolve_constants(self, name, conditions):
+        """
+        Înlocuiește valorile simbolice (ex. KLD_THRESHOLD_SHOCK) cu constantele analizorului.
+        Pe praguri (>=, >, <=, <, traversări) valoarea trebuie să fie numerică; la ==/!= un text
+        care nu e constantă rămâne valoare de comparat (ex. TOTAL.steam_direction == OVER).
+        """
+        constants = self.constants if self.constants is not None else analyzer_constants()
+        for condition in conditions:
+            if not isinstance(condition.value, str):
+                continue
+            value = constants.get(condition.value)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                condition.value = float(value)
+            elif condition.op in NUMERIC_OPS + CROSS_OPS:
+                raise ValueError(f"Prag simbolic necunoscut în regula '{name}': {condition.value} "
+                                 f"(condiția '{condition}')")
+
+    def _compile(self):
+        """
+        Construiește indexul: per semnal, pragurile sortate pentru >=, >, <=, <, traversări,
+        și dicționare valoare → reguli pentru egalități.
+        """
+        index = {}
+        self._cross_metrics = set()
+        for rule in self.rules.values():
+            primary = rule.primary
+            entry = index.setdefault(primary.metric, {'ge': [], 'le': [], 'eq': {}, 'cross_up': [], 'cross_down': [], 'other': []})
+            if primary.op in ('>=', '>') and isinstance(primary.value, (int, float)):
+                entry['ge'].append((primary.value, rule.rule_id))
+            elif primary.op in ('<=', '<') and isinstance(primary.value, (int, float)):
+                entry['le'].append((primary.value, rule.rule_id))
+            elif primary.op == 'crosses_above':
+                entry['cross_up'].append((primary.value, rule.rule_id))
+            elif primary.op == 'crosses_below':
+                entry['cross_down'].append((primary.value, rule.rule_id))
+            elif primary.op == '==':
+                entry['eq'].setdefault(primary.value, []).append(rule.rule_id)
+            else:
+                entry['other'].append(rule.rule_id)
+            for condition in rule.conditions:
+                if condition.op in CROSS_OPS:
+                    self._cross_metrics.add(condition.metric)
+
+        for entry in index.values():
+            for kind in ('ge', 'le', 'cross_up', 'cross_down'):
+                entry[kind].sort()
+                entry[kind + '_keys'] = [t for t, _ in entry[kind]]
+        self._index = index
+
+    def _candidates(self, signals, previous):
+        """Regulile a căror condiție primară poate fi adevărată pentru aceste semnale."""
+        candidates = []
+        for metric, entry in self._index.items():
+            value = signals.get(metric)
+            if entry['eq']:
+                candidates.extend(entry['eq'].get(value, ()))
+            candidates.extend(entry['other'])
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            # Praguri <= valoare (pentru >=/>) și >= valoare (pentru <=/<)
+            hi = bisect.bisect_right(entry['ge_keys'], value)
+            candidates.extend(rule_id for _, rule_id in entry['ge'][:hi])
+            lo = bisect.bisect_left(entry['le_keys'], value)
+            candidates.extend(rule_id for _, rule_id in entry['le'][lo:])
+
+            prev = previous.get(metric) if previous else None
+            if isinstance(prev, (int, float)):
+                if prev < value:
+                    lo = bisect.bisect_right(entry['cross_up_keys'], prev)
+                    hi = bisect.bisect_right(entry['cross_up_keys'], value)
+                    candidates.extend(rule_id for _, rule_id in entry['cross_up'][lo:hi])
+                elif prev > value:
+                    lo = bisect.bisect_left(entry['cross_down_keys'], value)
+                    hi = bisect.bisect_left(entry['cross_down_keys'], prev)
+                    candidates.extend(rule_id for _, rule_id in entry['cross_down'][lo:hi])
+        return candidates
+
+    def evaluate(self, match_key, analyzer, tick_ts=None):
+        """Evaluează regulile pe analiza curentă a unui meci; returnează alertele emise."""
+        if self._index is None:
+            self._compile()
+        self.evaluations += 1
+
+        signals = analyzer.get_signals()
+        previous = self._previous.get(match_key)
+        if self._cross_metrics:
+            self._previous[match_key] = {m: signals.get(m) for m in self._cross_metrics}
+
+        matched = set()
+        for rule_id in set(self._candidates(signals, previous)):
+            self.candidates_checked += 1
+            rule = self.rules[rule_id]
+            if all(c.holds(signals.get(c.metric), previous.get(c.metric) if previous else None) for c in rule.conditions):
+                matched.add(rule_id)
+
+        fired = []
+        newly_active = matched - self._active.get(match_key, set())
+        self._active[match_key] = matched
+        now = time.time()
+        for rule_id in sorted(newly_active):
+            rule = self.rules[rule_id]
+            alert = {
+                'rule': rule.name,
+                'severity': rule.severity,
+                'match': match_key,
+                'conditions': [repr(c) for c in rule.conditions],
+                'signals': {c.metric: signals.get(c.metric) for c in rule.conditions},
+                'tick_ts': tick_ts,
+                'alert_ts': now,
+                'latency_ms': (now - tick_ts) * 1000.0 if tick_ts is not None else None
+            }
+            if tick_ts is not None:
+                self._latencies.append(alert['latency_ms'])
+            for sink in self.sinks:
+                sink.deliver(alert)
+            fired.append(alert)
+
+        self.alerts_fired += len(fired)
+        return fired
+
+    def forget(self, match_key):
+        """Șterge starea (reguli active, valori anterioare) a unui meci."""
+        self._active.pop(match_key, None)
+        self._previous.pop(match_key, None)
+
+    def latency_stats(self):
+        """Percentilele latenței tick → alertă (ms)."""
+        if not self._latencies:
+            return {'count': 0, 'p50_ms': None, 'p99_ms': None, 'max_ms': None}
+        latencies = np.array(self._latencies)
+        return {
+            'count': len(latencies),
+            'p50_ms': float(np.percentile(latencies, 50)),
+            'p99_ms': float(np.percentile(latencies, 99)),
+            'max_ms': float(latencies.max())
+        }
@@ -0,0 +1,500 @@
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+import numpy as np
+from batch_analyzer import BatchAnalyzerV73
+from compact_result import analyze_compact
+
+# =============================================================================
+# SERVICIU HTTP LOCAL DE ANALIZĂ (MICRO-BATCHING + METRICI)
+# =============================================================================
+
+# Limitele histogramei de mărime a batch-urilor, în stil Prometheus
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+LATENCY_WINDOW = 10000           # ultimele latențe păstrate per serie (percentile pe fereastră)
+MAX_BODY_BYTES = 32 * 1024 * 1024
+
+
+def _validate_match(match):
+    """Verificarea minimă a unui meci primit (restul erorilor de format ies din analizor ca ValueError/KeyError)."""
+    if not isinstance(match, dict):
+        raise ValueError("Meciul trebuie să fie un obiect JSON")
+    for key in ('total_lines', 'handicap_lines'):
+        if not isinstance(match.get(key), dict) or not match[key]:
+            raise ValueError(f"Lipsește ladder-ul '{key}'")
+    if match.get('markets') is not None and not isinstance(match['markets'], dict):
+        raise ValueError("'markets' trebuie să fie un obiect {market: ladder}")
+    return match
+
+
+def _market_signature(match):
+    return ('TOTAL', 'HANDICAP') + tuple(name.upper() for name in (match.get('markets') or {}))
+
+
+def _predict_one(match):
+    """Predicția de sumar a unui meci (fără 'details'); eroarea de intrare e întoarsă, nu aruncată."""
+    try:
+        _validate_match(match)
+        return analyze_compact(
+            match.get('league'), match.get('home_team'), match.get('away_team'),
+            match['total_lines'], match['handicap_lines'], summary_only=False, markets=match.get('markets')
+        ).to_dict(with_details=False)
+    except (AttributeError, KeyError, TypeError, ValueError) as exc:
+        return ValueError(f"Meci invalid: {exc!r}")
+
+
+def batch_backend(matches):
+    """
+    Backend vectorizat: un BatchAnalyzerV73 per grup de meciuri cu aceleași market-uri.
+    Un grup care nu se poate construi (un meci invalid) e reluat meci cu meci, ca eroarea să rămână izolată.
+    Returnează, în ordinea primită, dict-ul predicției sau excepția meciului.
+    """
+    results = [None] * len(matches)
+    groups = {}
+    for i, match in enumerate(matches):
+        try:
+            groups.setdefault(_market_signature(_validate_match(match)), []).append(i)
+        except (AttributeError, TypeError, ValueError) as exc:
+            results[i] = ValueError(f"Meci invalid: {exc!r}")
+
+    for rows in groups.values():
+        try:
+            batch = BatchAnalyzerV73.from_matches([matches[i] for i in rows])
+        except (AttributeError, KeyError, TypeError, ValueError) as exc:
+            if len(rows) == 1:
+                results[rows[0]] = ValueError(f"Meci invalid: {exc!r}")
+                continue
+            for i in rows:
+                results[i] = batch_backend([matches[i]])[0]
+            continue
+        for j, i in enumerate(rows):
+            results[i] = batch.prediction(j)
+    return results
+
+
+class PoolBackend:
+    """Backend pe procese: fiecare meci prin analizorul de referință (CompactPrediction), distribuit pe `workers`."""
+
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+
+    def __call__(self, matches):
+        chunksize = max(1, len(matches) // (4 * self.workers))
+        return list(self._executor.map(_predict_one, matches, chunksize=chunksize))
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+
+# -----------------------------------------------------------------------------
+# Metrici
+# -----------------------------------------------------------------------------
+
+class _LatencyWindow:
+    """Ultimele `capacity` valori (secunde) într-un buffer circular numpy + contor/sumă totale."""
+
+    __slots__ = ('values', 'capacity', 'count', 'total')
+
+    def __init__(self, capacity=LATENCY_WINDOW):
+        self.values = np.empty(capacity, dtype=np.float64)
+        self.capacity = capacity
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, seconds):
+        self.values[self.count % self.capacity] = seconds
+        self.count += 1
+        self.total += seconds
+
+    def summary(self):
+        window = self.values[:min(self.count, self.capacity)]
+        if not len(window):
+            return {'count': 0, 'mean_ms': 0.0, 'p50_ms': 0.0, 'p99_ms': 0.0, 'max_ms': 0.0}
+        p50, p99 = np.percentile(window, (50, 99))
+        return {
+            'count': self.count,
+            'mean_ms': self.total / self.count * 1e3,
+            'p50_ms': float(p50) * 1e3,
+            'p99_ms': float(p99) * 1e3,
+            'max_ms': float(window.max()) * 1e3,
+        }
+
+
+class ServiceMetrics:
+    """
+    Metricile serviciului:
+    1. ✅ Latența cererilor per endpoint (p50 / p99 / max pe ultimele LATENCY_WINDOW cereri)
+    2. ✅ Histograma mărimii batch-urilor (micro-batch-uri coalescate vs. cereri /predict/batch)
+    3. ✅ Așteptarea în coadă a micro-batch-urilor și timpul de execuție al batch-urilor la backend
+    4. ✅ Export ca dict (JSON) și în format text Prometheus
+    """
+
+    def __init__(self, buckets=BATCH_SIZE_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started_at = time.time()
+            self._latency = {}
+            self._batch_counts = {}
+            self._batch_sums = {}
+            self._queue_wait = _LatencyWindow()
+            self._batch_seconds = _LatencyWindow()
+            self._errors = {}
+
+    def observe_request(self, endpoint, seconds, error=False):
+        with self._lock:
+            self._latency.setdefault(endpoint, _LatencyWindow()).add(seconds)
+            if error:
+                self._errors[endpoint] = self._errors.get(endpoint, 0) + 1
+
+    def observe_batch(self, kind, size, seconds, queue_waits=()):
+        i = int(np.searchsorted(self.buckets, size))  # primul bucket cu limita >= size; len = +Inf
+        with self._lock:
+            counts = self._batch_counts.setdefault(kind, [0] * (len(self.buckets) + 1))
+            counts[i] += 1
+            self._batch_sums[kind] = self._batch_sums.get(kind, 0) + size
+            self._batch_seconds.add(seconds)
+            for wait in queue_waits:
+                self._queue_wait.add(wait)
+
+    def to_dict(self):
+        with self._lock:
+            batches = {}
+            for kind, counts in self._batch_counts.items():
+                cumulative, histogram = 0, {}
+                for bound, count in zip(self.buckets + (float('inf'),), counts):
+                    cumulative += count
+                    histogram['+Inf' if bound == float('inf') else str(bound)] = cumulative
+                batches[kind] = {
+                    'count': cumulative,
+                    'items': self._batch_sums[kind],
+                    'mean_size': self._batch_sums[kind] / cumulative if cumulative else 0.0,
+                    'size_buckets': histogram,
+                }
+            return {
+                'uptime_s': time.time() - self.started_at,
+                'requests': {endpoint: dict(window.summary(), errors=self._errors.get(endpoint, 0))
+                             for endpoint, window in self._latency.items()},
+                'batches': batches,
+                'queue_wait': self._queue_wait.summary(),
+                'batch_execution': self._batch_seconds.summary(),
+            }
+
+    def to_prometheus(self, prefix='hybrid_analyzer_service'):
+        data = self.to_dict()
+        lines = [
+            f"# HELP {prefix}_request_latency_ms Latența cererilor (percentile pe ultimele {LATENCY_WINDOW}).",
+            f"# TYPE {prefix}_request_latency_ms summary",
+        ]
+        for endpoint, stats in data['requests'].items():
+            for quantile, key in (('0.5', 'p50_ms'), ('0.99', 'p99_ms')):
+                lines.append(f'{prefix}_request_latency_ms{{endpoint="{endpoint}",quantile="{quantile}"}} {stats[key]!r}')
+            lines.append(f'{prefix}_request_latency_ms_count{{endpoint="{endpoint}"}} {stats["count"]}')
+        lines.append(f"# HELP {prefix}_request_errors_total Cereri respinse (intrare invalidă).")
+        lines.append(f"# TYPE {prefix}_request_errors_total counter")
+        for endpoint, stats in data['requests'].items():
+            lines.append(f'{prefix}_request_errors_total{{endpoint="{endpoint}"}} {stats["errors"]}')
+        lines.append(f"# HELP {prefix}_batch_size Mărimea batch-urilor trimise la backend.")
+        lines.append(f"# TYPE {prefix}_batch_size histogram")
+        for kind, stats in data['batches'].items():
+            for bound, count in stats['size_buckets'].items():
+                lines.append(f'{prefix}_batch_size_bucket{{kind="{kind}",le="{bound}"}} {count}')
+            lines.append(f'{prefix}_batch_size_sum{{kind="{kind}"}} {stats["items"]}')
+            lines.append(f'{prefix}_batch_size_count{{kind="{kind}"}} {stats["count"]}')
+        return '\n'.join(lines) + '\n'
+
+
+# -----------------------------------------------------------------------------
+# Micro-batching
+# -----------------------------------------------------------------------------
+
+class _Pending:
+    __slots__ = ('match', 'enqueued', 'done', 'result')
+
+    def __init__(self, match):
+        self.match = match
+        self.enqueued = time.perf_counter()
+        self.done = threading.Event()
+        self.result = None
+
+
+class MicroBatcher:
+    """
+    Coalescează cererile de un meci venite concurent:
+    1. ✅ Primul meci din coadă deschide o fereastră de `max_wait` secunde (0 = doar ce e deja în coadă)
+    2. ✅ Batch-ul pleacă la backend când fereastra expiră sau are `max_batch` meciuri
+    3. ✅ Fiecare apelant primește rezultatul propriului meci (eroarea unui meci nu afectează restul batch-ului)
+    """
+
+    def __init__(self, backend, max_batch=64, max_wait=0.002, metrics=None):
+        if max_batch < 1:
+            raise ValueError("max_batch trebuie să fie cel puțin 1")
+        if max_wait < 0:
+            raise ValueError("max_wait nu poate fi negativ")
+        self.backend = backend
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.metrics = metrics
+        self._queue = queue.Queue()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def submit(self, match, timeout=None):
+        """Pune meciul în coadă și așteaptă rezultatul (dict-ul predicției sau excepția meciului)."""
+        pending = _Pending(match)
+        self._queue.put(pending)
+        if not pending.done.wait(timeout):
+            raise TimeoutError("Predicția nu a fost gata în timpul alocat")
+        return pending.result
+
+    def _collect(self, first):
+        """Batch-ul care începe cu `first`; al doilea element = s-a cerut oprirea."""
+        batch = [first]
+        deadline = first.enqueued + self.max_wait
+        perf_counter = time.perf_counter
+        while len(batch) < self.max_batch:
+            remaining = deadline - perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch, stopping = self._collect(first)
+            self._execute(batch)
+
+    def _execute(self, batch):
+        started = time.perf_counter()
+        try:
+            results = self.backend([pending.match for pending in batch])
+        except Exception as exc:  # backend-ul nu trebuie să lase apelanții blocați
+            results = [exc] * len(batch)
+        if self.metrics is not None:
+            self.metrics.observe_batch('coalesced', len(batch), time.perf_counter() - started,
+                                       [started - pending.enqueued for pending in batch])
+        for pending, result in zip(batch, results):
+            pending.result = result
+            pending.done.set()
+
+
+# -----------------------------------------------------------------------------
+# Server HTTP
+# -----------------------------------------------------------------------------
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Tip ne-serializabil: {type(value).__name__}")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    service = None  # setat în subclasa creată de AnalysisService
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, content_type='application/json'):
+        if not isinstance(body, (bytes, str)):
+            body = json.dumps(body, ensure_ascii=False, default=_json_default)
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', f'{content_type}; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_BODY_BYTES:
+            raise OverflowError(f"Cererea depășește {MAX_BODY_BYTES} bytes")
+        return json.loads(self.rfile.read(length) or b'null')
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == '/health':
+            self._send(200, {'status': 'ok', 'backend': self.service.backend_name})
+        elif url.path == '/metrics':
+            if parse_qs(url.query).get('format') == ['prometheus']:
+                self._send(200, self.service.metrics.to_prometheus(), 'text/plain; version=0.0.4')
+            else:
+                self._send(200, self.service.metrics.to_dict())
+        else:
+            self._send(404, {'error': f'Endpoint necunoscut: {url.path}'})
+
+    def do_POST(self):
+        path = urlsplit(self.path).path
+        if path not in ('/predict', '/predict/batch'):
+            self._send(404, {'error': f'Endpoint necunoscut: {path}'})
+            return
+        started = time.perf_counter()
+        endpoint = path.strip('/').replace('/', '_')
+        try:
+            payload = self._read_json()
+        except OverflowError as exc:
+            self.close_connection = True
+            self._send(413, {'error': str(exc)})
+            self.service.metrics.observe_request(endpoint, time.perf_counter() - started, error=True)
+            return
+        except ValueError as exc:
+            self._send(400, {'error': f'JSON invalid: {exc}'})
+            self.service.metrics.observe_request(endpoint, time.perf_counter() - started, error=True)
+            return
+
+        if path == '/predict':
+            status, body = self._predict(payload)
+        else:
+            status, body = self._predict_batch(payload)
+        self._send(status, body)
+        self.service.metrics.observe_request(endpoint, time.perf_counter() - started, error=status != 200)
+
+    def _predict(self, match):
+        try:
+            result = self.service.batcher.submit(match, timeout=self.service.request_timeout)
+        except TimeoutError as exc:
+            # Worker-ul de batch nu a răspuns la timp: răspuns 504 (contorizat ca eroare în do_POST)
+            return 504, {'error': str(exc)}
+        if isinstance(result, ValueError):
+            return 400, {'error': str(result)}
+        if isinstance(result, Exception):
+            return 500, {'error': repr(result)}
+        return 200, result
+
+    def _predict_batch(self, payload):
+        matches = payload.get('matches') if isinstance(payload, dict) else payload
+        if not isinstance(matches, list):
+            return 400, {'error': "Se așteaptă o listă de meciuri (sau {'matches': [...]})"}
+        started = time.perf_counter()
+        results = self.service.backend(matches)
+        self.service.metrics.observe_batch('direct', len(matches), time.perf_counter() - started)
+        if any(isinstance(result, Exception) and not isinstance(result, ValueError) for result in results):
+            return 500, {'error': next(repr(r) for r in results if isinstance(r, Exception))}
+        # Meciurile invalide primesc {'error': ...} pe poziția lor; restul se întorc normal
+        return 200, {'predictions': [{'error': str(r)} if isinstance(r, ValueError) else r for r in results]}
+
+
+class AnalysisService:
+    """
+    Serviciu HTTP local (fără Streamlit) pentru generate_prediction:
+    1. ✅ POST /predict: un meci, coalescat cu cererile concurente în micro-batch-uri (MicroBatcher)
+    2. ✅ POST /predict/batch: o listă de meciuri, trimisă direct la backend ca un singur batch
+    3. ✅ Backend 'batch' (BatchAnalyzerV73, vectorizat) sau 'pool' (procese cu analizorul de referință)
+    4. ✅ GET /metrics: latențe p50 / p99, histograma mărimii batch-urilor (JSON sau ?format=prometheus)
+    Răspunsul = predicția de sumar (formatul generate_prediction fără 'details').
+    """
+
+    BACKENDS = ('batch', 'pool')
+
+    def __init__(self, host='127.0.0.1', port=0, backend='batch', max_batch=64, max_wait=0.002, workers=None,
+                 request_timeout=30.0):
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Backend necunoscut: {backend} (disponibile: {', '.join(self.BACKENDS)})")
+        self.host = host
+        self.port = port
+        self.backend_name = backend
+        self.workers = workers
+        self.request_timeout = request_timeout
+        self.metrics = ServiceMetrics()
+        self.backend = None
+        self.batcher = None
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        return f'http://{self.host}:{self.port}'
+
+    def start(self):
+        """Pornește backend-ul, micro-batcher-ul și serverul HTTP (pe un thread de fundal)."""
+        self.backend = PoolBackend(self.workers) if self.backend_name == 'pool' else batch_backend
+        self.batcher = MicroBatcher(self.backend, self.max_batch, self.max_wait, self.metrics).start()
+        handler = type('AnalysisHandler', (_Handler,), {'service': self})
+        self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name='analysis-http', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+        if self.batcher is not None:
+            self.batcher.stop()
+            self.batcher = None
+        if isinstance(self.backend, PoolBackend):
+            self.backend.close()
+        self.backend = None
+
+    def serve_forever(self):
+        """Blochează până la Ctrl+C (serviciul pornit cu start), apoi îl oprește."""
+        try:
+            self._thread.join()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serviciu HTTP local pentru HybridAnalyzerV73 (cu micro-batching).')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--backend', choices=AnalysisService.BACKENDS, default='batch')
+    parser.add_argument('--workers', type=int, help="Procese pentru backend-ul 'pool' (implicit nr. de CPU)")
+    parser.add_argument('--max-batch', type=int, default=64, help='Meciuri maxime per micro-batch')
+    parser.add_argument('--max-wait-ms', type=float, default=2.0, help='Fereastra de coalescare, în milisecunde')
+    args = parser.parse_args(argv)
+
+    service = AnalysisService(args.host, args.port, args.backend, args.max_batch, args.max_wait_ms / 1000.0,
+                              args.workers).start()
+    print(f"Serviciu pornit pe {service.url} (backend={args.backend}, "
+          f"max_batch={args.max_batch}, max_wait={args.max_wait_ms} ms)")
+    service.serve_forever()
+    return 0
+
+
+if __name__ == '__main__':
+    main()
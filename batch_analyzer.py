@@ -0,0 +1,429 @@
+import warnings
+import numpy as np
+from HybridAnalyzerV73 import MARKET_REGISTRY, ladder_order, ladder_thresholds
+from compact_result import LINE_ORDER, MARKETS, pack_markets
+
+# =============================================================================
+# ANALIZATOR VECTORIZAT (V7.3) - N MECIURI / VARIANTE ÎNTR-UN SINGUR BATCH NUMPY
+# =============================================================================
+
+DIRECTION_NAMES = (('OVER', 'UNDER'), ('HOME', 'AWAY'))
+DIRECTION_KEYS = ('TOTAL_OVER', 'TOTAL_UNDER', 'HANDICAP_HOME', 'HANDICAP_AWAY')
+CLOSE_INDEX = LINE_ORDER.index('close')  # pentru ladder-ul standard; per instanță: self.close_index
+
+# Coduri acțiune KLD (ordinea verificărilor din _determine_v7_3_action)
+ACTIONS = ('SKIP_V3_LOW_CONFIDENCE', 'KEEP_V3_OVERRIDE', 'KEEP_V3', 'SKIP_KLD_MEDIUM_RISK', 'INVERT_V3', 'SKIP_DEFAULT')
+ACTION_CODES = {name: code for code, name in enumerate(ACTIONS)}
+PLAYABLE_ACTIONS = (ACTION_CODES['KEEP_V3'], ACTION_CODES['INVERT_V3'], ACTION_CODES['KEEP_V3_OVERRIDE'])
+
+# Coduri clasificare trap
+TRAP_TYPES = (None, 'CONTRARION', 'REAL', 'AMBIGUOUS', 'REAL (V3.0.2 FORCED)')
+
+
+def select_final_decisions(scores, actions):
+    """
+    Decizia finală din scorurile / acțiunile (N, K) pe cheile de direcție (market-urile concatenate):
+    (play, cheia aleasă, încrederea, acțiunea). Etapele anterioare sunt per market, deci cheile pot veni
+    și din analize separate ale market-urilor.
+    """
+    eligible = (scores >= 50.0) & np.isin(actions, PLAYABLE_ACTIONS)
+    masked = np.where(eligible, scores, -np.inf)
+    play = eligible.any(axis=1)
+    best_key = np.where(play, np.argmax(masked, axis=1), -1)
+    confidence = np.where(play, masked.max(axis=1), scores.max(axis=1))
+    action = np.where(play, np.take_along_axis(actions, np.maximum(best_key, 0)[:, None], axis=1)[:, 0], -1)
+    return play, best_key, confidence, action
+
+
+def outcome_labels(play, best_key, action, direction_keys):
+    """Eticheta deciziei per rând: 'SKIP' sau '<ACȚIUNE> <MARKET>_<DIRECȚIE FINALĂ>' (INVERT_V3 = direcția opusă)."""
+    table = np.array([f"{name} {key}" for name in ACTIONS for key in direction_keys] + ['SKIP'], dtype=object)
+    final_key = np.where(action == ACTION_CODES['INVERT_V3'], best_key ^ 1, best_key)
+    return table[np.where(play, action * len(direction_keys) + final_key, len(table) - 1)]
+
+
+class BatchAnalyzerV73:
+    """
+    Analizator Hibrid V7.3 vectorizat (aceleași decizii ca HybridAnalyzerV73.generate_prediction):
+    1. ✅ Intrare: ladder-e stivuite (N, M market-uri, L linii, 5 câmpuri) + open_line_value (N, M)
+    2. ✅ Toate etapele (consens, Steam, gradient, trap, entropie, istoric, scor, KLD) ca operații pe array
+    3. ✅ Decizia finală, linia cu buffer și cota pentru toate cele N rânduri deodată
+    4. ✅ prediction(i) construiește dict-ul de sumar (fără 'details') doar pentru rândurile cerute
+    5. ✅ Market-urile din MARKET_REGISTRY (direcții, buffer-e, penalizare istorică) pe aceeași axă;
+          liniile pe care un market nu le cotează sunt NaN (pragurile urmează lungimea reală a ladder-ului)
+    """
+
+    def __init__(self, ladders, open_lines, leagues=None, home_teams=None, away_teams=None, line_keys=LINE_ORDER,
+                 markets=MARKETS):
+        """
+        `line_keys`: cheile liniilor de pe axa 2 (ordinea pack_markets; implicit m3..p3).
+        `markets`: numele market-urilor de pe axa 1 (implicit TOTAL, HANDICAP), din MARKET_REGISTRY.
+        """
+        ladders = np.asarray(ladders, dtype=np.float64)
+        self.line_keys = tuple(ladder_order(line_keys))
+        if tuple(line_keys) != self.line_keys:
+            raise ValueError(f"Cheile liniilor nu sunt în ordinea ladder-ului: {tuple(line_keys)}")
+        self.markets = tuple(market.upper() for market in markets)
+        unknown = [market for market in self.markets if market not in MARKET_REGISTRY]
+        if unknown:
+            raise ValueError(f"Market-uri necunoscute: {unknown}")
+        if ladders.ndim != 4 or ladders.shape[1:] != (len(self.markets), len(self.line_keys), 5):
+            raise ValueError(f"Ladder-ele trebuie să aibă forma (N, {len(self.markets)}, {len(self.line_keys)}, 5), "
+                             f"nu {ladders.shape}")
+        self.n = ladders.shape[0]
+        self.leagues = leagues
+        self.home_teams = home_teams
+        self.away_teams = away_teams
+
+        # Aceleași constante ca HybridAnalyzerV73
+        self.WEIGHT_CONSENSUS = 0.50
+        self.WEIGHT_GRADIENT = 0.15
+        self.BONUS_STEAM = 25
+        self.PENALTY_TRAP = 10
+        self.PENALTY_ENTROPY = 15
+        self.AGGRESSION_THRESHOLD = 0.25
+        self.PENALTY_HISTORIC_MOVE = 20
+        self.THRESHOLD_HISTORIC_MOVE = 5.0
+        self.BONUS_CONTRARION = 20
+        self.MULTIPLIER_REAL_TRAP = 1.5
+        self.PENALTY_V301_FORCED = 40.0
+        self.BONUS_CONFLUENCE_TRIPLE_CHECK = 15.0
+        self.GRADIENT_CONFLUENCE_THRESHOLD = 70.0
+        self.KLD_THRESHOLD_SAFE = 0.03
+        self.KLD_THRESHOLD_SHOCK = 0.06
+        self.THRESHOLD_HISTORIC_CONFLICT = 2.0
+        self.PENALTY_HISTORIC_CONFLICT = 30.0
+        self.CONSENSUS_OVERHEAT_THRESHOLD = 65.0
+        self.CONSENSUS_ODDS_THRESHOLD = 1.85
+        self.CONSENSUS_MOVE_THRESHOLD = 0.05
+        self.STEAM_THRESHOLD = 0.08
+        self.TRAP_GAP_THRESHOLD = 0.20
+        self.ECC_THRESHOLD = 1.2
+
+        # Regulile per market din registru: direcții, buffer-e (M, 2), penalizarea istorică V3.0.2 (M,)
+        self.specs = tuple(MARKET_REGISTRY[market] for market in self.markets)
+        self.direction_names = tuple(spec.dir_names for spec in self.specs)
+        self.direction_keys = tuple(f'{market}_{name}' for market, spec in zip(self.markets, self.specs)
+                                    for name in spec.dir_names)
+        self.buffers = np.array([[spec.buffers[name] for name in spec.dir_names] for spec in self.specs])
+        self.historic_penalty_markets = np.array([spec.historic_penalty for spec in self.specs])
+
+        self.close_index = self.line_keys.index('close')
+        # Ordinea liniilor în etapa Steam (close prima), pentru alegerea liniei Steam la egalitate
+        self.steam_order = np.array([self.close_index] + [i for i in range(len(self.line_keys)) if i != self.close_index])
+
+        # (N, M, L) linii | (N, M, 2, L) cote [meci, market, direcție, linie]
+        self.lines = ladders[..., 0]
+        self.open = np.stack((ladders[..., 1], ladders[..., 3]), axis=2)
+        self.close = np.stack((ladders[..., 2], ladders[..., 4]), axis=2)
+        self.open_lines = np.asarray(open_lines, dtype=np.float64).reshape(self.n, len(self.markets))
+        self.sides = np.arange(2).reshape(1, 1, 2)
+
+        # Liniile cotate efectiv de fiecare market (NaN = lipsă) și pragurile scalate cu lungimea lor
+        self.valid = ~np.isnan(self.lines)
+        self.n_lines = self.valid.sum(axis=-1)
+        if not self.valid[..., self.close_index].all() or (self.n_lines < 2).any():
+            raise ValueError("Fiecare market trebuie să aibă linia 'close' și cel puțin o linie alternativă")
+        self.padded = self.n_lines < len(self.line_keys)
+        table = [ladder_thresholds(max(n, 2), self.ECC_THRESHOLD) for n in range(len(self.line_keys) + 1)]
+        self.thresholds = {name: np.array([row[name] for row in table])[self.n_lines] for name in table[0]}
+
+        self._calculate_consensus()
+        self._detect_steam()
+        self._analyze_gradient()
+        self._detect_traps()
+        self._analyze_entropy()
+        self._analyze_historic()
+        self._calculate_scores()
+        self._calculate_kld()
+        self._determine_actions()
+        self._select_final_decisions()
+        self._select_lines()
+
+    @classmethod
+    def from_matches(cls, matches):
+        """
+        Construiește batch-ul din dict-uri de meci (league, home_team, away_team, total_lines, handicap_lines,
+        opțional markets={nume: ladder}). Toate meciurile au aceleași market-uri; axa liniilor = reuniunea lor.
+        """
+        matches = list(matches)
+        match_markets = [{'TOTAL': m['total_lines'], 'HANDICAP': m['handicap_lines'],
+                          **{name.upper(): lines for name, lines in (m.get('markets') or {}).items()}}
+                         for m in matches]
+        markets = tuple(match_markets[0]) if matches else MARKETS
+        if any(tuple(mm) != markets for mm in match_markets):
+            raise ValueError("Toate meciurile dintr-un batch trebuie să aibă aceleași market-uri")
+        line_keys = ladder_order({key.lower() for mm in match_markets for lines in mm.values() for key in lines}) \
+            if matches else LINE_ORDER
+
+        ladders = np.empty((len(matches), len(markets), len(line_keys), 5))
+        open_lines = np.empty((len(matches), len(markets)))
+        for i, mm in enumerate(match_markets):
+            ladders[i], open_lines[i], _ = pack_markets(mm, line_keys)
+        return cls(
+            ladders, open_lines,
+            leagues=[m.get('league') for m in matches],
+            home_teams=[m.get('home_team') for m in matches],
+            away_teams=[m.get('away_team') for m in matches],
+            line_keys=line_keys,
+            markets=markets
+        )
+
+    # -------------------------------------------------------------------------
+    # Etape
+    # -------------------------------------------------------------------------
+
+    def _calculate_consensus(self):
+        points = np.where(self.close < self.CONSENSUS_ODDS_THRESHOLD, 3, 0) + \
+                 np.where(self.open - self.close > self.CONSENSUS_MOVE_THRESHOLD, 2, 0)
+        self.consensus = (points.sum(axis=-1) / (self.n_lines * 5)[..., None]) * 100
+
+    def _detect_steam(self):
+        moves = self.open - self.close
+        steam_mask = moves > self.STEAM_THRESHOLD
+        counts = steam_mask.sum(axis=-1)
+        min_lines = self.thresholds['steam_min_lines']
+        self.steam_dir = np.where(counts[..., 0] >= min_lines, 0, np.where(counts[..., 1] >= min_lines, 1, -1))
+        self.steam_strength = np.where(
+            self.steam_dir >= 0, np.take_along_axis(counts, np.maximum(self.steam_dir, 0)[..., None], axis=-1)[..., 0], 0
+        )
+        move_sums = np.where(steam_mask, moves, 0.0).sum(axis=-1)
+        self.steam_avg_move = np.where(
+            self.steam_dir >= 0,
+            np.take_along_axis(move_sums, np.maximum(self.steam_dir, 0)[..., None], axis=-1)[..., 0] / np.maximum(self.steam_strength, 1),
+            0.0
+        )
+
+        # Linia Steam cu mișcarea maximă (prima în ordinea etapei), apoi prima linie din ladder la < 0.1 de ea
+        ordered = np.where(steam_mask, moves, -np.inf)[..., self.steam_order]
+        best = self.steam_order[np.argmax(ordered, axis=-1)]                                       # (N, M, 2)
+        best_line = np.take_along_axis(self.lines[:, :, None, :], best[..., None], axis=-1)    # (N, M, 2, 1)
+        self.steam_line_index = np.argmax(np.abs(self.lines[:, :, None, :] - best_line) < 0.1, axis=-1)
+
+    def _analyze_gradient(self):
+        stds = np.diff(self.close, axis=-1).std(axis=-1)
+        if self.padded.any():
+            # Ladder-e incomplete: liniile cotate mutate la început (ordinea se păstrează), diferențe doar între ele
+            order = np.argsort(~self.valid, axis=-1, kind='stable')[:, :, None, :]
+            compact = np.take_along_axis(self.close, np.broadcast_to(order, self.close.shape), axis=-1)
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', RuntimeWarning)
+                padded_stds = np.nanstd(np.diff(compact, axis=-1), axis=-1)
+            stds = np.where(self.padded[..., None], padded_stds, stds)
+        self.uniformity = np.maximum(0, 100 - (stds[..., 0] + stds[..., 1]) * 100)
+
+    def _detect_traps(self):
+        reference = self.close[..., self.close_index:self.close_index + 1]
+        traps = self.close < reference - self.TRAP_GAP_THRESHOLD
+        traps[..., self.close_index] = False
+        self.traps = traps
+        self.trap_count = traps.sum(axis=-1)
+        aggressive = np.round(self.open - self.close, 3) >= self.AGGRESSION_THRESHOLD
+        self.aggressive_traps = (traps & aggressive).sum(axis=-1)
+
+    def _analyze_entropy(self):
+        valid = self.valid[:, :, None, :]
+        probs = np.where(valid, 1.0 / self.close, 0.0)
+        norm = probs / probs.sum(axis=-1, keepdims=True)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            entropy = -np.where(valid, norm * np.log2(norm), 0.0).sum(axis=-1)
+        cons = self.consensus
+        ecc_threshold = self.thresholds['ecc_threshold']
+        self.entropy = entropy
+        self.entropy_dir = np.where(
+            (cons[..., 0] > cons[..., 1]) & (entropy[..., 0] < ecc_threshold), 0,
+            np.where((cons[..., 1] > cons[..., 0]) & (entropy[..., 1] < ecc_threshold), 1, -1)
+        )
+
+    def _analyze_historic(self):
+        self.has_open_line = ~np.isnan(self.open_lines)
+        close_line = self.lines[..., self.close_index]
+        self.historic_movement = np.where(self.has_open_line, close_line - self.open_lines, 0.0)
+        threshold = self.THRESHOLD_HISTORIC_CONFLICT
+        self.historic_significant = self.has_open_line & (np.abs(self.historic_movement) >= threshold)
+        self.historic_dir = np.where(
+            self.has_open_line,
+            np.where(self.historic_movement > threshold, 1, np.where(self.historic_movement < -threshold, 0, -1)),
+            -1
+        )
+
+    def _calculate_scores(self):
+        sides = self.sides
+        cons = self.consensus
+        uniformity = self.uniformity[..., None]
+        has_steam = self.steam_dir[..., None] == sides
+        steam_strength = np.where(has_steam, self.steam_strength[..., None], 0)
+        entropy_hit = self.entropy_dir[..., None] == sides
+        n_traps = self.trap_count
+        thresholds = {name: value[..., None] for name, value in self.thresholds.items()}
+
+        # Mișcarea istorică (doar market-urile cu penalizare istorică - TOTAL - intră în clasificarea
+        # trap-urilor și în penalizarea V3.0.2)
+        flagged = self.historic_penalty_markets[None, :] & self.has_open_line
+        historic_move_diff = self.historic_movement
+        is_historic_risk = flagged & (np.abs(historic_move_diff) >= self.THRESHOLD_HISTORIC_MOVE)
+        historic_abs = np.where(flagged, np.abs(historic_move_diff), 0.0)[..., None]
+
+        # Clasificare trap: Contrarion vs Real
+        contrarion = np.where(cons > 65, 30, np.where(cons > 55, 15, 0)) + 25 * has_steam + \
+            10 * (has_steam & (steam_strength >= thresholds['steam_exceptional_lines'])) + 15 * (uniformity > 70) + \
+            10 * (self.aggressive_traps >= thresholds['aggressive_trap_count']) + 10 * (historic_abs < 3.0)
+        real = 30 * (cons < 40) + 25 * ~has_steam + 15 * ((self.steam_dir[..., None] >= 0) & ~has_steam) + \
+            20 * (uniformity < 50) + 15 * entropy_hit + \
+            20 * (n_traps >= thresholds['severe_trap_count']) + 15 * (historic_abs > 5.0)
+        trap_type = np.where(n_traps == 0, 0, np.where(contrarion > real + 20, 1, np.where(real > contrarion + 20, 2, 3)))
+
+        trap_penalty = np.where(trap_type == 2, n_traps * self.PENALTY_TRAP * self.MULTIPLIER_REAL_TRAP,
+                                np.where(trap_type == 3, n_traps * self.PENALTY_TRAP, 0))
+        contrarion_bonus = np.where(trap_type == 1, self.BONUS_CONTRARION, 0)
+        entropy_penalty = np.where(entropy_hit, self.PENALTY_ENTROPY, 0)
+
+        self.historic_conflict = self.historic_significant[..., None] & (self.historic_dir[..., None] >= 0) & \
+            (self.historic_dir[..., None] != sides)
+        conflict_penalty = np.where(self.historic_conflict, self.PENALTY_HISTORIC_CONFLICT, 0.0)
+
+        # V3.0.2 (TOTAL): penalizare istorică și verificarea Triple-Check / Forced
+        historic_penalty = np.broadcast_to(np.where(is_historic_risk, self.PENALTY_HISTORIC_MOVE, 0.0)[..., None],
+                                           cons.shape)
+        aligned = ((historic_move_diff > 0)[..., None] & (sides == 0)) | ((historic_move_diff < 0)[..., None] & (sides == 1))
+        check = (contrarion_bonus > 0) & is_historic_risk[..., None] & aligned & has_steam
+        triple = check & (uniformity >= self.GRADIENT_CONFLUENCE_THRESHOLD)
+        forced = check & ~(uniformity >= self.GRADIENT_CONFLUENCE_THRESHOLD)
+
+        confluence_bonus = np.where(triple, self.BONUS_CONFLUENCE_TRIPLE_CHECK, 0.0)
+        historic_penalty = np.where(triple, 0.0, historic_penalty)
+        contrarion_bonus = np.where(forced, 0.0, contrarion_bonus)
+        trap_penalty = np.where(forced, self.PENALTY_V301_FORCED, trap_penalty)
+        self.trap_type = np.where(forced, 4, trap_type)
+
+        total_penalties = trap_penalty + entropy_penalty + historic_penalty + conflict_penalty
+        final = cons * self.WEIGHT_CONSENSUS + uniformity * self.WEIGHT_GRADIENT + self.BONUS_STEAM * has_steam + \
+            contrarion_bonus + confluence_bonus - total_penalties
+        self.scores = np.clip(final, 0, 100)
+        self.has_steam = has_steam
+
+    def _calculate_kld(self):
+        p_open = 1.0 / self.open[..., self.close_index]
+        p_close = 1.0 / self.close[..., self.close_index]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            kld = np.where((p_open > 0) & (p_close > 0), p_close * np.log(p_close / p_open), 0.0)
+        self.kld = kld
+        self.kld_abs = np.abs(kld)
+
+    def _determine_actions(self):
+        sides = self.sides
+        scores = self.scores
+        check_confluence = ~self.historic_conflict & (scores >= 60)
+        steam_exceptional = self.has_steam & \
+            (self.steam_strength[..., None] >= self.thresholds['steam_exceptional_lines'][..., None])
+        gradient_exceptional = np.broadcast_to(self.uniformity[..., None] > 95, scores.shape)
+        consensus_safe = self.consensus < self.CONSENSUS_OVERHEAT_THRESHOLD
+        historic_aligned = np.where(self.historic_significant[..., None], self.historic_dir[..., None] == sides, True)
+        confluence_count = steam_exceptional.astype(int) + gradient_exceptional + consensus_safe + historic_aligned
+
+        kld = self.kld_abs
+        self.actions = np.select(
+            [scores < 50,
+             check_confluence & (confluence_count >= 3),
+             kld <= self.KLD_THRESHOLD_SAFE,
+             (kld > self.KLD_THRESHOLD_SAFE) & (kld < self.KLD_THRESHOLD_SHOCK),
+             kld >= self.KLD_THRESHOLD_SHOCK],
+            [ACTION_CODES['SKIP_V3_LOW_CONFIDENCE'], ACTION_CODES['KEEP_V3_OVERRIDE'], ACTION_CODES['KEEP_V3'],
+             ACTION_CODES['SKIP_KLD_MEDIUM_RISK'], ACTION_CODES['INVERT_V3']],
+            default=ACTION_CODES['SKIP_DEFAULT']
+        )
+
+    def _select_final_decisions(self):
+        self.play, self.best_key, self.confidence, self.action = select_final_decisions(
+            self.scores.reshape(self.n, -1), self.actions.reshape(self.n, -1))
+
+    def _select_lines(self):
+        rows = np.arange(self.n)
+        key = np.maximum(self.best_key, 0)
+        market = key // 2
+        direction = key % 2
+        final_direction = np.where(self.action == ACTION_CODES['INVERT_V3'], 1 - direction, direction)
+
+        line_index = np.full(self.n, self.close_index)
+        from_steam = self.steam_dir[rows, market] == final_direction
+        line_index = np.where(from_steam, self.steam_line_index[rows, market, final_direction], line_index)
+        original_line = self.lines[rows, market, line_index]
+        cota = self.close[rows, market, final_direction, line_index]
+
+        buffer = self.buffers[market, final_direction]
+        buffered = original_line + buffer
+
+        # Trap real pe linia finală → revenire la close cu buffer
+        real_trap = self.trap_type[rows, market, final_direction] == 2
+        trap_lines = self.traps[rows, market, final_direction] & \
+            (np.abs(self.lines[rows, market] - original_line[:, None]) < 0.1)
+        self.trap_reverted = self.play & real_trap & trap_lines.any(axis=1)
+        close_line = self.lines[rows, market, self.close_index]
+        buffered = np.where(self.trap_reverted, close_line + buffer, buffered)
+
+        self.market = np.where(self.play, market, -1)
+        self.direction_initial = np.where(self.play, direction, -1)
+        self.direction_final = np.where(self.play, final_direction, -1)
+        self.line_source = np.where(self.play & from_steam, line_index, -1)
+        self._original_line = original_line
+        self._buffered_line = buffered
+        self._cota = cota
+        self.line_original = np.round(original_line, 1)
+        self.line_buffered = np.round(buffered, 1)
+        self.cota = np.round(cota, 2)
+
+    # -------------------------------------------------------------------------
+    # Rezultate
+    # -------------------------------------------------------------------------
+
+    def direction_labels(self):
+        """Direcția finală per rând ('TOTAL_OVER', ...) sau 'SKIP'."""
+        table = np.array(list(self.direction_keys) + ['SKIP'], dtype=object)
+        return table[np.where(self.play, self.market * 2 + self.direction_final, len(self.direction_keys))]
+
+    def outcome_labels(self):
+        """Eticheta deciziei per rând: 'SKIP' sau '<ACȚIUNE> <MARKET>_<DIRECȚIE FINALĂ>'."""
+        return outcome_labels(self.play, self.best_key, self.action, self.direction_keys)
+
+    def prediction(self, i):
+        """Dict-ul de sumar al rândului i, în formatul generate_prediction (fără 'details')."""
+        if not self.play[i]:
+            return {
+                'decision': 'SKIP',
+                'reason': 'Încredere insuficientă sau filtrate de KLD.',
+                'confidence': float(self.confidence[i])
+            }
+
+        m = int(self.market[i])
+        market = self.markets[m]
+        direction = self.direction_names[m][self.direction_initial[i]]
+        final_direction = self.direction_names[m][self.direction_final[i]]
+        original_line = float(self._original_line[i])
+        buffered_line = float(self._buffered_line[i])
+
+        if self.trap_reverted[i]:
+            reason = 'TRAP REAL detectat → Revenire la Close cu buffer'
+        else:
+            reason = self.specs[m].buffer_reason(original_line, buffered_line, final_direction)
+
+        source_index = self.line_source[i]
+        return {
+            'decision': 'PLAY',
+            'market': market,
+            'direction_initial': direction,
+            'direction_final': final_direction,
+            'line_original': round(original_line, 1),
+            'line_buffered': round(buffered_line, 1),
+            'cota': round(float(self._cota[i]), 2),
+            'source': 'Close Line' if source_index < 0 else f'Steam Line ({self.line_keys[source_index].upper()})',
+            'reason': reason,
+            'confidence': float(self.confidence[i]),
+            'v7_action': ACTIONS[self.action[i]]
+        }
+
+    def predictions(self):
+        return [self.prediction(i) for i in range(self.n)]
+
+    def confidence_matrix(self, i):
+        """Matricea de încredere V3 a rândului i."""
+        return dict(zip(self.direction_keys, self.scores[i].reshape(-1).tolist()))
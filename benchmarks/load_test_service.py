@@ -0,0 +1,149 @@
+import argparse
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from analysis_service import AnalysisService
+from differential_harness import first_difference, reference_engine
+from synthetic_ladders import generate_slate
+
+# =============================================================================
+# TEST DE ÎNCĂRCARE PE LOCALHOST PENTRU SERVICIUL HTTP (CU / FĂRĂ MICRO-BATCHING)
+# =============================================================================
+
+def _client(port, matches, latencies, responses, offset, errors):
+    """Un client cu conexiune keep-alive: trimite meciurile pe rând la POST /predict."""
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    perf_counter = time.perf_counter
+    try:
+        for i, match in enumerate(matches):
+            body = json.dumps(match)
+            started = perf_counter()
+            connection.request('POST', '/predict', body, {'Content-Type': 'application/json'})
+            response = connection.getresponse()
+            payload = response.read()
+            latencies[offset + i] = perf_counter() - started
+            if response.status != 200:
+                errors.append((offset + i, response.status, payload[:200]))
+            responses[offset + i] = json.loads(payload)
+    finally:
+        connection.close()
+
+
+def run_load(matches, clients=32, backend='batch', max_batch=64, max_wait=0.002, workers=None):
+    """
+    Pornește serviciul pe un port liber și trimite toate meciurile de pe `clients` conexiuni concurente.
+    Returnează metricile client (throughput, p50 / p99) + /metrics al serverului.
+    """
+    n = len(matches)
+    latencies = np.zeros(n)
+    responses = [None] * n
+    errors = []
+    shares = np.array_split(np.arange(n), clients)
+    with AnalysisService(port=0, backend=backend, max_batch=max_batch, max_wait=max_wait, workers=workers) as service:
+        # Încălzire (importuri, pool de procese), apoi metrici de la zero
+        _client(service.port, matches[:min(n, 8)], np.zeros(n), [None] * n, 0, [])
+        service.metrics.reset()
+
+        threads = [threading.Thread(target=_client, args=(service.port, [matches[i] for i in rows], latencies,
+                                                          responses, int(rows[0]) if len(rows) else 0, errors))
+                   for rows in shares]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        seconds = time.perf_counter() - started
+
+        connection = http.client.HTTPConnection('127.0.0.1', service.port, timeout=60)
+        connection.request('GET', '/metrics')
+        server_metrics = json.loads(connection.getresponse().read())
+        connection.close()
+
+    return {
+        'config': {'clients': clients, 'backend': backend, 'max_batch': max_batch, 'max_wait_ms': max_wait * 1e3},
+        'requests': n,
+        'seconds': seconds,
+        'throughput_per_s': n / seconds if seconds else 0.0,
+        'p50_ms': float(np.percentile(latencies, 50)) * 1e3,
+        'p99_ms': float(np.percentile(latencies, 99)) * 1e3,
+        'errors': len(errors),
+        'server': server_metrics,
+        'responses': responses,
+    }
+
+
+def verify(matches, responses):
+    """Compară răspunsurile serviciului cu analizorul de referință (doar decizia). Returnează divergențele."""
+    divergences = []
+    for i, (match, response) in enumerate(zip(matches, responses)):
+        expected = reference_engine(match)
+        difference = first_difference(expected, response, summary_only=True)
+        if difference is not None:
+            divergences.append((i, difference))
+    return divergences
+
+
+def _print_report(results):
+    print(f"{'backend':>8} {'batch':>6} {'wait ms':>8} {'clienți':>8} {'cereri/s':>10} {'p50 ms':>8} "
+          f"{'p99 ms':>8} {'batch mediu':>12} {'erori':>6}")
+    for r in results:
+        config = r['config']
+        coalesced = r['server']['batches'].get('coalesced', {})
+        print(f"{config['backend']:>8} {config['max_batch']:>6} {config['max_wait_ms']:>8.1f} {config['clients']:>8} "
+              f"{r['throughput_per_s']:>10.0f} {r['p50_ms']:>8.2f} {r['p99_ms']:>8.2f} "
+              f"{coalesced.get('mean_size', 0.0):>12.1f} {r['errors']:>6}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Test de încărcare (localhost) pentru analysis_service.')
+    parser.add_argument('--requests', type=int, default=5000, help='Număr total de cereri POST /predict')
+    parser.add_argument('--clients', type=int, default=32, help='Conexiuni concurente')
+    parser.add_argument('--backend', choices=AnalysisService.BACKENDS, default='batch')
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--max-batch', type=int, default=64)
+    parser.add_argument('--max-wait-ms', type=float, default=2.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-baseline', action='store_true',
+                        help='Fără rularea de comparație cu max_batch=1 (fără micro-batching)')
+    parser.add_argument('--verify', action='store_true', help='Verifică răspunsurile față de analizorul de referință')
+    parser.add_argument('--output', help='Scrie rezultatele (fără răspunsuri) în acest fișier JSON')
+    args = parser.parse_args(argv)
+
+    matches = list(generate_slate(args.requests, seed=args.seed))
+    configs = [] if args.no_baseline else [(1, 0.0)]
+    configs.append((args.max_batch, args.max_wait_ms / 1000.0))
+
+    results = [run_load(matches, args.clients, args.backend, max_batch, max_wait, args.workers)
+               for max_batch, max_wait in configs]
+    _print_report(results)
+
+    histogram = results[-1]['server']['batches'].get('coalesced', {}).get('size_buckets', {})
+    print('Histogramă micro-batch (cumulativă, ≤ limită): ' +
+          ', '.join(f'{bound}:{count}' for bound, count in histogram.items()))
+
+    status = 0 if all(r['errors'] == 0 for r in results) else 1
+    if args.verify:
+        divergences = [d for r in results for d in verify(matches, r['responses'])]
+        if divergences:
+            print(f"❌ {len(divergences)} răspunsuri diferă de referință. Primul: {divergences[0]}")
+            status = 1
+        else:
+            print(f"✅ Toate cele {len(matches) * len(results)} răspunsuri identice cu referința")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump([{k: v for k, v in r.items() if k != 'responses'} for r in results], f, indent=2)
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,170 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from HybridAnalyzerV73 import HybridAnalyzerV73
+from synthetic_ladders import generate_slate
+
+# =============================================================================
+# SUITĂ DE BENCHMARK REPRODUCTIBILĂ (CONSTRUCȚIE + generate_prediction)
+# =============================================================================
+
+DEFAULT_SIZES = (1, 1000, 100000, 1000000)
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines')
+
+# Metrică -> True dacă o valoare mai mare e mai bună
+METRICS = {
+    'throughput_per_s': True,
+    'p50_us': False,
+    'p99_us': False,
+    'peak_rss_mb': False,
+}
+
+
+def _peak_rss_mb():
+    """
+    Peak RSS al procesului (ru_maxrss e în KB pe Linux, în bytes pe macOS). E maximul pe toată viața
+    procesului, de aceea fiecare dimensiune rulează într-un proces propriu (run_size_isolated).
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024.0 * 1024.0) if sys.platform == 'darwin' else peak / 1024.0
+
+
+def run_size(n, seed=0):
+    """
+    Rulează n meciuri sintetice: timp per meci (construcție + generate_prediction), fără generarea datelor.
+    Latențele se țin într-un array int64 (8 MB la 1M meciuri).
+    """
+    latencies = np.empty(n, dtype=np.int64)
+    perf_counter_ns = time.perf_counter_ns
+    decisions = 0
+    total_ns = 0
+    for i, match in enumerate(generate_slate(n, seed=seed)):
+        started = perf_counter_ns()
+        analyzer = HybridAnalyzerV73(
+            match['league'], match['home_team'], match['away_team'],
+            match['total_lines'], match['handicap_lines']
+        )
+        result = analyzer.generate_prediction()
+        elapsed = perf_counter_ns() - started
+        latencies[i] = elapsed
+        total_ns += elapsed
+        if result['decision'] == 'PLAY':
+            decisions += 1
+
+    return {
+        'matches': n,
+        'seconds': total_ns / 1e9,
+        'throughput_per_s': n / (total_ns / 1e9) if total_ns else 0.0,
+        'p50_us': float(np.percentile(latencies, 50)) / 1e3,
+        'p99_us': float(np.percentile(latencies, 99)) / 1e3,
+        'peak_rss_mb': _peak_rss_mb(),
+        'play_share': decisions / n if n else 0.0,
+    }
+
+
+def run_size_isolated(n, seed=0):
+    """run_size într-un proces nou (spawn): peak RSS-ul raportat aparține doar acestei dimensiuni."""
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+        return executor.submit(run_size, n, seed).result()
+
+
+def compare(results, baseline, max_regression_pct):
+    """Lista regresiilor față de baseline (doar dimensiunile și metricile prezente în ambele)."""
+    regressions = []
+    for size, current in results.items():
+        reference = baseline.get('results', {}).get(size)
+        if not reference:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            old, new = reference.get(metric), current.get(metric)
+            if not old or new is None:
+                continue
+            change_pct = (new - old) / old * 100.0
+            worse_pct = -change_pct if higher_is_better else change_pct
+            if worse_pct > max_regression_pct:
+                regressions.append({
+                    'size': size, 'metric': metric, 'baseline': old, 'current': new,
+                    'regression_pct': worse_pct
+                })
+    return regressions
+
+
+def _print_report(results):
+    print(f"{'meciuri':>10} {'sec':>9} {'meciuri/s':>11} {'p50 µs':>9} {'p99 µs':>9} {'RSS MB':>8} {'PLAY':>6}")
+    for size, r in results.items():
+        print(f"{r['matches']:>10} {r['seconds']:>9.2f} {r['throughput_per_s']:>11.0f} "
+              f"{r['p50_us']:>9.1f} {r['p99_us']:>9.1f} {r['peak_rss_mb']:>8.1f} {r['play_share']:>6.1%}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark HybridAnalyzerV73 pe ladder-e sintetice deterministe.')
+    parser.add_argument('--sizes', default=','.join(str(s) for s in DEFAULT_SIZES),
+                        help='Dimensiuni separate prin virgulă (implicit 1,1000,100000,1000000)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--baseline', help='Fișier JSON baseline cu care se compară rularea')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='Salvează rezultatele ca baseline (în --baseline sau benchmarks/baselines/)')
+    parser.add_argument('--max-regression', type=float, default=10.0,
+                        help='Regresie maximă permisă, în procente (implicit 10)')
+    parser.add_argument('--output', help='Scrie rezultatele complete în acest fișier JSON')
+    parser.add_argument('--in-process', action='store_true',
+                        help='Rulează toate dimensiunile în procesul curent (peak RSS-ul devine cumulativ)')
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(',') if s.strip()]
+    run = run_size if args.in_process else run_size_isolated
+    results = {}
+    for n in sizes:
+        results[str(n)] = run(n, seed=args.seed)
+
+    report = {
+        'seed': args.seed,
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results,
+    }
+    _print_report(results)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        path = args.baseline or os.path.join(BASELINE_DIR, f'baseline_seed{args.seed}.json')
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline salvat: {path}")
+        return 0
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get('seed') != args.seed:
+            print(f"⚠️ Baseline-ul folosește seed={baseline.get('seed')}, rularea curentă seed={args.seed}")
+        regressions = compare(results, baseline, args.max_regression)
+        if regressions:
+            print(f"❌ {len(regressions)} regresii peste {args.max_regression:.1f}%:")
+            for r in regressions:
+                print(f"   {r['size']:>8} {r['metric']:<18} {r['baseline']:.2f} → {r['current']:.2f} "
+                      f"(+{r['regression_pct']:.1f}% mai rău)")
+            return 1
+        print(f"✅ Fără regresii peste {args.max_regression:.1f}% față de {args.baseline}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,345 @@
+import argparse
+import json
+import math
+import sys
+import numpy as np
+import pandas as pd
+
+# =============================================================================
+# CALIBRAREA ÎNCREDERII (Decision_Confidence_V3 vs. REZULTATELE DECONTATE)
+# =============================================================================
+
+GROUP_FIELDS = ('league', 'market', 'action', 'trap')
+# Rezultat decontat -> 1 (câștigat) / 0 (pierdut) / NaN (push / anulat, exclus din calibrare)
+OUTCOME_VALUES = {
+    'WIN': 1.0, 'W': 1.0, 'HIT': 1.0, '1': 1.0, 'TRUE': 1.0,
+    'LOSS': 0.0, 'L': 0.0, 'MISS': 0.0, '0': 0.0, 'FALSE': 0.0,
+    'PUSH': math.nan, 'VOID': math.nan, 'P': math.nan,
+}
+# Câmpurile documentului salvat pentru coloanele arhivei
+DOCUMENT_FIELDS = {
+    'confidence': 'Decision_Confidence_V3',
+    'league': 'League',
+    'market': 'Decision_Market',
+    'action': 'Decision_Type',
+    'trap': 'Decision_Trap_Type',
+}
+
+
+def outcome_value(outcome):
+    """Rezultatul unui pariu ca 1.0 / 0.0 / NaN (bool, număr sau text WIN / LOSS / PUSH)."""
+    if outcome is None:
+        return math.nan
+    if isinstance(outcome, (bool, np.bool_)):
+        return float(outcome)
+    if isinstance(outcome, (int, float, np.number)):
+        return float(outcome) if outcome in (0, 1) else math.nan
+    value = OUTCOME_VALUES.get(str(outcome).strip().upper())
+    if value is None:
+        raise ValueError(f"Rezultat necunoscut: {outcome!r}")
+    return value
+
+
+class CalibrationArchive:
+    """
+    Arhiva decontată în format columnar (un array numpy per coloană):
+    1. ✅ confidence (0-100) și hit (1 / 0 / NaN pentru push) ca float64
+    2. ✅ league / market / action / trap codificate ca int32 + vocabularul fiecărei coloane
+    3. ✅ Construire din documente salvate + rezultate, din DataFrame sau din fișier (.npz / .csv / .parquet)
+    """
+
+    def __init__(self, confidence, hit, **labels):
+        self.confidence = np.asarray(confidence, dtype=np.float64)
+        self.hit = np.asarray(hit, dtype=np.float64)
+        if self.confidence.shape != self.hit.shape:
+            raise ValueError("confidence și hit trebuie să aibă aceeași lungime")
+        self.codes = {}
+        self.vocab = {}
+        for field in GROUP_FIELDS:
+            values = labels.get(field)
+            if values is None:
+                values = np.full(len(self.confidence), 'N/A', dtype=object)
+            self.vocab[field], self.codes[field] = self._encode(values)
+
+    @staticmethod
+    def _encode(values):
+        # factorize (hash) e mult mai rapid decât np.unique (sortare) pe milioane de etichete text
+        codes, vocab = pd.factorize(pd.Series(values).fillna('N/A').astype(str), sort=True)
+        return np.asarray(vocab, dtype=str), codes.astype(np.int32)
+
+    def __len__(self):
+        return len(self.confidence)
+
+    @classmethod
+    def from_documents(cls, documents, outcomes=None):
+        """
+        Documente salvate (id, dict) + rezultate {id: rezultat}; fără `outcomes`, rezultatul se ia din
+        câmpul 'Settled_Outcome' al documentului. Documentele fără rezultat sunt ignorate.
+        """
+        columns = {field: [] for field in ('confidence', 'hit', *GROUP_FIELDS)}
+        for doc_id, document in documents:
+            outcome = outcomes.get(doc_id) if outcomes is not None else document.get('Settled_Outcome')
+            if outcome is None or document.get(DOCUMENT_FIELDS['confidence']) is None:
+                continue
+            columns['hit'].append(outcome_value(outcome))
+            columns['confidence'].append(float(document[DOCUMENT_FIELDS['confidence']]))
+            for field in GROUP_FIELDS:
+                columns[field].append(document.get(DOCUMENT_FIELDS[field]) or 'N/A')
+        return cls(**columns)
+
+    @classmethod
+    def from_frame(cls, frame):
+        """DataFrame cu coloanele confidence, hit / outcome (+ league, market, action, trap)."""
+        if 'hit' in frame:
+            hit = frame['hit'].to_numpy(dtype=np.float64, na_value=np.nan)
+        else:
+            hit = np.fromiter((outcome_value(v) for v in frame['outcome']), dtype=np.float64, count=len(frame))
+        labels = {field: frame[field] for field in GROUP_FIELDS if field in frame}
+        return cls(frame['confidence'].to_numpy(dtype=np.float64), hit, **labels)
+
+    @classmethod
+    def load(cls, path):
+        """Calea columnară: .npz (array-uri numpy), .parquet sau .csv (prin pandas)."""
+        if path.endswith('.npz'):
+            with np.load(path, allow_pickle=False) as data:
+                return cls(data['confidence'], data['hit'],
+                           **{field: data[field] for field in GROUP_FIELDS if field in data})
+        frame = pd.read_parquet(path) if path.endswith('.parquet') else pd.read_csv(path)
+        return cls.from_frame(frame)
+
+    def save(self, path):
+        """Salvează arhiva ca .npz (etichetele decodificate, reîncărcabile fără pickle)."""
+        np.savez_compressed(path, confidence=self.confidence, hit=self.hit,
+                            **{field: self.vocab[field][self.codes[field]] for field in GROUP_FIELDS})
+
+    def settled(self):
+        """Masca rândurilor decontate (fără push / anulate)."""
+        return ~np.isnan(self.hit)
+
+
+# =============================================================================
+# CURBE DE FIABILITATE ȘI METRICI BRIER (VECTORIZAT, PE GRUPURI)
+# =============================================================================
+
+def calibration_report(archive, by=('league', 'market'), bins=10):
+    """
+    Raportul de calibrare pe grupuri (ex. ligă × market), într-o singură trecere vectorizată:
+    per grup - n, încrederea medie, rata de câștig, Brier, ECE, descompunerea Murphy
+    (reliability / resolution / uncertainty) și curba de fiabilitate pe `bins` intervale egale de încredere.
+    """
+    by = tuple(by)
+    unknown = [field for field in by if field not in GROUP_FIELDS]
+    if unknown:
+        raise ValueError(f"Câmpuri de grupare necunoscute: {', '.join(unknown)}")
+    mask = archive.settled()
+    p = np.clip(archive.confidence[mask] / 100.0, 0.0, 1.0)
+    y = archive.hit[mask]
+    n_rows = len(p)
+
+    # Cod de grup unic (produsul mixt al codurilor) -> grupuri compacte 0..G-1
+    group = np.zeros(n_rows, dtype=np.int64)
+    for field in by:
+        group = group * len(archive.vocab[field]) + archive.codes[field][mask]
+    group_ids, group = np.unique(group, return_inverse=True)
+    n_groups = len(group_ids)
+
+    bin_index = np.minimum((p * bins).astype(np.int64), bins - 1)
+    cell = group * bins + bin_index
+    size = n_groups * bins
+    cell_n = np.bincount(cell, minlength=size).reshape(n_groups, bins)
+    cell_p = np.bincount(cell, weights=p, minlength=size).reshape(n_groups, bins)
+    cell_y = np.bincount(cell, weights=y, minlength=size).reshape(n_groups, bins)
+
+    n = cell_n.sum(axis=1)
+    sum_p = cell_p.sum(axis=1)
+    sum_y = cell_y.sum(axis=1)
+    brier = np.bincount(group, weights=(p - y) ** 2, minlength=n_groups)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_p = cell_p / cell_n
+        hit_rate = cell_y / cell_n
+        base_rate = sum_y / n
+        gap = np.where(cell_n > 0, np.abs(mean_p - hit_rate), 0.0)
+        reliability = np.where(cell_n > 0, (mean_p - hit_rate) ** 2, 0.0)
+        resolution = np.where(cell_n > 0, (hit_rate - base_rate[:, None]) ** 2, 0.0)
+        ece = (cell_n * gap).sum(axis=1) / n
+        reliability = (cell_n * reliability).sum(axis=1) / n
+        resolution = (cell_n * resolution).sum(axis=1) / n
+
+    # Decodificarea grupurilor în etichete (inversul produsului mixt)
+    labels = {}
+    remainder = group_ids.copy()
+    for field in reversed(by):
+        size_field = len(archive.vocab[field])
+        labels[field] = archive.vocab[field][remainder % size_field]
+        remainder //= size_field
+
+    edges = np.linspace(0.0, 100.0, bins + 1)
+    report = []
+    for g in range(n_groups):
+        filled = cell_n[g] > 0
+        report.append({
+            **{field: str(labels[field][g]) for field in by},
+            'n': int(n[g]),
+            'mean_confidence': float(sum_p[g] / n[g] * 100.0),
+            'hit_rate': float(base_rate[g]),
+            'brier': float(brier[g] / n[g]),
+            'ece': float(ece[g]),
+            'reliability': float(reliability[g]),
+            'resolution': float(resolution[g]),
+            'uncertainty': float(base_rate[g] * (1.0 - base_rate[g])),
+            'curve': {
+                'bin_low': edges[:-1][filled].tolist(),
+                'bin_high': edges[1:][filled].tolist(),
+                'n': cell_n[g][filled].tolist(),
+                'mean_confidence': (mean_p[g][filled] * 100.0).tolist(),
+                'hit_rate': hit_rate[g][filled].tolist(),
+            },
+        })
+    report.sort(key=lambda row: -row['n'])
+    return report
+
+
+# =============================================================================
+# MAPARE IZOTONICĂ (PAV) APLICABILĂ DE ANALIZOR
+# =============================================================================
+
+class IsotonicCalibration:
+    """
+    Mapare monotonă încredere (0-100) -> probabilitate de câștig, prin Pool-Adjacent-Violators:
+    1. ✅ Încrederea e rotunjită la `resolution` (≤ 1001 niveluri), deci PAV rulează pe niveluri, nu pe rânduri
+    2. ✅ Aplicare vectorizată (np.interp între niveluri, constantă în afara intervalului văzut)
+    3. ✅ to_dict() / from_dict() pentru salvarea ca JSON
+    """
+
+    __slots__ = ('x', 'y', 'n')
+
+    def __init__(self, x, y, n):
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+        self.n = int(n)
+
+    @classmethod
+    def fit(cls, confidence, hit, resolution=0.1):
+        confidence = np.asarray(confidence, dtype=np.float64)
+        hit = np.asarray(hit, dtype=np.float64)
+        mask = ~np.isnan(hit) & ~np.isnan(confidence)
+        if not mask.any():
+            raise ValueError("Nu există rânduri decontate pentru calibrare")
+        levels, inverse = np.unique(np.round(confidence[mask] / resolution) * resolution, return_inverse=True)
+        weights = np.bincount(inverse, minlength=len(levels)).astype(np.float64)
+        sums = np.bincount(inverse, weights=hit[mask], minlength=len(levels))
+
+        # PAV: blocuri (medie, pondere, nivel de început) unite cât timp media scade
+        block_mean, block_weight, block_start = [], [], []
+        for i in range(len(levels)):
+            mean, weight, start = sums[i] / weights[i], weights[i], i
+            while block_mean and block_mean[-1] >= mean:
+                previous_weight = block_weight.pop()
+                mean = (block_mean.pop() * previous_weight + mean * weight) / (previous_weight + weight)
+                weight += previous_weight
+                start = block_start.pop()
+            block_mean.append(mean)
+            block_weight.append(weight)
+            block_start.append(start)
+
+        fitted = np.empty(len(levels))
+        bounds = block_start + [len(levels)]
+        for mean, start, stop in zip(block_mean, bounds[:-1], bounds[1:]):
+            fitted[start:stop] = mean
+        return cls(levels, fitted, mask.sum())
+
+    def __call__(self, confidence):
+        """Probabilitatea calibrată (0-1) pentru o încredere sau un array de încrederi."""
+        return np.interp(confidence, self.x, self.y)
+
+    def to_dict(self):
+        return {'x': self.x.tolist(), 'y': self.y.tolist(), 'n': self.n}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['x'], data['y'], data['n'])
+
+
+class CalibrationMap:
+    """Mapări izotonice per market, cu mapare globală ('*') pentru market-urile fără date suficiente."""
+
+    GLOBAL = '*'
+
+    def __init__(self, curves):
+        if self.GLOBAL not in curves:
+            raise ValueError("CalibrationMap necesită o mapare globală ('*')")
+        self.curves = curves
+
+    @classmethod
+    def fit(cls, archive, by_market=True, min_rows=500, resolution=0.1):
+        mask = archive.settled()
+        curves = {cls.GLOBAL: IsotonicCalibration.fit(archive.confidence[mask], archive.hit[mask], resolution)}
+        if by_market:
+            codes = archive.codes['market'][mask]
+            counts = np.bincount(codes, minlength=len(archive.vocab['market']))
+            for code in np.flatnonzero(counts >= min_rows):
+                rows = codes == code
+                curves[str(archive.vocab['market'][code])] = IsotonicCalibration.fit(
+                    archive.confidence[mask][rows], archive.hit[mask][rows], resolution)
+        return cls(curves)
+
+    def probability(self, confidence, market=None):
+        """Probabilitatea calibrată (0-1); maparea market-ului dacă există, altfel cea globală."""
+        return float(self.curves.get(market, self.curves[self.GLOBAL])(confidence))
+
+    def to_dict(self):
+        return {market: curve.to_dict() for market, curve in self.curves.items()}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls({market: IsotonicCalibration.from_dict(curve) for market, curve in data.items()})
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def _print_report(report, by):
+    header = ' '.join(f'{field:>12}' for field in by)
+    print(f"{header} {'n':>9} {'încr. %':>8} {'câștig %':>9} {'Brier':>7} {'ECE':>7}")
+    for row in report:
+        labels = ' '.join(f'{row[field]:>12}' for field in by)
+        print(f"{labels} {row['n']:>9} {row['mean_confidence']:>8.1f} {row['hit_rate'] * 100:>9.1f} "
+              f"{row['brier']:>7.4f} {row['ece']:>7.4f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Rapoarte de calibrare a încrederii pe arhiva decontată.')
+    parser.add_argument('archive', help='Arhiva columnară (.npz / .parquet / .csv cu confidence, hit sau outcome)')
+    parser.add_argument('--by', nargs='*', default=['league', 'market'], choices=GROUP_FIELDS)
+    parser.add_argument('--bins', type=int, default=10)
+    parser.add_argument('--output', help='Scrie raportul complet (cu curbele de fiabilitate) în acest fișier JSON')
+    parser.add_argument('--fit', help='Potrivește maparea izotonică și o salvează în acest fișier JSON')
+    parser.add_argument('--min-rows', type=int, default=500, help='Rânduri minime pentru o mapare per market')
+    args = parser.parse_args(argv)
+
+    archive = CalibrationArchive.load(args.archive)
+    report = calibration_report(archive, by=args.by, bins=args.bins)
+    _print_report(report, args.by)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.fit:
+        calibration = CalibrationMap.fit(archive, min_rows=args.min_rows)
+        calibration.save(args.fit)
+        print(f"✅ Mapare izotonică salvată în {args.fit} ({', '.join(calibration.curves)})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,229 @@
+import math
+import numpy as np
+from HybridAnalyzerV73 import MARKET_REGISTRY, HybridAnalyzerV73, ladder_line_names, ladder_order, split_market_key
+
+# =============================================================================
+# REZULTAT COMPACT (__slots__) CU DETALII LAZY ȘI MOD SUMAR
+# =============================================================================
+
+LINE_ORDER = tuple(ladder_line_names(3))  # ladder-ul standard (7 linii)
+MARKETS = ('TOTAL', 'HANDICAP')
+
+
+def market_fields(market):
+    """Câmpurile unei linii pentru orice market din registru (line + open/close pe cele două direcții)."""
+    dir_keys = MARKET_REGISTRY[market.upper()].dir_keys
+    return ('line',) + tuple(f'{key}_{field}' for key in dir_keys for field in ('open', 'close'))
+
+
+def pack_ladder(lines, market):
+    """
+    Un ladder (orice lungime) ca array float64 (L, 5) în ordinea ladder_order,
+    plus cheile liniilor și open_line_value (NaN = lipsă).
+    """
+    lines = {k.lower(): v for k, v in lines.items()}
+    line_keys = tuple(ladder_order(lines))
+    packed = np.array([[lines[key][field] for field in market_fields(market)] for key in line_keys],
+                      dtype=np.float64)
+    open_line = lines['close'].get('open_line_value')
+    return packed, line_keys, np.nan if open_line is None else float(open_line)
+
+
+def unpack_ladder(packed, line_keys, open_line, market):
+    """Inversul lui pack_ladder: ladder-ul ca dict."""
+    lines = {}
+    for line_key, row in zip(line_keys, packed):
+        lines[line_key] = {field: float(v) for field, v in zip(market_fields(market), row)}
+    if not math.isnan(open_line):
+        lines['close']['open_line_value'] = float(open_line)
+    return lines
+
+
+def pack_markets(markets, line_keys=None):
+    """
+    Toate market-urile unui meci ({market: ladder}) stivuite ca (M, L, 5) pe reuniunea liniilor
+    (NaN unde market-ul nu cotează linia) + open_line_value (M,) + cheile liniilor.
+    `line_keys` fixează axa liniilor (ex. reuniunea pe tot batch-ul).
+    """
+    packed = [pack_ladder(lines, market) for market, lines in markets.items()]
+    if line_keys is None:
+        line_keys = ladder_order({key for _, keys, _ in packed for key in keys})
+    position = {key: i for i, key in enumerate(line_keys)}
+    stacked = np.full((len(packed), len(position), 5), np.nan)
+    for m, (ladder, keys, _) in enumerate(packed):
+        if not set(keys) <= position.keys():
+            raise ValueError(f"Linii în afara axei comune: {sorted(set(keys) - position.keys())}")
+        stacked[m, [position[key] for key in keys]] = ladder
+    return stacked, np.array([open_line for _, _, open_line in packed]), tuple(line_keys)
+
+
+def pack_match(total_lines, handicap_lines, markets=None):
+    """
+    Toate market-urile unui meci (TOTAL, HANDICAP + `markets` suplimentare) prin pack_markets:
+    (M, L, 5) pe reuniunea liniilor, NaN unde ladder-ul unui market e mai scurt. Returnează și numele market-urilor.
+    """
+    match_markets = {'TOTAL': total_lines, 'HANDICAP': handicap_lines,
+                     **{name.upper(): lines for name, lines in (markets or {}).items()}}
+    ladders, open_lines, line_keys = pack_markets(match_markets)
+    return ladders, open_lines, line_keys, tuple(match_markets)
+
+
+class CompactPrediction:
+    """
+    Rezultat compact al generate_prediction:
+    1. ✅ Câmpurile scalare stocate plat în __slots__ (decizie, linie, cotă, încredere, KLD, Steam)
+    2. ✅ Ladder-ele păstrate ca array-uri float64 compacte per market (orice lungime, fără dict-uri imbricate)
+    3. ✅ 'details' construit DOAR la prima citire (re-analiză deterministă din ladder-ele compacte)
+    4. ✅ Compatibil cu accesul de tip dict (result['decision'], result.get(...), to_dict())
+    """
+
+    __slots__ = (
+        'league', 'home_team', 'away_team',
+        'decision', 'market', 'direction_initial', 'direction_final',
+        'line_original', 'line_buffered', 'cota', 'source', 'reason',
+        'confidence', 'v7_action',
+        'conf_total_over', 'conf_total_under', 'conf_handicap_home', 'conf_handicap_away',
+        'kld_total', 'kld_handicap', 'steam_total', 'steam_handicap',
+        '_markets', '_ladders', '_line_keys', '_open_lines', '_details'
+    )
+
+    # Câmpurile de top ale predicției PLAY (în ordinea generate_prediction)
+    PLAY_FIELDS = ('decision', 'market', 'direction_initial', 'direction_final', 'line_original',
+                   'line_buffered', 'cota', 'source', 'reason', 'confidence', 'v7_action')
+
+    def __init__(self, league, home_team, away_team, ladders, line_keys, open_lines, markets=MARKETS):
+        """`ladders` / `line_keys` / `open_lines`: câte unul per market din `markets` (vezi pack_ladder)."""
+        self.league = league
+        self.home_team = home_team
+        self.away_team = away_team
+        self._markets = tuple(markets)
+        self._ladders = tuple(ladders)
+        self._line_keys = tuple(line_keys)
+        self._open_lines = tuple(open_lines)
+        self._details = None
+        self.decision = 'SKIP'
+        self.market = self.direction_initial = self.direction_final = None
+        self.line_original = self.line_buffered = self.cota = None
+        self.source = None
+        self.reason = ''
+        self.confidence = 0.0
+        self.v7_action = None
+
+    @classmethod
+    def from_analyzer(cls, analyzer):
+        """Construiește rezultatul direct din etapele analizorului (fără dict-ul 'details')."""
+        packed = [pack_ladder(lines, market) for market, lines in analyzer.MARKETS.items()]
+        result = cls(analyzer.LEAGUE, analyzer.HOME_TEAM, analyzer.AWAY_TEAM, *zip(*packed), markets=analyzer.MARKETS)
+
+        matrix = analyzer.confidence_matrix
+        result.conf_total_over = matrix['TOTAL_OVER']
+        result.conf_total_under = matrix['TOTAL_UNDER']
+        result.conf_handicap_home = matrix['HANDICAP_HOME']
+        result.conf_handicap_away = matrix['HANDICAP_AWAY']
+        result.kld_total = analyzer._kld_scores['TOTAL']['max']
+        result.kld_handicap = analyzer._kld_scores['HANDICAP']['max']
+        steam = analyzer.steam_detection
+        result.steam_total = steam['TOTAL']['direction'] if steam['TOTAL'] else None
+        result.steam_handicap = steam['HANDICAP']['direction'] if steam['HANDICAP'] else None
+
+        final_decision = analyzer._select_final_decision()
+        result.reason = final_decision['reason']
+        result.confidence = final_decision['confidence']
+        if final_decision['type'].startswith('SKIP'):
+            result._details = {}
+            return result
+
+        market, direction = split_market_key(final_decision['key'])
+        optimal_line = analyzer._select_optimal_line_FIXED(market, direction, final_decision['type'])
+        result.decision = 'PLAY'
+        result.market = market
+        result.direction_initial = direction
+        result.direction_final = optimal_line['final_direction']
+        result.line_original = optimal_line['line_original']
+        result.line_buffered = optimal_line['line']
+        result.cota = optimal_line['cota']
+        result.source = optimal_line['source']
+        result.reason = optimal_line['reason']
+        result.v7_action = final_decision['type']
+        return result
+
+    def market_ladders(self):
+        """Toate ladder-ele stocate, {market: ladder}, reconstruite din forma compactă."""
+        return {market: unpack_ladder(packed, line_keys, open_line, market) for market, packed, line_keys, open_line
+                in zip(self._markets, self._ladders, self._line_keys, self._open_lines)}
+
+    def ladders(self):
+        """Ladder-ele originale (total_lines, handicap_lines) reconstruite din forma compactă."""
+        ladders = self.market_ladders()
+        return ladders['TOTAL'], ladders['HANDICAP']
+
+    def analyzer(self, build_reasoning=True):
+        """Un HybridAnalyzerV73 nou pe ladder-ele stocate (inclusiv market-urile suplimentare)."""
+        ladders = self.market_ladders()
+        total_lines, handicap_lines = ladders.pop('TOTAL'), ladders.pop('HANDICAP')
+        return HybridAnalyzerV73(self.league, self.home_team, self.away_team, total_lines, handicap_lines,
+                                 build_reasoning=build_reasoning, markets=ladders)
+
+    @property
+    def details(self):
+        """Arborele complet de detalii (identic cu generate_prediction), construit la prima citire."""
+        if self._details is None:
+            analyzer = self.analyzer()
+            self._details = {
+                'consensus_score': analyzer.consensus_score,
+                'steam_detection': analyzer.steam_detection,
+                'gradient_analysis': analyzer.gradient_analysis,
+                'manipulation_flags': analyzer.manipulation_flags,
+                'entropy_alerts': analyzer.entropy_alerts,
+                'historic_analysis': analyzer.historic_analysis,
+                'kld_scores': analyzer._kld_scores,
+                'confidence_matrix': analyzer.confidence_matrix,
+                'score_data': analyzer._score_data
+            }
+        return self._details
+
+    def release_details(self):
+        """Eliberează detaliile materializate (se reconstruiesc la următoarea citire)."""
+        if self.decision == 'PLAY':
+            self._details = None
+
+    def to_dict(self, with_details=True):
+        """Dict-ul în formatul generate_prediction."""
+        if self.decision != 'PLAY':
+            result = {'decision': 'SKIP', 'reason': self.reason, 'confidence': self.confidence}
+        else:
+            result = {field: getattr(self, field) for field in self.PLAY_FIELDS}
+        if with_details:
+            result['details'] = self.details if self.decision == 'PLAY' else {}
+        return result
+
+    # Acces de tip dict, pentru codul care folosea rezultatul generate_prediction
+    def __getitem__(self, key):
+        if key == 'details':
+            return self.details if self.decision == 'PLAY' else {}
+        if key in self.PLAY_FIELDS and (self.decision == 'PLAY' or key in ('decision', 'reason', 'confidence')):
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __repr__(self):
+        if self.decision != 'PLAY':
+            return f"CompactPrediction(SKIP, confidence={self.confidence:.1f})"
+        return (f"CompactPrediction(PLAY {self.market} {self.direction_final} {self.line_buffered}, "
+                f"confidence={self.confidence:.1f}, action={self.v7_action})")
+
+
+def analyze_compact(league, home_team, away_team, total_lines_data, handicap_lines_data, summary_only=True,
+                    markets=None):
+    """
+    Analiză cu rezultat compact. `summary_only` = fără texte explicative (reason gol);
+    'details' se reconstruiește oricum complet, la cerere.
+    """
+    analyzer = HybridAnalyzerV73(league, home_team, away_team, total_lines_data, handicap_lines_data,
+                                 build_reasoning=not summary_only, markets=markets)
+    return CompactPrediction.from_analyzer(analyzer)
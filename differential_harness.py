@@ -0,0 +1,395 @@
+import argparse
+import copy
+import json
+import math
+import sys
+import numpy as np
+from HybridAnalyzerV73 import MARKET_REGISTRY, HybridAnalyzerV73
+from batch_analyzer import BatchAnalyzerV73
+from compact_result import analyze_compact
+from live_analyzer import LiveAnalyzerV73
+from synthetic_ladders import LINE_KEYS, generate_match, generate_slate
+
+# =============================================================================
+# HARNESS DIFERENȚIAL: ANALIZORUL DE REFERINȚĂ vs. MOTOARELE OPTIMIZATE
+# =============================================================================
+
+MARKET_LADDERS = {'TOTAL': 'total_lines', 'HANDICAP': 'handicap_lines'}
+MARKET_SIDES = {market: MARKET_REGISTRY[market].dir_keys for market in MARKET_LADDERS}
+
+# Motoare înregistrate: nume -> funcție(meci) -> rezultatul generate_prediction
+ENGINES = {}
+# Motoare care nu produc arborele 'details' (comparate doar pe decizie)
+SUMMARY_ENGINES = set()
+REFERENCE_ENGINE = 'reference'
+
+
+def register_engine(name, engine_fn, summary_only=False):
+    """Înregistrează un motor; `engine_fn(match)` primește dict-ul meciului și întoarce predicția."""
+    ENGINES[name] = engine_fn
+    if summary_only:
+        SUMMARY_ENGINES.add(name)
+    return engine_fn
+
+
+def match_ladders(match):
+    """Toate ladder-ele meciului, {market: ladder}: TOTAL, HANDICAP + market-urile suplimentare (match['markets'])."""
+    ladders = {market: match[ladder_key] for market, ladder_key in MARKET_LADDERS.items()}
+    ladders.update({name.upper(): lines for name, lines in (match.get('markets') or {}).items()})
+    return ladders
+
+
+def reference_engine(match):
+    """HybridAnalyzerV73.generate_prediction (sursa adevărului)."""
+    analyzer = HybridAnalyzerV73(
+        match['league'], match['home_team'], match['away_team'],
+        match['total_lines'], match['handicap_lines'], markets=match.get('markets')
+    )
+    return analyzer.generate_prediction()
+
+
+def live_replay_engine(match):
+    """
+    LiveAnalyzerV73: pornește cu close = open pe toate liniile și aplică tick-urile până la cotele close,
+    deci toate agregatele trec prin drumul incremental.
+    """
+    ladders = match_ladders(match)
+    opened = {}
+    for market, lines in ladders.items():
+        ladder = {}
+        for line_key, data in lines.items():
+            data = dict(data)
+            for side in MARKET_REGISTRY[market].dir_keys:
+                data[f'{side}_close'] = data[f'{side}_open']
+            ladder[line_key] = data
+        opened[market] = ladder
+
+    total_lines, handicap_lines = opened.pop('TOTAL'), opened.pop('HANDICAP')
+    analyzer = LiveAnalyzerV73(
+        match['league'], match['home_team'], match['away_team'],
+        total_lines, handicap_lines, markets=opened
+    )
+    for market, lines in ladders.items():
+        for line_key in analyzer.LADDERS[market]['order']:
+            for side in MARKET_REGISTRY[market].dir_keys:
+                analyzer.apply_tick(market, line_key, side, lines[line_key][f'{side}_close'])
+    return analyzer.generate_prediction()
+
+
+def compact_engine(match):
+    """CompactPrediction (cu texte explicative) materializat înapoi în dict, inclusiv 'details' lazy."""
+    return analyze_compact(
+        match['league'], match['home_team'], match['away_team'],
+        match['total_lines'], match['handicap_lines'], summary_only=False, markets=match.get('markets')
+    ).to_dict()
+
+
+def batch_engine(match):
+    """BatchAnalyzerV73 pe un batch de un meci (doar decizia, fără 'details')."""
+    return BatchAnalyzerV73.from_matches([match]).prediction(0)
+
+
+register_engine(REFERENCE_ENGINE, reference_engine)
+register_engine('live_replay', live_replay_engine)
+register_engine('compact', compact_engine)
+register_engine('batch', batch_engine, summary_only=True)
+
+
+# -----------------------------------------------------------------------------
+# Comparare cu toleranță
+# -----------------------------------------------------------------------------
+
+def _is_number(value):
+    return isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, (bool, np.bool_))
+
+
+def first_difference(expected, actual, rel_tol=1e-9, abs_tol=1e-9, path='', summary_only=False):
+    """
+    Prima diferență între două rezultate, ca (cale, așteptat, obținut), sau None dacă sunt echivalente.
+    Numerele se compară cu math.isclose(rel_tol, abs_tol); restul exact.
+    `summary_only` ignoră arborele 'details' (compară doar decizia).
+    """
+    if _is_number(expected) and _is_number(actual):
+        if math.isclose(float(expected), float(actual), rel_tol=rel_tol, abs_tol=abs_tol):
+            return None
+        return path, expected, actual
+
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        keys = set(expected) | set(actual)
+        if summary_only and not path:
+            keys.discard('details')
+        for key in sorted(keys, key=str):
+            sub_path = f'{path}.{key}' if path else str(key)
+            if key not in expected or key not in actual:
+                return sub_path, expected.get(key, '<lipsă>'), actual.get(key, '<lipsă>')
+            diff = first_difference(expected[key], actual[key], rel_tol, abs_tol, sub_path)
+            if diff:
+                return diff
+        return None
+
+    if isinstance(expected, (list, tuple)) and isinstance(actual, (list, tuple)):
+        if len(expected) != len(actual):
+            return f'{path}.len', len(expected), len(actual)
+        for i, (a, b) in enumerate(zip(expected, actual)):
+            diff = first_difference(a, b, rel_tol, abs_tol, f'{path}[{i}]')
+            if diff:
+                return diff
+        return None
+
+    if isinstance(expected, (bool, np.bool_)) and isinstance(actual, (bool, np.bool_)):
+        return None if bool(expected) == bool(actual) else (path, expected, actual)
+
+    return None if expected == actual else (path, expected, actual)
+
+
+# -----------------------------------------------------------------------------
+# Cazuri limită (pragurile etapelor)
+# -----------------------------------------------------------------------------
+
+def _kld_open_odds(close_odds, target):
+    """Cota open pentru care KLD-ul pe linia close (p_close·ln(p_close/p_open)) este exact `target`."""
+    p_close = 1.0 / close_odds
+    return 1.0 / (p_close * math.exp(-target / p_close))
+
+
+def edge_case_matches(seed=0, per_case=4):
+    """
+    Generează (etichetă, meci) pe pragurile analizorului: cota 1.85, mișcările 0.05 / 0.08,
+    gap-ul trap 0.20, mișcarea istorică 2.0 / 5.0, open_line_value lipsă, KLD lângă 0.03 / 0.06.
+    """
+    rng = np.random.default_rng(seed)
+    nudges = (0.0, 1e-12, -1e-12, 1e-9, -1e-9)
+    index = 0
+
+    def base():
+        nonlocal index
+        index += 1
+        return generate_match(rng, scenario='normal', index=index)
+
+    for _ in range(per_case):
+        market = ('TOTAL', 'HANDICAP')[int(rng.integers(2))]
+        side = MARKET_SIDES[market][int(rng.integers(2))]
+        ladder_key = MARKET_LADDERS[market]
+
+        for nudge in nudges:
+            # Consens: cota close exact pe pragul 1.85
+            match = base()
+            for line_key in LINE_KEYS:
+                match[ladder_key][line_key][f'{side}_close'] = 1.85 + nudge
+            yield f'consensus_odds_1.85{nudge:+g}_{market}_{side}', match
+
+            # Consens / Steam / Trap: diferențe exact pe praguri (cu și fără reprezentare exactă în float)
+            for label, threshold in (('consensus_move_0.05', 0.05), ('steam_0.08', 0.08)):
+                match = base()
+                for line_key in rng.choice(LINE_KEYS, size=int(rng.integers(3, 8)), replace=False):
+                    data = match[ladder_key][line_key]
+                    data[f'{side}_open'] = data[f'{side}_close'] + threshold + nudge
+                yield f'{label}{nudge:+g}_{market}_{side}', match
+
+            match = base()
+            close_odds = match[ladder_key]['close'][f'{side}_close']
+            for line_key in rng.choice([k for k in LINE_KEYS if k != 'close'], size=int(rng.integers(1, 4)), replace=False):
+                match[ladder_key][line_key][f'{side}_close'] = close_odds - 0.20 + nudge
+            yield f'trap_gap_0.20{nudge:+g}_{market}_{side}', match
+
+            # KLD pe zonele 0.03 / 0.06 (cota open pe linia close)
+            for target in (0.03, 0.06):
+                match = base()
+                data = match[ladder_key]['close']
+                data[f'{side}_open'] = _kld_open_odds(data[f'{side}_close'], target + nudge)
+                yield f'kld_{target}{nudge:+g}_{market}_{side}', match
+
+        # Mișcare istorică exact pe pragurile 2.0 (conflict) și 5.0 (penalizare TOTAL)
+        for threshold in (2.0, 5.0):
+            for sign in (1.0, -1.0):
+                match = base()
+                close_line = match[ladder_key]['close']['line']
+                match[ladder_key]['close']['open_line_value'] = close_line - sign * threshold
+                yield f'historic_{sign * threshold:+g}_{market}', match
+
+        # Date lipsă: fără open_line_value pe un market sau pe ambele
+        for markets in (('TOTAL',), ('HANDICAP',), ('TOTAL', 'HANDICAP')):
+            match = base()
+            for m in markets:
+                match[MARKET_LADDERS[m]]['close'].pop('open_line_value', None)
+            yield f'missing_open_line_value_{"_".join(markets)}', match
+
+
+# -----------------------------------------------------------------------------
+# Reproducer minim
+# -----------------------------------------------------------------------------
+
+def _diverges(match, engine_a, engine_b, rel_tol, abs_tol, summary_only):
+    try:
+        return first_difference(engine_a(copy.deepcopy(match)), engine_b(copy.deepcopy(match)),
+                                rel_tol, abs_tol, summary_only=summary_only) is not None
+    except Exception:
+        return True
+
+
+def minimize_match(match, engine_a, engine_b, rel_tol=1e-9, abs_tol=1e-9, summary_only=False):
+    """
+    Reduce greedy meciul divergent: neutralizează pe rând mișcările open → close (open = close)
+    și scoate open_line_value, păstrând doar modificările care mențin divergența.
+    """
+    current = copy.deepcopy(match)
+    for market in match_ladders(match):
+        if 'open_line_value' in match_ladders(current)[market]['close']:
+            candidate = copy.deepcopy(current)
+            match_ladders(candidate)[market]['close'].pop('open_line_value')
+            if _diverges(candidate, engine_a, engine_b, rel_tol, abs_tol, summary_only):
+                current = candidate
+
+        for line_key in list(match_ladders(current)[market]):
+            for side in MARKET_REGISTRY[market].dir_keys:
+                data = match_ladders(current)[market][line_key]
+                if data[f'{side}_open'] == data[f'{side}_close']:
+                    continue
+                candidate = copy.deepcopy(current)
+                match_ladders(candidate)[market][line_key][f'{side}_open'] = data[f'{side}_close']
+                if _diverges(candidate, engine_a, engine_b, rel_tol, abs_tol, summary_only):
+                    current = candidate
+    return current
+
+
+def _to_jsonable(value):
+    if isinstance(value, dict):
+        return {str(k): _to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_jsonable(v) for v in value]
+    if isinstance(value, (np.bool_,)):
+        return bool(value)
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return float(value)
+    return value
+
+
+# -----------------------------------------------------------------------------
+# Harness
+# -----------------------------------------------------------------------------
+
+class DifferentialHarness:
+    """
+    Harness diferențial pentru motoarele analizorului:
+    1. ✅ Rulează fiecare motor înregistrat pe aceleași meciuri (aleatoare + cazuri limită)
+    2. ✅ Compară cu motorul de referință, cu toleranță configurabilă pe float-uri
+    3. ✅ Raportează prima divergență cu un reproducer minim (JSON, gata de rulat)
+    """
+
+    def __init__(self, engines=None, rel_tol=1e-9, abs_tol=1e-9, summary_only=False, minimize=True):
+        names = list(engines) if engines else list(ENGINES)
+        if REFERENCE_ENGINE not in names:
+            names.insert(0, REFERENCE_ENGINE)
+        unknown = [n for n in names if n not in ENGINES]
+        if unknown:
+            raise ValueError(f"Motoare neînregistrate: {unknown}")
+        self.engines = {name: ENGINES[name] for name in names}
+        self.rel_tol = rel_tol
+        self.abs_tol = abs_tol
+        self.summary_only = summary_only
+        self.minimize = minimize
+
+    def check(self, match, label=''):
+        """Verifică un meci; întoarce divergența (dict) sau None."""
+        reference = self.engines[REFERENCE_ENGINE]
+        expected = reference(copy.deepcopy(match))
+        for name, engine in self.engines.items():
+            if name == REFERENCE_ENGINE:
+                continue
+            summary_only = self.summary_only or name in SUMMARY_ENGINES
+            try:
+                actual = engine(copy.deepcopy(match))
+            except Exception as e:
+                diff = ('<excepție>', None, f'{type(e).__name__}: {e}')
+            else:
+                diff = first_difference(expected, actual, self.rel_tol, self.abs_tol, summary_only=summary_only)
+            if diff is None:
+                continue
+
+            reproducer = match
+            if self.minimize:
+                reproducer = minimize_match(match, reference, engine, self.rel_tol, self.abs_tol, summary_only)
+                minimized = first_difference(reference(copy.deepcopy(reproducer)), engine(copy.deepcopy(reproducer)),
+                                             self.rel_tol, self.abs_tol, summary_only=summary_only)
+                diff = minimized or diff
+            return {
+                'engine': name,
+                'label': label,
+                'path': diff[0],
+                'expected': _to_jsonable(diff[1]),
+                'actual': _to_jsonable(diff[2]),
+                'reproducer': _to_jsonable(reproducer),
+            }
+        return None
+
+    def run(self, matches, stop_on_first=True):
+        """
+        Rulează harness-ul pe (etichetă, meci). Se oprește la prima divergență (implicit).
+        Returnează {'checked', 'divergences'}.
+        """
+        checked, divergences = 0, []
+        for label, match in matches:
+            checked += 1
+            divergence = self.check(match, label)
+            if divergence:
+                divergences.append(divergence)
+                if stop_on_first:
+                    break
+        return {'checked': checked, 'divergences': divergences}
+
+
+def default_matches(n_random=1000, seed=0, edge_cases=True, n_per_side=3, extra_markets=()):
+    """
+    Cazurile limită urmate de n_random meciuri sintetice (ladder-e cu n_per_side linii de fiecare parte,
+    plus market-urile `extra_markets` din MARKET_REGISTRY).
+    """
+    if edge_cases:
+        yield from edge_case_matches(seed)
+    for i, match in enumerate(generate_slate(n_random, seed=seed, n_per_side=n_per_side, extra_markets=extra_markets)):
+        yield f"random_{i}_{match['scenario']}", match
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Testare diferențială a motoarelor HybridAnalyzerV73.')
+    parser.add_argument('--random', type=int, default=1000, help='Număr de meciuri aleatoare')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--engines', help=f'Motoare separate prin virgulă (implicit toate: {",".join(ENGINES)})')
+    parser.add_argument('--rel-tol', type=float, default=1e-9)
+    parser.add_argument('--abs-tol', type=float, default=1e-9)
+    parser.add_argument('--summary-only', action='store_true', help="Compară doar decizia, fără 'details'")
+    parser.add_argument('--no-edge-cases', action='store_true')
+    parser.add_argument('--lines-per-side', type=int, default=3, help='Linii alternative de fiecare parte a close')
+    parser.add_argument('--markets', help='Market-uri suplimentare separate prin virgulă (ex. H1_TOTAL,Q1_HANDICAP)')
+    parser.add_argument('--all', action='store_true', help='Continuă după prima divergență')
+    parser.add_argument('--reproducer', help='Scrie prima divergență (cu reproducer) în acest fișier JSON')
+    args = parser.parse_args(argv)
+
+    harness = DifferentialHarness(
+        engines=args.engines.split(',') if args.engines else None,
+        rel_tol=args.rel_tol, abs_tol=args.abs_tol, summary_only=args.summary_only
+    )
+    extra_markets = tuple(name.strip().upper() for name in args.markets.split(',')) if args.markets else ()
+    matches = default_matches(args.random, args.seed, not args.no_edge_cases, args.lines_per_side, extra_markets)
+    report = harness.run(matches, stop_on_first=not args.all)
+
+    print(f"Motoare: {', '.join(harness.engines)} | meciuri verificate: {report['checked']}")
+    if not report['divergences']:
+        print('✅ Nicio divergență')
+        return 0
+
+    first = report['divergences'][0]
+    print(f"❌ {len(report['divergences'])} divergențe. Prima: motor={first['engine']} caz={first['label']}")
+    print(f"   {first['path']}: referință={first['expected']!r} vs {first['actual']!r}")
+    if args.reproducer:
+        with open(args.reproducer, 'w') as f:
+            json.dump(first, f, indent=2, ensure_ascii=False)
+        print(f"   Reproducer: {args.reproducer}")
+    else:
+        print(json.dumps(first['reproducer'], ensure_ascii=False))
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,173 @@
+import os
+import sys
+import threading
+import time
+from functools import wraps
+from HybridAnalyzerV73 import HybridAnalyzerV73
+
+# =============================================================================
+# INSTRUMENTARE PER ETAPĂ (TIMP, ALOCĂRI) CU EXPORT DICT / PROMETHEUS
+# =============================================================================
+
+# Etapa -> metoda analizorului
+STAGES = {
+    'consensus': '_calculate_consensus_score',
+    'steam': '_detect_steam_moves',
+    'gradient': '_analyze_line_gradient',
+    'manipulation': '_detect_manipulation',
+    'entropy': '_analyze_entropy',
+    'historic': '_analyze_historic_movement',
+    'score_components': '_calculate_score_components',
+    # Scorurile unui singur market (apelat de score_components și direct de LiveAnalyzerV73 la fiecare tick)
+    'market_score_components': '_market_score_components',
+    'kld': '_calculate_kl_divergence_FIXED',
+    'final_decision': '_select_final_decision',
+    'line_selection': '_select_optimal_line_FIXED',
+}
+
+# Limitele histogramei de timp (secunde), în stil Prometheus
+DEFAULT_BUCKETS = (5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 1e-2, 1e-1)
+
+
+class _StageStats:
+    __slots__ = ('calls', 'seconds_sum', 'seconds_max', 'bucket_counts', 'alloc_blocks_sum', 'alloc_blocks_max')
+
+    def __init__(self, n_buckets):
+        self.calls = 0
+        self.seconds_sum = 0.0
+        self.seconds_max = 0.0
+        self.bucket_counts = [0] * (n_buckets + 1)  # ultimul = +Inf
+        self.alloc_blocks_sum = 0
+        self.alloc_blocks_max = 0
+
+
+class StageProfiler:
+    """
+    Profiler opțional pentru etapele HybridAnalyzerV73:
+    1. ✅ Număr de apeluri, histogramă de timp (wall) și blocuri de memorie alocate per etapă
+    2. ✅ Export ca dict Python și în format text Prometheus
+    3. ✅ Dezactivat = metodele originale ale clasei (overhead zero, poate rămâne în producție)
+    """
+
+    def __init__(self, analyzer_cls=HybridAnalyzerV73, stages=None, buckets=DEFAULT_BUCKETS):
+        self.analyzer_cls = analyzer_cls
+        self.stages = dict(stages or STAGES)
+        self.buckets = tuple(buckets)
+        self._originals = {}
+        self._lock = threading.Lock()
+        self.reset()
+
+    @property
+    def enabled(self):
+        return bool(self._originals)
+
+    def reset(self):
+        with self._lock:
+            self._stats = {stage: _StageStats(len(self.buckets)) for stage in self.stages}
+
+    def _record(self, stage, elapsed, blocks):
+        stats = self._stats[stage]
+        i = 0
+        while i < len(self.buckets) and elapsed > self.buckets[i]:
+            i += 1
+        with self._lock:
+            stats.calls += 1
+            stats.seconds_sum += elapsed
+            stats.seconds_max = max(stats.seconds_max, elapsed)
+            stats.bucket_counts[i] += 1
+            stats.alloc_blocks_sum += blocks
+            stats.alloc_blocks_max = max(stats.alloc_blocks_max, blocks)
+
+    def _wrap(self, stage, method):
+        record = self._record
+        perf_counter = time.perf_counter
+        allocated_blocks = sys.getallocatedblocks
+
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            blocks_before = allocated_blocks()
+            started = perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                elapsed = perf_counter() - started
+                record(stage, elapsed, allocated_blocks() - blocks_before)
+        return wrapper
+
+    def enable(self):
+        """Înlocuiește metodele etapelor cu variante instrumentate (pe clasă, deci și pe subclase)."""
+        if self.enabled:
+            return
+        for stage, method_name in self.stages.items():
+            original = self.analyzer_cls.__dict__[method_name]
+            self._originals[method_name] = original
+            setattr(self.analyzer_cls, method_name, self._wrap(stage, original))
+
+    def disable(self):
+        """Restaurează metodele originale."""
+        for method_name, original in self._originals.items():
+            setattr(self.analyzer_cls, method_name, original)
+        self._originals = {}
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+    def __exit__(self, *exc):
+        self.disable()
+
+    def to_dict(self):
+        """Statisticile per etapă ca dict Python."""
+        result = {}
+        with self._lock:
+            for stage, stats in self._stats.items():
+                cumulative, buckets = 0, {}
+                for bound, count in zip(self.buckets + (float('inf'),), stats.bucket_counts):
+                    cumulative += count
+                    buckets['+Inf' if bound == float('inf') else repr(bound)] = cumulative
+                result[stage] = {
+                    'calls': stats.calls,
+                    'seconds_sum': stats.seconds_sum,
+                    'seconds_max': stats.seconds_max,
+                    'seconds_mean': stats.seconds_sum / stats.calls if stats.calls else 0.0,
+                    'seconds_buckets': buckets,
+                    'alloc_blocks_sum': stats.alloc_blocks_sum,
+                    'alloc_blocks_max': stats.alloc_blocks_max
+                }
+        return result
+
+    def to_prometheus(self, prefix='hybrid_analyzer_stage'):
+        """Statisticile în format text Prometheus (histogramă de timp + contoare)."""
+        data = self.to_dict()
+        lines = [
+            f"# HELP {prefix}_seconds Timpul de execuție per etapă a analizorului.",
+            f"# TYPE {prefix}_seconds histogram",
+        ]
+        for stage, stats in data.items():
+            for bound, count in stats['seconds_buckets'].items():
+                lines.append(f'{prefix}_seconds_bucket{{stage="{stage}",le="{bound}"}} {count}')
+            lines.append(f'{prefix}_seconds_sum{{stage="{stage}"}} {stats["seconds_sum"]!r}')
+            lines.append(f'{prefix}_seconds_count{{stage="{stage}"}} {stats["calls"]}')
+
+        lines.append(f"# HELP {prefix}_calls_total Numărul de apeluri per etapă.")
+        lines.append(f"# TYPE {prefix}_calls_total counter")
+        for stage, stats in data.items():
+            lines.append(f'{prefix}_calls_total{{stage="{stage}"}} {stats["calls"]}')
+
+        lines.append(f"# HELP {prefix}_alloc_blocks_total Blocuri de memorie nete alocate per etapă, cumulat "
+                     f"(sys.getallocatedblocks).")
+        lines.append(f"# TYPE {prefix}_alloc_blocks_total counter")
+        for stage, stats in data.items():
+            lines.append(f'{prefix}_alloc_blocks_total{{stage="{stage}"}} {stats["alloc_blocks_sum"]}')
+
+        lines.append(f"# HELP {prefix}_alloc_blocks_max Maximul blocurilor nete alocate într-un singur apel al etapei.")
+        lines.append(f"# TYPE {prefix}_alloc_blocks_max gauge")
+        for stage, stats in data.items():
+            lines.append(f'{prefix}_alloc_blocks_max{{stage="{stage}"}} {stats["alloc_blocks_max"]}')
+        return '\n'.join(lines) + '\n'
+
+
+# Profiler implicit; activat la import cu HYBRID_ANALYZER_PROFILE=1
+PROFILER = StageProfiler()
+if os.environ.get('HYBRID_ANALYZER_PROFILE') == '1':
+    PROFILER.enable()
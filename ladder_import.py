@@ -0,0 +1,202 @@
+import csv
+import io
+import json
+from HybridAnalyzerV73 import MARKET_REGISTRY, ladder_order
+
+# =============================================================================
+# IMPORT ÎN BLOC AL LADDER-ELOR (CSV / JSON → total_lines_data / handicap_lines_data)
+# =============================================================================
+
+MATCH_FIELDS = ('league', 'home_team', 'away_team')
+# Cheile ladder-elor din dict-ul meciului / din documentele salvate (_save_decision_data)
+LADDER_ALIASES = {
+    'total_lines': ('total_lines', 'total_lines_data', 'All_Total_Lines'),
+    'handicap_lines': ('handicap_lines', 'handicap_lines_data', 'All_Handicap_Lines'),
+}
+SAVED_MATCH_FIELDS = {'league': 'League', 'home_team': 'HomeTeam', 'away_team': 'AwayTeam'}
+MIN_ODDS = 1.01
+
+
+class LadderImportError(ValueError):
+    """Datele importate nu pot fi transformate în ladder-e valide (mesajul indică meciul / rândul)."""
+
+
+def _number(value, where):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    text = str(value).strip().replace(',', '.')  # acceptă și zecimale cu virgulă (export Excel RO)
+    try:
+        return float(text)
+    except ValueError:
+        raise LadderImportError(f"{where}: valoare numerică invalidă {value!r}") from None
+
+
+def _normalize_ladder(lines, market, where):
+    """Un ladder {line_key: {câmpuri}} validat și convertit la float, în ordinea ladder-ului."""
+    if not isinstance(lines, dict) or not lines:
+        raise LadderImportError(f"{where}: ladder-ul {market} lipsește sau e gol")
+    spec = MARKET_REGISTRY[market]
+    fields = [f'{key}_{stage}' for key in spec.dir_keys for stage in ('open', 'close')]
+    lines = {str(key).strip().lower(): data for key, data in lines.items()}
+    try:
+        order = ladder_order(lines)
+    except ValueError as exc:
+        raise LadderImportError(f"{where}: {market}: {exc}") from None
+
+    ladder = {}
+    for key in order:
+        data = lines[key]
+        if not isinstance(data, dict):
+            raise LadderImportError(f"{where}: {market}/{key}: se așteaptă un obiect cu câmpurile liniei")
+        missing = [field for field in ('line', *fields) if data.get(field) in (None, '')]
+        if missing:
+            raise LadderImportError(f"{where}: {market}/{key}: lipsesc câmpurile {', '.join(missing)}")
+        entry = {'line': _number(data['line'], f"{where}: {market}/{key}/line")}
+        for field in fields:
+            odds = _number(data[field], f"{where}: {market}/{key}/{field}")
+            if odds < MIN_ODDS:
+                raise LadderImportError(f"{where}: {market}/{key}/{field}: cota {odds} sub {MIN_ODDS}")
+            entry[field] = odds
+        if key == 'close' and data.get('open_line_value') not in (None, ''):
+            entry['open_line_value'] = _number(data['open_line_value'], f"{where}: {market}/close/open_line_value")
+        ladder[key] = entry
+    return ladder
+
+
+def normalize_match(match, where='meci', defaults=None):
+    """
+    Un meci importat în forma analizorului: league / home_team / away_team + total_lines, handicap_lines
+    (+ markets={nume: ladder} pentru market-urile suplimentare). Acceptă și cheile documentelor salvate.
+    """
+    if not isinstance(match, dict):
+        raise LadderImportError(f"{where}: se așteaptă un obiect JSON")
+    defaults = defaults or {}
+    result = {}
+    for field in MATCH_FIELDS:
+        value = match.get(field, match.get(SAVED_MATCH_FIELDS[field], defaults.get(field)))
+        result[field] = str(value).strip().upper() if value not in (None, '') else None
+    for target, aliases in LADDER_ALIASES.items():
+        lines = next((match[alias] for alias in aliases if alias in match), None)
+        market = 'TOTAL' if target == 'total_lines' else 'HANDICAP'
+        result[target] = _normalize_ladder(lines, market, where)
+
+    extras = match.get('markets', match.get('All_Market_Lines')) or {}
+    if not isinstance(extras, dict):
+        raise LadderImportError(f"{where}: 'markets' trebuie să fie un obiect {{market: ladder}}")
+    markets = {}
+    for name, lines in extras.items():
+        name = str(name).strip().upper()
+        if name in ('TOTAL', 'HANDICAP'):
+            continue
+        if name not in MARKET_REGISTRY:
+            raise LadderImportError(f"{where}: market necunoscut {name}")
+        markets[name] = _normalize_ladder(lines, name, where)
+    if markets:
+        result['markets'] = markets
+    return result
+
+
+def parse_json(text, defaults=None):
+    """JSON: un meci, o listă de meciuri sau {'matches': [...]}."""
+    try:
+        payload = json.loads(text)
+    except json.JSONDecodeError as exc:
+        raise LadderImportError(f"JSON invalid: {exc}") from None
+    if isinstance(payload, dict) and isinstance(payload.get('matches'), list):
+        payload = payload['matches']
+    if isinstance(payload, dict):
+        return [normalize_match(payload, defaults=defaults)]
+    if not isinstance(payload, list) or not payload:
+        raise LadderImportError("JSON-ul trebuie să conțină un meci sau o listă nevidă de meciuri")
+    return [normalize_match(match, f'meciul {i + 1}', defaults) for i, match in enumerate(payload)]
+
+
+def parse_csv(text, defaults=None):
+    """
+    CSV „lung”: un rând per linie de ladder, coloanele
+    [league, home_team, away_team,] market, line_key, line, <dir>_open, <dir>_close [, open_line_value].
+    Direcțiile sunt cele ale market-ului (over/under, home/away); meciurile se grupează după
+    (league, home_team, away_team), iar coloanele lipsă iau valorile din `defaults`.
+    Separatorul (, ; tab) e detectat automat.
+    """
+    text = text.lstrip('\ufeff')
+    try:
+        dialect = csv.Sniffer().sniff(text[:4096], delimiters=',;\t')
+    except csv.Error:
+        dialect = csv.excel
+    reader = csv.DictReader(io.StringIO(text), dialect=dialect)
+    if not reader.fieldnames:
+        raise LadderImportError("CSV gol")
+    reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+    missing = [name for name in ('market', 'line_key', 'line') if name not in reader.fieldnames]
+    if missing:
+        raise LadderImportError(f"CSV: lipsesc coloanele {', '.join(missing)}")
+
+    defaults = defaults or {}
+    matches = {}
+    for row_number, row in enumerate(reader, start=2):
+        if not any((value or '').strip() for value in row.values() if isinstance(value, str)):
+            continue
+        key = tuple((row.get(field) or defaults.get(field) or '').strip().upper() for field in MATCH_FIELDS)
+        market = (row.get('market') or '').strip().upper()
+        if market not in MARKET_REGISTRY:
+            raise LadderImportError(f"CSV rândul {row_number}: market necunoscut {row.get('market')!r}")
+        line_key = (row.get('line_key') or '').strip().lower()
+        match = matches.setdefault(key, {'rows': {}, 'first_row': row_number})
+        ladder = match['rows'].setdefault(market, {})
+        if line_key in ladder:
+            raise LadderImportError(f"CSV rândul {row_number}: linia {market}/{line_key} apare de două ori")
+        ladder[line_key] = {field: value for field, value in row.items() if field and value not in (None, '')}
+
+    if not matches:
+        raise LadderImportError("CSV-ul nu conține rânduri de ladder")
+    result = []
+    for (league, home_team, away_team), match in matches.items():
+        ladders = match['rows']
+        raw = {
+            'league': league, 'home_team': home_team, 'away_team': away_team,
+            'total_lines': ladders.pop('TOTAL', None),
+            'handicap_lines': ladders.pop('HANDICAP', None),
+            'markets': ladders,
+        }
+        where = f"CSV meciul {home_team or '?'} vs {away_team or '?'} (de la rândul {match['first_row']})"
+        result.append(normalize_match(raw, where, defaults))
+    return result
+
+
+def parse_ladders(text, defaults=None, filename=None):
+    """Detectează formatul (după extensie sau conținut) și întoarce lista de meciuri normalizate."""
+    text = text.decode('utf-8-sig') if isinstance(text, bytes) else text
+    if not text or not text.strip():
+        raise LadderImportError("Nu au fost furnizate date")
+    if filename:
+        extension = filename.lower().rsplit('.', 1)[-1]
+        if extension == 'json':
+            return parse_json(text, defaults)
+        if extension in ('csv', 'tsv', 'txt'):
+            return parse_csv(text, defaults)
+    if text.lstrip()[:1] in ('{', '['):
+        return parse_json(text, defaults)
+    return parse_csv(text, defaults)
+
+
+def matches_to_csv(matches):
+    """Inversul lui parse_csv: meciurile ca CSV lung (șablon / export)."""
+    dir_keys = []
+    for spec in MARKET_REGISTRY.values():
+        dir_keys.extend(key for key in spec.dir_keys if key not in dir_keys)
+    columns = list(MATCH_FIELDS) + ['market', 'line_key', 'line'] + \
+        [f'{key}_{stage}' for key in dir_keys for stage in ('open', 'close')] + ['open_line_value']
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, lineterminator='\n')
+    writer.writeheader()
+    for match in matches:
+        ladders = {'TOTAL': match['total_lines'], 'HANDICAP': match['handicap_lines'], **(match.get('markets') or {})}
+        for market, lines in ladders.items():
+            for line_key in ladder_order(lines):
+                writer.writerow({
+                    **{field: match.get(field) or '' for field in MATCH_FIELDS},
+                    'market': market, 'line_key': line_key, **lines[line_key]
+                })
+    return buffer.getvalue()
+
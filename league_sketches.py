@@ -0,0 +1,239 @@
+import json
+import math
+import os
+import random
+import threading
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+
+# =============================================================================
+# SCHIȚE DE CUANTILE (KLL) PER LIGĂ PENTRU CARACTERISTICILE PIEȚEI
+# =============================================================================
+
+# Caracteristică -> semnalul din HybridAnalyzerV73.get_signals() (per market)
+FEATURES = {
+    'kld': 'kld_max',
+    'steam_move': 'steam_avg_move',
+    'gradient_uniformity': 'gradient_uniformity',
+    'entropy': 'entropy_min',
+}
+
+
+class KLLSketch:
+    """
+    Schiță KLL (Karnin-Lang-Liberty) pentru cuantile aproximative pe un flux:
+    1. ✅ Memorie limitată (~3·k valori), eroare de rang ~O(1/k) indiferent de lungimea fluxului
+    2. ✅ update() O(1) amortizat; merge() între schițe (ligi / procese / zile)
+    3. ✅ rank() / quantile() în O(log k) pe vederea sortată (reconstruită doar după modificări)
+    4. ✅ to_dict() / from_dict() pentru persistență
+    """
+
+    __slots__ = ('k', 'n', 'min', 'max', '_levels', '_rng', '_view', '_stored', '_limit')
+
+    C = 2.0 / 3.0  # raportul capacităților între niveluri consecutive
+
+    def __init__(self, k=200, seed=None):
+        self.k = k
+        self.n = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self._levels = [[]]  # nivelul h: valori cu ponderea 2**h
+        self._rng = random.Random(seed)
+        self._view = None    # (valori sortate, ponderi cumulate) - cache pentru interogări
+        self._stored = 0     # valori păstrate pe toate nivelurile
+        self._limit = self._max_size()
+
+    def _capacity(self, level):
+        depth = len(self._levels) - level - 1
+        return max(2, int(math.ceil(self.k * self.C ** depth)))
+
+    def _max_size(self):
+        return sum(self._capacity(level) for level in range(len(self._levels)))
+
+    def _compress(self):
+        """Compactează primul nivel plin: sortare + jumătate din valori (par / impar aleator) urcă un nivel."""
+        for level, items in enumerate(self._levels):
+            if len(items) >= self._capacity(level):
+                if level + 1 == len(self._levels):
+                    self._levels.append([])
+                    self._limit = self._max_size()
+                items.sort()
+                offset = self._rng.getrandbits(1)
+                # La număr impar, ultima valoare rămâne pe nivel (ponderea totală se conservă exact)
+                keep = [items.pop()] if len(items) % 2 else []
+                self._levels[level + 1].extend(items[offset::2])
+                self._stored -= len(items) // 2
+                self._levels[level] = keep
+                return
+
+    def update(self, value):
+        value = float(value)
+        if math.isnan(value):
+            return
+        self.n += 1
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        self._levels[0].append(value)
+        self._stored += 1
+        self._view = None
+        while self._stored >= self._limit:
+            self._compress()
+
+    def merge(self, other):
+        """Adaugă în această schiță conținutul altei schițe (același k)."""
+        while len(self._levels) < len(other._levels):
+            self._levels.append([])
+        self._limit = self._max_size()
+        for level, items in enumerate(other._levels):
+            self._levels[level].extend(items)
+        self._stored += other._stored
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._view = None
+        while self._stored >= self._limit:
+            self._compress()
+        return self
+
+    def _sorted_view(self):
+        if self._view is None:
+            pairs = sorted((value, 1 << level) for level, items in enumerate(self._levels) for value in items)
+            values = [value for value, _ in pairs]
+            cumulative = list(accumulate(weight for _, weight in pairs))
+            self._view = (values, cumulative)
+        return self._view
+
+    def rank(self, value):
+        """Fracțiunea fluxului sub `value` (egalitățile numărate pe jumătate), în [0, 1]."""
+        if self.n == 0:
+            return None
+        values, cumulative = self._sorted_view()
+        total = cumulative[-1]
+        lo = bisect_left(values, value)
+        hi = bisect_right(values, value)
+        below = cumulative[lo - 1] if lo else 0
+        equal = (cumulative[hi - 1] if hi else 0) - below
+        return (below + 0.5 * equal) / total
+
+    def percentile(self, value):
+        rank = self.rank(value)
+        return None if rank is None else rank * 100.0
+
+    def quantile(self, q):
+        """Valoarea aproximativă la cuantila q ∈ [0, 1] (min / max exacte la capete)."""
+        if self.n == 0:
+            return None
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+        values, cumulative = self._sorted_view()
+        index = bisect_left(cumulative, q * cumulative[-1])
+        return values[min(index, len(values) - 1)]
+
+    def to_dict(self):
+        return {'k': self.k, 'n': self.n, 'min': self.min if self.n else None,
+                'max': self.max if self.n else None, 'levels': [list(items) for items in self._levels]}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data['k'])
+        sketch.n = int(data['n'])
+        sketch.min = math.inf if data.get('min') is None else float(data['min'])
+        sketch.max = -math.inf if data.get('max') is None else float(data['max'])
+        sketch._levels = [[float(value) for value in items] for items in data['levels']] or [[]]
+        sketch._stored = sum(len(items) for items in sketch._levels)
+        sketch._limit = sketch._max_size()
+        return sketch
+
+
+class LeagueSketches:
+    """
+    Schițele KLL per (ligă, market, caracteristică), actualizate din fiecare analiză:
+    1. ✅ observe(analyzer) - KLD maxim, mișcarea medie Steam (doar când există Steam), uniformitatea gradientului,
+       entropia minimă
+    2. ✅ percentiles(analyzer) - caracteristicile meciului ca percentile în propria ligă, fără scanarea istoricului
+    3. ✅ Persistență JSON (scriere atomică) și merge() între colecții
+    """
+
+    def __init__(self, k=200):
+        self.k = k
+        self._sketches = {}  # ligă -> {'MARKET.caracteristică': KLLSketch}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _features(analyzer):
+        signals = analyzer.get_signals()
+        values = {}
+        for market in analyzer.MARKETS:
+            for feature, signal in FEATURES.items():
+                if feature == 'steam_move' and signals[f'{market}.steam_direction'] is None:
+                    continue
+                values[f'{market}.{feature}'] = float(signals[f'{market}.{signal}'])
+        return values
+
+    def observe(self, analyzer):
+        """Actualizează schițele ligii analizei cu caracteristicile ei."""
+        features = self._features(analyzer)
+        with self._lock:
+            league = self._sketches.setdefault(analyzer.LEAGUE, {})
+            for name, value in features.items():
+                sketch = league.get(name)
+                if sketch is None:
+                    sketch = league[name] = KLLSketch(self.k)
+                sketch.update(value)
+
+    def percentiles(self, analyzer, min_count=30):
+        """
+        {'MARKET.caracteristică': percentila 0-100} pentru meciul analizat, față de liga lui.
+        Caracteristicile cu mai puțin de `min_count` observații în ligă sunt omise.
+        """
+        features = self._features(analyzer)
+        with self._lock:
+            league = self._sketches.get(analyzer.LEAGUE, {})
+            return {name: league[name].percentile(value) for name, value in features.items()
+                    if name in league and league[name].n >= min_count}
+
+    def sketch(self, league, name):
+        return self._sketches.get(league, {}).get(name)
+
+    def leagues(self):
+        return sorted(self._sketches)
+
+    def merge(self, other):
+        with self._lock:
+            for league, sketches in other._sketches.items():
+                mine = self._sketches.setdefault(league, {})
+                for name, sketch in sketches.items():
+                    if name in mine:
+                        mine[name].merge(sketch)
+                    else:
+                        mine[name] = KLLSketch.from_dict(sketch.to_dict())
+        return self
+
+    def to_dict(self):
+        with self._lock:
+            return {'k': self.k, 'leagues': {league: {name: sketch.to_dict() for name, sketch in sketches.items()}
+                                             for league, sketches in self._sketches.items()}}
+
+    @classmethod
+    def from_dict(cls, data):
+        collection = cls(data.get('k', 200))
+        collection._sketches = {league: {name: KLLSketch.from_dict(sketch) for name, sketch in sketches.items()}
+                                for league, sketches in data.get('leagues', {}).items()}
+        return collection
+
+    def save(self, path):
+        """Scriere atomică (fișier temporar + rename), ca o oprire bruscă să nu lase JSON corupt."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, k=200):
+        """Colecția salvată sau una goală dacă fișierul nu există."""
+        if not os.path.exists(path):
+            return cls(k)
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
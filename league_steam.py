@@ -0,0 +1,135 @@
+import time
+from collections import defaultdict, deque
+
+# =============================================================================
+# DETECȚIE STEAM CORELAT LA NIVEL DE LIGĂ (MAI MULTE MECIURI, ACEEAȘI DIRECȚIE)
+# =============================================================================
+
+class _MarketWindow:
+    """Agregatele unei (ligi, market) pe fereastra curentă: ultima stare per meci."""
+
+    __slots__ = ('counts', 'move_sums', 'latest', 'buckets')
+
+    def __init__(self):
+        self.counts = defaultdict(int)       # direcție (sau None) -> meciuri
+        self.move_sums = defaultdict(float)  # direcție -> Σ avg_move
+        self.latest = {}                     # meci -> (bucket, direcție, avg_move)
+        self.buckets = deque()               # (bucket, set meciuri) în ordine cronologică
+
+
+class LeagueSteamMonitor:
+    """
+    Detecție de Steam corelat pe ligă (sweep de piață):
+    1. ✅ Agregate pe ferestre de timp (bucket-uri) per ligă și market: direcție Steam și avg_move
+    2. ✅ Fiecare meci contribuie cu ultima observație din fereastră (fără dublă numărare)
+    3. ✅ Actualizare O(1) amortizat per observație; detecția pe toate ligile e O(meciuri active)
+    4. ✅ Hook pentru atașarea contextului de ligă la steam_detection-ul fiecărui meci
+    """
+
+    MARKETS = ('TOTAL', 'HANDICAP')
+
+    def __init__(self, bucket_seconds=300, window_buckets=3, min_matches=3, min_share=0.6):
+        self.bucket_seconds = bucket_seconds
+        self.window_buckets = window_buckets
+        self.min_matches = min_matches
+        self.min_share = min_share
+        self._windows = defaultdict(_MarketWindow)  # (ligă, market) -> _MarketWindow
+
+    def _bucket(self, timestamp):
+        return int((time.time() if timestamp is None else timestamp) // self.bucket_seconds)
+
+    def _expire(self, window, current_bucket):
+        """Scoate contribuțiile meciurilor a căror ultimă observație a ieșit din fereastră."""
+        oldest_allowed = current_bucket - self.window_buckets + 1
+        while window.buckets and window.buckets[0][0] < oldest_allowed:
+            bucket, matches = window.buckets.popleft()
+            for match in matches:
+                entry = window.latest.get(match)
+                if entry is not None and entry[0] == bucket:
+                    self._remove(window, match)
+
+    @staticmethod
+    def _remove(window, match):
+        _, direction, move = window.latest.pop(match)
+        window.counts[direction] -= 1
+        if direction is not None:
+            window.move_sums[direction] -= move
+
+    def observe(self, league, match_key, steam_detection, timestamp=None):
+        """Înregistrează starea Steam a unui meci (dict-ul steam_detection al analizorului)."""
+        bucket = self._bucket(timestamp)
+        for market in self.MARKETS:
+            window = self._windows[(league, market)]
+            self._expire(window, bucket)
+
+            steam = steam_detection.get(market)
+            direction = steam['direction'] if steam else None
+            move = float(steam['avg_move']) if steam else 0.0
+
+            if match_key in window.latest:
+                self._remove(window, match_key)
+            window.latest[match_key] = (bucket, direction, move)
+            window.counts[direction] += 1
+            if direction is not None:
+                window.move_sums[direction] += move
+
+            if not window.buckets or window.buckets[-1][0] != bucket:
+                window.buckets.append((bucket, set()))
+            window.buckets[-1][1].add(match_key)
+
+    def observe_analyzer(self, analyzer, match_key=None, timestamp=None):
+        """Variantă comodă: observă direct un HybridAnalyzerV73."""
+        match_key = match_key or f"{analyzer.LEAGUE}|{analyzer.HOME_TEAM}|{analyzer.AWAY_TEAM}"
+        self.observe(analyzer.LEAGUE, match_key, analyzer.steam_detection, timestamp)
+
+    def sweep(self, league, market, timestamp=None):
+        """
+        Starea sweep-ului pe (ligă, market): direcția dominantă, numărul și procentul meciurilor aliniate,
+        avg_move mediu. `is_sweep` = cel puțin min_matches meciuri și min_share din meciurile active.
+        """
+        window = self._windows.get((league, market))
+        if window is None:
+            return None
+        self._expire(window, self._bucket(timestamp))
+
+        active = len(window.latest)
+        best_direction, best_count = None, 0
+        for direction, count in window.counts.items():
+            if direction is not None and count > best_count:
+                best_direction, best_count = direction, count
+        if active == 0:
+            return None
+
+        share = best_count / active
+        return {
+            'direction': best_direction,
+            'matches': best_count,
+            'active_matches': active,
+            'share': share,
+            'avg_move': window.move_sums[best_direction] / best_count if best_count else 0.0,
+            'is_sweep': best_count >= self.min_matches and share >= self.min_share
+        }
+
+    def detect(self, timestamp=None):
+        """Toate sweep-urile active, pe toate ligile și market-urile."""
+        sweeps = []
+        for (league, market) in list(self._windows):
+            state = self.sweep(league, market, timestamp)
+            if state and state['is_sweep']:
+                sweeps.append(dict(state, league=league, market=market))
+        return sweeps
+
+    def attach_context(self, analyzer, timestamp=None):
+        """
+        Atașează contextul de ligă: analyzer.league_steam_context[market] și, dacă meciul are Steam,
+        cheia 'league_sweep' în steam_detection[market] (cu 'aligned' = aceeași direcție ca sweep-ul).
+        """
+        context = {}
+        for market in self.MARKETS:
+            state = self.sweep(analyzer.LEAGUE, market, timestamp)
+            context[market] = state
+            steam = analyzer.steam_detection.get(market)
+            if steam is not None and state is not None:
+                steam['league_sweep'] = dict(state, aligned=(state['direction'] == steam['direction']))
+        analyzer.league_steam_context = context
+        return context
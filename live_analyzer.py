@@ -0,0 +1,370 @@
+import math
+import time
+import numpy as np
+from HybridAnalyzerV73 import HybridAnalyzerV73
+
+# =============================================================================
+# ANALIZATOR LIVE (V7.3 - ACTUALIZARE INCREMENTALĂ PE TICK-URI)
+# =============================================================================
+
+class _MarketAggregates:
+    """Agregatele rulante ale unui market (index 0/1 = cele două direcții)."""
+
+    __slots__ = ('cons_points', 'cons_line', 'steam_moves', 'steam_sum',
+                 'traps', 'diff_sum', 'diff_sq_sum', 'anomalies',
+                 'prob_sum', 'prob_log_sum', 'ticks_since_resync')
+
+    def __init__(self):
+        self.cons_points = [0, 0]
+        self.cons_line = {}
+        self.steam_moves = [{}, {}]
+        self.steam_sum = [0.0, 0.0]
+        self.traps = [{}, {}]  # linie -> flag-ul trap-ului (aceeași formă ca în manipulation_flags)
+        self.diff_sum = [0.0, 0.0]
+        self.diff_sq_sum = [0.0, 0.0]
+        self.anomalies = [set(), set()]
+        self.prob_sum = [0.0, 0.0]
+        self.prob_log_sum = [0.0, 0.0]
+        self.ticks_since_resync = 0
+
+
+class LiveAnalyzerV73(HybridAnalyzerV73):
+    """
+    Analizator Live V7.3 - consumă tick-uri de cote (market, linie, direcție, cotă close nouă):
+    1. ✅ Agregate rulante pentru consens, steam (moves1/moves2), trap-uri vs close și gradient
+    2. ✅ Un tick actualizează agregatele în timp constant (doar linia care s-a mișcat)
+    3. ✅ Emite o decizie nouă DOAR când se schimbă matricea de încredere sau acțiunea KLD
+    4. ✅ Opțional: înregistrează fiecare tick într-un OddsHistoryBuffer (traiectorie intraday)
+    """
+
+    # Resincronizare periodică a sumelor rulante (elimină deriva numerică)
+    RESYNC_EVERY = 1024
+
+    def __init__(self, league, home_team, away_team, total_lines_data, handicap_lines_data, history=None,
+                 markets=None):
+        # Gol până după etapele inițiale ale clasei de bază (care lucrează pe ladder-e complete)
+        self._aggregates = {}
+        # Copii proprii: tick-urile modifică cotele pe loc
+        total_copy = {k: dict(v) for k, v in total_lines_data.items()}
+        handicap_copy = {k: dict(v) for k, v in handicap_lines_data.items()}
+        markets_copy = {name: {k: dict(v) for k, v in lines.items()} for name, lines in (markets or {}).items()}
+        super().__init__(league, home_team, away_team, total_copy, handicap_copy, markets=markets_copy)
+
+        # (cheie direcție, nume direcție) per market, din registru
+        self.MARKET_DIRECTIONS = {market: tuple(zip(spec.dir_keys, spec.dir_names))
+                                  for market, spec in self.MARKET_SPECS.items()}
+
+        # Poziția fiecărei linii în ordinea ladder-ului, per market (ladder-e de orice lungime)
+        self._line_index = {market: {k: i for i, k in enumerate(self.LADDERS[market]['order'])}
+                            for market in self.MARKET_DIRECTIONS}
+        for market in self.MARKET_DIRECTIONS:
+            self._resync_market(market)
+        # Trap-urile per market, în ordinea etapei originale (lista globală = concatenarea lor)
+        self._market_flags = {market: self._ordered_market_flags(market) for market in self.MARKET_DIRECTIONS}
+        # Lista globală pointează la flag-urile din agregate (actualizate pe loc de tick-uri)
+        self.manipulation_flags = [flag for flags in self._market_flags.values() for flag in flags]
+
+        self.ticks_applied = 0
+        self.decisions_emitted = 0
+        self._last_signature = self._decision_signature()
+
+        self.history = history
+        if history is not None:
+            now = time.time()
+            history.record_ladder('TOTAL', self.TOTAL_LINES, now)
+            history.record_ladder('HANDICAP', self.HANDICAP_LINES, now)
+
+    def _lines_for(self, market):
+        """Returnează ladder-ul unui market."""
+        if market not in self.MARKETS:
+            raise ValueError(f"Market necunoscut: {market}")
+        return self.MARKETS[market]
+
+    def _consensus_points(self, open_odds, close_odds):
+        """Punctele de consens ale unei linii pe o direcție."""
+        points = 0
+        if close_odds < self.CONSENSUS_ODDS_THRESHOLD: points += 3
+        if open_odds - close_odds > self.CONSENSUS_MOVE_THRESHOLD: points += 2
+        return points
+
+    def _is_trap(self, lines_data, line_key, dir_key):
+        """Verifică dacă linia e trap față de close pe o direcție."""
+        field = f'{dir_key}_close'
+        return lines_data[line_key][field] < lines_data['close'][field] - self.TRAP_GAP_THRESHOLD
+
+    def _update_trap(self, market, agg, line_key, s):
+        """
+        Re-evaluează trap-ul unei singure linii pe o direcție: flag-ul ei e creat, actualizat pe loc sau șters.
+        Returnează True dacă setul de trap-uri s-a schimbat (listele ordonate trebuie refăcute).
+        """
+        lines_data = self.MARKETS[market]
+        dir_key, name = self.MARKET_DIRECTIONS[market][s]
+        flags = agg.traps[s]
+        if not self._is_trap(lines_data, line_key, dir_key):
+            return flags.pop(line_key, None) is not None
+        line_data = lines_data[line_key]
+        values = {
+            'cota': line_data[f'{dir_key}_close'],
+            'vs_close': lines_data['close'][f'{dir_key}_close'],
+            'move_open_close': round(line_data[f'{dir_key}_open'] - line_data[f'{dir_key}_close'], 3)
+        }
+        flag = flags.get(line_key)
+        if flag is not None:
+            flag.update(values)
+            return False
+        flags[line_key] = {'type': f'TRAP_LINE_{market}_{name}', 'line': line_data['line'],
+                           'cota': values['cota'], 'vs_close': values['vs_close'], 'severity': 'HIGH',
+                           'move_open_close': values['move_open_close']}
+        return True
+
+    def _ordered_market_flags(self, market):
+        """Trap-urile unui market în ordinea etapei originale (linie, apoi direcție) - O(trap-uri)."""
+        agg = self._aggregates[market]
+        index = self._line_index[market]
+        keys = sorted(set(agg.traps[0]) | set(agg.traps[1]), key=index.__getitem__)
+        return [agg.traps[s][k] for k in keys for s in (0, 1) if k in agg.traps[s]]
+
+    def _trap_flags(self, market, direction):
+        """Trap-urile unui market_direcție direct din agregate (fără filtrarea listei globale)."""
+        agg = self._aggregates.get(market)
+        if agg is None:
+            return super()._trap_flags(market, direction)
+        s = 0 if self.MARKET_DIRECTIONS[market][0][1] == direction else 1
+        index = self._line_index[market]
+        return [agg.traps[s][k] for k in sorted(agg.traps[s], key=index.__getitem__)]
+
+    def _resync_market(self, market):
+        """Reconstruiește complet agregatele unui market (O(L), doar la init/resincronizare)."""
+        lines_data = self._lines_for(market)
+        ladder = self.LADDERS[market]
+        line_order = ladder['order']
+        agg = _MarketAggregates()
+
+        for s, (dir_key, _) in enumerate(self.MARKET_DIRECTIONS[market]):
+            open_field, close_field = f'{dir_key}_open', f'{dir_key}_close'
+
+            for line_key in line_order:
+                data = lines_data[line_key]
+                points = self._consensus_points(data[open_field], data[close_field])
+                agg.cons_line.setdefault(line_key, [0, 0])[s] = points
+                agg.cons_points[s] += points
+
+                move = data[open_field] - data[close_field]
+                if move > self.STEAM_THRESHOLD:
+                    agg.steam_moves[s][line_key] = move
+                    agg.steam_sum[s] += move
+
+                p = 1.0 / data[close_field]
+                agg.prob_sum[s] += p
+                agg.prob_log_sum[s] += p * math.log2(p)
+
+            for line_key in ladder['trap_keys']:
+                self._update_trap(market, agg, line_key, s)
+
+            for i in range(len(line_order) - 1):
+                diff = lines_data[line_order[i + 1]][close_field] - lines_data[line_order[i]][close_field]
+                agg.diff_sum[s] += diff
+                agg.diff_sq_sum[s] += diff * diff
+                if abs(diff) > self.GRADIENT_ANOMALY_THRESHOLD:
+                    agg.anomalies[s].add(i)
+
+        self._aggregates[market] = agg
+
+    def apply_tick(self, market, line_key, side, close_odds, timestamp=None):
+        """
+        Aplică un tick de cotă close și actualizează incremental agregatele.
+        Returnează noua predicție dacă decizia s-a schimbat, altfel None.
+        """
+        market = market.upper()
+        line_key = line_key.lower()
+        side = side.lower()
+
+        lines_data = self._lines_for(market)
+        dir_keys = [d[0] for d in self.MARKET_DIRECTIONS[market]]
+        if side not in dir_keys:
+            raise ValueError(f"Direcție necunoscută pentru {market}: {side}")
+        if line_key not in self._line_index[market]:
+            raise ValueError(f"Linie necunoscută: {line_key}")
+        # Validare înainte de orice modificare: un tick invalid nu lasă agregatele pe jumătate actualizate
+        if not math.isfinite(close_odds) or close_odds <= 1.0:
+            raise ValueError(f"Cotă invalidă pentru {market} {line_key} {side}: {close_odds!r}")
+
+        s = dir_keys.index(side)
+        open_field, close_field = f'{side}_open', f'{side}_close'
+        data = lines_data[line_key]
+        old_close = data[close_field]
+        if self.history is not None and market in self.history.MARKETS:
+            self.history.record(market, line_key, side, close_odds, timestamp)
+        if old_close == close_odds:
+            return None
+
+        agg = self._aggregates[market]
+        line_order = self.LADDERS[market]['order']
+        idx = self._line_index[market][line_key]
+        last_diff = len(line_order) - 2
+
+        # Gradient: doar cele două diferențe vecine liniei
+        for i in (idx - 1, idx):
+            if 0 <= i <= last_diff:
+                prev = lines_data[line_order[i]][close_field]
+                nxt = lines_data[line_order[i + 1]][close_field]
+                diff = nxt - prev
+                agg.diff_sum[s] -= diff
+                agg.diff_sq_sum[s] -= diff * diff
+
+        # Entropie: sume rulante Σp și Σp·log2(p)
+        p_old, p_new = 1.0 / old_close, 1.0 / close_odds
+        agg.prob_sum[s] += p_new - p_old
+        agg.prob_log_sum[s] += p_new * math.log2(p_new) - p_old * math.log2(p_old)
+
+        data[close_field] = close_odds
+
+        for i in (idx - 1, idx):
+            if 0 <= i <= last_diff:
+                prev = lines_data[line_order[i]][close_field]
+                nxt = lines_data[line_order[i + 1]][close_field]
+                diff = nxt - prev
+                agg.diff_sum[s] += diff
+                agg.diff_sq_sum[s] += diff * diff
+                if abs(diff) > self.GRADIENT_ANOMALY_THRESHOLD:
+                    agg.anomalies[s].add(i)
+                else:
+                    agg.anomalies[s].discard(i)
+
+        # Consens
+        points = self._consensus_points(data[open_field], close_odds)
+        agg.cons_points[s] += points - agg.cons_line[line_key][s]
+        agg.cons_line[line_key][s] = points
+
+        # Steam (moves1/moves2)
+        old_move = agg.steam_moves[s].pop(line_key, None)
+        if old_move is not None:
+            agg.steam_sum[s] -= old_move
+        move = data[open_field] - close_odds
+        if move > self.STEAM_THRESHOLD:
+            agg.steam_moves[s][line_key] = move
+            agg.steam_sum[s] += move
+
+        # Trap-uri vs close: doar linia mișcată (un tick pe close re-evaluează liniile direcției)
+        traps_changed = False
+        if line_key == 'close':
+            for trap_key in self.LADDERS[market]['trap_keys']:
+                traps_changed |= self._update_trap(market, agg, trap_key, s)
+            self._kld_scores = self._calculate_kl_divergence_FIXED()
+        elif line_key in self.LADDERS[market]['trap_keys']:
+            traps_changed = self._update_trap(market, agg, line_key, s)
+
+        self.ticks_applied += 1
+        agg.ticks_since_resync += 1
+        if agg.ticks_since_resync >= self.RESYNC_EVERY:
+            self._resync_market(market)
+            traps_changed = True
+
+        self._refresh_market_outputs(market, traps_changed)
+        return self._emit_if_changed()
+
+    def consume(self, ticks):
+        """Aplică o secvență de tick-uri și returnează deciziile emise."""
+        emitted = []
+        for tick in ticks:
+            if isinstance(tick, dict):
+                tick = (tick['market'], tick['line_key'], tick['side'], tick['close_odds'], tick.get('timestamp'))
+            result = self.apply_tick(*tick)
+            if result is not None:
+                emitted.append(result)
+        return emitted
+
+    def _refresh_market_outputs(self, market, traps_changed=True):
+        """Re-materializează ieșirile etapelor pentru market-ul mișcat, din agregate."""
+        lines_data = self._lines_for(market)
+        agg = self._aggregates[market]
+        ladder = self.LADDERS[market]
+        line_order = ladder['order']
+        directions = self.MARKET_DIRECTIONS[market]
+        dir_names = (directions[0][1], directions[1][1])
+        max_score = len(line_order) * 5
+
+        # Consens
+        for s, name in enumerate(dir_names):
+            self.consensus_score[market][name] = (agg.cons_points[s] / max_score) * 100
+
+        # Steam
+        self.steam_detection[market] = None
+        for s, name in enumerate(dir_names):
+            moves = agg.steam_moves[s]
+            if len(moves) >= ladder['steam_min_lines']:
+                self.steam_detection[market] = {
+                    'direction': name,
+                    'strength': len(moves),
+                    'avg_move': agg.steam_sum[s] / len(moves),
+                    'lines_affected': [{'line': lines_data[k]['line'], 'move': moves[k]}
+                                       for k in ladder['steam_keys'] if k in moves]
+                }
+                break
+
+        # Gradient
+        n_diffs = len(line_order) - 1
+        stds = []
+        for s, (dir_key, _) in enumerate(directions):
+            mean = agg.diff_sum[s] / n_diffs
+            variance = agg.diff_sq_sum[s] / n_diffs - mean * mean
+            if variance < 1e-12:
+                # Ladder aproape plat: reziduul sumelor rulante domină după sqrt → recalcul exact din cotele close
+                closes = [lines_data[k][f'{dir_key}_close'] for k in line_order]
+                stds.append(float(np.std(np.diff(closes))))
+            else:
+                stds.append(math.sqrt(variance))
+        anomalies = []
+        for s, (dir_key, name) in enumerate(directions):
+            for i in sorted(agg.anomalies[s]):
+                anomalies.append({
+                    'type': name,
+                    'between': f"{line_order[i]} și {line_order[i+1]}",
+                    'diff': lines_data[line_order[i + 1]][f'{dir_key}_close'] - lines_data[line_order[i]][f'{dir_key}_close']
+                })
+        self.gradient_analysis[market] = {'uniformity': max(0, 100 - (stds[0] + stds[1]) * 100), 'anomalies': anomalies}
+
+        # Trap-uri: flag-urile existente sunt actualizate pe loc de apply_tick; listele ordonate (a market-ului,
+        # cea globală - concatenarea lor în ordinea etapei originale) și indexul liniilor se refac doar
+        # când setul de trap-uri al market-ului se schimbă
+        if traps_changed:
+            self._market_flags[market] = self._ordered_market_flags(market)
+            self.manipulation_flags = [flag for flags in self._market_flags.values() for flag in flags]
+            for s, name in enumerate(dir_names):
+                trap_lines = sorted(flag['line'] for flag in agg.traps[s].values())
+                if trap_lines:
+                    self._trap_lines[f'{market}_{name}'] = trap_lines
+                else:
+                    self._trap_lines.pop(f'{market}_{name}', None)
+
+        # Entropie: H = log2(S) - (Σp·log2 p) / S
+        entropies = [math.log2(agg.prob_sum[s]) - agg.prob_log_sum[s] / agg.prob_sum[s] for s in range(2)]
+        self.entropy_values[market] = (entropies[0], entropies[1])
+        consensus = self.consensus_score[market]
+        ecc_threshold = ladder['ecc_threshold']
+        self.entropy_alerts[market] = None
+        if consensus[dir_names[0]] > consensus[dir_names[1]] and entropies[0] < ecc_threshold:
+            self.entropy_alerts[market] = {'direction': dir_names[0], 'entropy': entropies[0]}
+        elif consensus[dir_names[1]] > consensus[dir_names[0]] and entropies[1] < ecc_threshold:
+            self.entropy_alerts[market] = {'direction': dir_names[1], 'entropy': entropies[1]}
+
+        # Matricea de încredere: doar scorurile direcțiilor market-ului mișcat
+        scores = self._market_score_components(market)
+        self._score_data.update(scores)
+        for key, data in scores.items():
+            self.confidence_matrix[key] = data['Final_Score']
+
+    def _decision_signature(self):
+        """Semnătura deciziei: matricea de încredere + acțiunile KLD."""
+        matrix = tuple(sorted(self.confidence_matrix.items()))
+        actions = tuple(self._determine_v7_3_action(key)[0] for key, _ in matrix)
+        return matrix, actions
+
+    def _emit_if_changed(self):
+        """Returnează predicția doar dacă semnătura deciziei s-a schimbat."""
+        signature = self._decision_signature()
+        if signature == self._last_signature:
+            return None
+        self._last_signature = signature
+        self.decisions_emitted += 1
+        return self.generate_prediction()
@@ -0,0 +1,97 @@
+import time
+import numpy as np
+from batch_analyzer import BatchAnalyzerV73
+from compact_result import pack_match
+from sensitivity import MIN_ODDS
+
+# =============================================================================
+# STABILITATEA DECIZIEI (MONTE CARLO) - N VARIANTE ZGOMOTOASE ÎNTR-UN SINGUR BATCH
+# =============================================================================
+
+def draw_noisy_ladders(ladders, open_lines, n, odds_jitter=0.02, line_noise=0.5, rng=None, round_odds=True):
+    """
+    n variante ale ladder-elor unui meci:
+    - fiecare cotă (open/close) + N(0, odds_jitter), rotunjită la 0.01 (ca la bookmaker), minim 1.01
+    - fiecare market își deplasează toate liniile cu N(0, line_noise) rotunjit la 0.5 (structura ladder-ului se păstrează)
+    - open_line_value primește zgomot independent de aceeași scală
+    `ladders` = (M, L, 5) pentru orice număr de market-uri; celulele NaN (linii necotate) rămân NaN.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    noisy = np.broadcast_to(ladders, (n,) + ladders.shape).copy()
+
+    odds = noisy[..., 1:] + rng.normal(0.0, odds_jitter, size=noisy[..., 1:].shape)
+    if round_odds:
+        odds = np.round(odds, 2)
+    noisy[..., 1:] = np.maximum(odds, MIN_ODDS)
+
+    if line_noise > 0:
+        shifts = np.round(rng.normal(0.0, line_noise, size=(n, len(ladders))) * 2) / 2
+        noisy[..., 0] += shifts[:, :, None]
+        open_shifts = np.round(rng.normal(0.0, line_noise, size=(n, len(ladders))) * 2) / 2
+    else:
+        open_shifts = np.zeros((n, len(ladders)))
+    noisy_open = open_lines[None, :] + open_shifts  # NaN (lipsă) rămâne NaN
+    return noisy, noisy_open
+
+
+def _shares(values):
+    keys, counts = np.unique(values, return_counts=True)
+    order = np.argsort(-counts, kind='stable')
+    return {str(keys[i]): float(counts[i] / len(values)) for i in order}
+
+
+def estimate_stability(total_lines, handicap_lines, n=10000, odds_jitter=0.02, line_noise=0.5, seed=None,
+                       round_odds=True, markets=None):
+    """
+    Estimează stabilitatea deciziei unui meci: n variante zgomotoase evaluate vectorizat (BatchAnalyzerV73).
+    Returnează distribuțiile pentru decision, direction_final, line_buffered și confidence,
+    plus `stability` = proporția variantelor cu aceeași decizie (acțiune + market + direcție) ca meciul real.
+    `markets` = market-urile suplimentare; ladder-ele de lungimi diferite sunt aliniate pe reuniunea liniilor.
+    """
+    started = time.perf_counter()
+    ladders, open_lines, line_keys, market_names = pack_match(total_lines, handicap_lines, markets)
+    noisy, noisy_open = draw_noisy_ladders(
+        ladders, open_lines, n, odds_jitter, line_noise, np.random.default_rng(seed), round_odds
+    )
+
+    # Rândul 0 = meciul real, restul = variantele
+    batch = BatchAnalyzerV73(np.concatenate([ladders[None], noisy]), np.concatenate([open_lines[None], noisy_open]),
+                             line_keys=line_keys, markets=market_names)
+    labels = batch.outcome_labels()
+    base_label, labels = labels[0], labels[1:]
+    play = batch.play[1:]
+    directions = batch.direction_labels()[1:]
+    confidence = batch.confidence[1:]
+    line_buffered = batch.line_buffered[1:][play]
+    return {
+        'base_outcome': base_label,
+        'base': batch.prediction(0),
+        'n': n,
+        'stability': float(np.mean(labels == base_label)),
+        'decision': {'PLAY': float(play.mean()), 'SKIP': float(1.0 - play.mean())},
+        'outcome': _shares(labels),
+        'direction_final': _shares(directions),
+        'line_buffered': _shares(line_buffered) if len(line_buffered) else {},
+        'confidence': {
+            'mean': float(confidence.mean()),
+            'std': float(confidence.std()),
+            'p5': float(np.percentile(confidence, 5)),
+            'p50': float(np.percentile(confidence, 50)),
+            'p95': float(np.percentile(confidence, 95)),
+        },
+        'seconds': time.perf_counter() - started
+    }
+
+
+def slate_stability(matches, n=10000, odds_jitter=0.02, line_noise=0.5, seed=0):
+    """
+    Stabilitatea fiecărui meci dintr-un slate (dict-uri cu total_lines / handicap_lines, opțional markets),
+    în ordinea primită.
+    """
+    results = []
+    for i, match in enumerate(matches):
+        result = estimate_stability(match['total_lines'], match['handicap_lines'], n, odds_jitter, line_noise,
+                                    seed=None if seed is None else seed + i, markets=match.get('markets'))
+        result['match'] = (match.get('league'), match.get('home_team'), match.get('away_team'))
+        results.append(result)
+    return results
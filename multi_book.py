@@ -0,0 +1,209 @@
+import warnings
+import numpy as np
+from HybridAnalyzerV73 import MARKET_REGISTRY, ladder_thresholds
+from batch_analyzer import BatchAnalyzerV73
+from compact_result import pack_match
+
+# =============================================================================
+# AGREGARE MULTI-BOOKMAKER (ACELAȘI MECI, B CASE DE PARIURI)
+# =============================================================================
+
+class MultiBookAggregator:
+    """
+    Agregare de ladder-e de la B bookmakeri pentru același meci:
+    1. ✅ Aliniază liniile după valoare pe o grilă comună per market (pas 0.5; NaN unde bookmakerul nu cotează)
+    2. ✅ Metrici per bookmaker (consens, Steam, KLD, decizie) dintr-un BatchAnalyzerV73 per lungime de ladder
+    3. ✅ Metrici cross-book (consens mediu, Steam pe mediana mișcărilor, KLD pe probabilități medii)
+    4. ✅ Marchează bookmakerii ale căror mișcări diverg de restul pieței (z-score robust pe MAD)
+    """
+
+    def __init__(self, books, line_step=0.5, divergence_z=3.0, min_books=3):
+        """
+        `books`: {nume: {'total_lines': ..., 'handicap_lines': ..., opțional 'markets': {nume: ladder}}}
+        (sau listă de dict-uri cu cheia 'book'). Toți bookmakerii cotează aceleași market-uri.
+        """
+        if not isinstance(books, dict):
+            books = {b['book']: b for b in books}
+        if not books:
+            raise ValueError("Este nevoie de cel puțin un bookmaker")
+        self.book_names = list(books)
+        self.line_step = line_step
+        self.divergence_z = divergence_z
+        self.min_books = min_books
+
+        packed = [pack_match(b['total_lines'], b['handicap_lines'], b.get('markets')) for b in books.values()]
+        self.markets = packed[0][3]
+        if any(p[3] != self.markets for p in packed):
+            raise ValueError("Toți bookmakerii trebuie să coteze aceleași market-uri")
+        self.direction_names = tuple(MARKET_REGISTRY[market].dir_names for market in self.markets)
+        # B × (M, L_b, 5): bookmakerii pot cota număr diferit de linii, market-urile unui bookmaker sunt
+        # aliniate pe reuniunea liniilor lui (NaN unde un market are ladder-ul mai scurt)
+        self.ladders = [p[0] for p in packed]
+        self.open_lines = np.stack([p[1] for p in packed])     # (B, M)
+        self._analyze_books([p[2] for p in packed])
+        self._align()
+
+    def _analyze_books(self, line_keys):
+        """Un BatchAnalyzerV73 per set de linii; metricile se adună în array-uri (B, ...) în ordinea bookmakerilor."""
+        n_books, n_markets = len(self.book_names), len(self.markets)
+        self.consensus = np.empty((n_books, n_markets, 2))
+        self.steam_dir = np.empty((n_books, n_markets), dtype=int)
+        self.steam_strength = np.empty((n_books, n_markets), dtype=int)
+        self.kld = np.empty((n_books, n_markets, 2))
+        self.close_lines = np.empty((n_books, n_markets))
+        self.close_odds = np.empty((n_books, n_markets, 2, 2))  # [bookmaker, market, open/close, direcție]
+        self.predictions = [None] * n_books
+        self.steam_threshold = None
+        # Pragul Steam cross-book: scalat cu lungimea mediană a ladder-elor (3 linii la 7)
+        median_lines = int(np.median([ladders.shape[1] for ladders in self.ladders]))
+        self.steam_min_lines = ladder_thresholds(median_lines, 0.0)['steam_min_lines']
+
+        groups = {}
+        for b, keys in enumerate(line_keys):
+            groups.setdefault(keys, []).append(b)
+        for keys, rows in groups.items():
+            batch = BatchAnalyzerV73(np.stack([self.ladders[b] for b in rows]), self.open_lines[rows], line_keys=keys,
+                                     markets=self.markets)
+            self.steam_threshold = batch.STEAM_THRESHOLD
+            self.consensus[rows] = batch.consensus
+            self.steam_dir[rows] = batch.steam_dir
+            self.steam_strength[rows] = batch.steam_strength
+            self.kld[rows] = batch.kld
+            self.close_lines[rows] = batch.lines[..., batch.close_index]
+            self.close_odds[rows, :, 0] = batch.open[..., batch.close_index]
+            self.close_odds[rows, :, 1] = batch.close[..., batch.close_index]
+            for j, b in enumerate(rows):
+                self.predictions[b] = batch.prediction(j)
+
+    def _align(self):
+        """Grila comună de linii per market și cotele aliniate (B, G, 2 direcții) pentru open / close."""
+        n_books = len(self.book_names)
+        self.grid = []
+        self.aligned_open = []
+        self.aligned_close = []
+        for m in range(len(self.markets)):
+            market_ladders = np.concatenate([ladders[m] for ladders in self.ladders])          # (Σ L_b, 5)
+            rows = np.repeat(np.arange(n_books), [ladders.shape[1] for ladders in self.ladders])
+            quoted = ~np.isnan(market_ladders[:, 0])                                           # fără padding
+            market_ladders, rows = market_ladders[quoted], rows[quoted]
+            keys = np.round(market_ladders[:, 0] / self.line_step) * self.line_step
+            grid = np.unique(keys)
+            cells = np.searchsorted(grid, keys)
+            aligned_open = np.full((n_books, len(grid), 2), np.nan)
+            aligned_close = np.full((n_books, len(grid), 2), np.nan)
+            for s in range(2):
+                aligned_open[rows, cells, s] = market_ladders[:, 1 + 2 * s]
+                aligned_close[rows, cells, s] = market_ladders[:, 2 + 2 * s]
+            self.grid.append(grid)
+            self.aligned_open.append(aligned_open)
+            self.aligned_close.append(aligned_close)
+
+    # -------------------------------------------------------------------------
+    # Per bookmaker
+    # -------------------------------------------------------------------------
+
+    def per_book(self):
+        """Metricile fiecărui bookmaker (din BatchAnalyzerV73)."""
+        rows = []
+        for b, name in enumerate(self.book_names):
+            row = {'book': name, 'decision': self.predictions[b]}
+            for m, market in enumerate(self.markets):
+                dir_names = self.direction_names[m]
+                steam_dir = self.steam_dir[b, m]
+                row[market] = {
+                    'close_line': float(self.close_lines[b, m]),
+                    'lines_quoted': int(np.count_nonzero(~np.isnan(self.ladders[b][m, :, 0]))),
+                    'consensus': dict(zip(dir_names, self.consensus[b, m].tolist())),
+                    'steam_direction': dir_names[steam_dir] if steam_dir >= 0 else None,
+                    'steam_strength': int(self.steam_strength[b, m]),
+                    'kld': dict(zip(dir_names, self.kld[b, m].tolist())),
+                }
+            rows.append(row)
+        return rows
+
+    # -------------------------------------------------------------------------
+    # Cross-book
+    # -------------------------------------------------------------------------
+
+    def cross_book(self):
+        """Metricile agregate pe toți bookmakerii, per market."""
+        result = {}
+        for m, market in enumerate(self.markets):
+            dir_names = self.direction_names[m]
+            moves = self.aligned_open[m] - self.aligned_close[m]                     # (B, G, 2)
+            quoted = (~np.isnan(moves)).sum(axis=0)                                    # (G, 2)
+            with warnings.catch_warnings():
+                # Celule necotate de niciun bookmaker (all-NaN) → NaN, fără avertisment
+                warnings.simplefilter('ignore', RuntimeWarning)
+                median_moves = np.nanmedian(moves, axis=0)                             # (G, 2)
+            steam_cells = (median_moves > self.steam_threshold) & (quoted >= min(self.min_books, len(self.book_names)))
+            steam_counts = steam_cells.sum(axis=0)
+            if steam_counts[0] >= self.steam_min_lines:
+                steam_dir = 0
+            elif steam_counts[1] >= self.steam_min_lines:
+                steam_dir = 1
+            else:
+                steam_dir = -1
+
+            # KLD pe probabilitățile medii ale liniei close a fiecărui bookmaker
+            p_open = np.mean(1.0 / self.close_odds[:, m, 0], axis=0)
+            p_close = np.mean(1.0 / self.close_odds[:, m, 1], axis=0)
+            kld = p_close * np.log(p_close / p_open)
+
+            book_steam = self.steam_dir[:, m]
+            result[market] = {
+                'grid': self.grid[m].tolist(),
+                'books_quoting': quoted[:, 0].tolist(),
+                'close_line_median': float(np.median(self.close_lines[:, m])),
+                'consensus': dict(zip(dir_names, self.consensus[:, m].mean(axis=0).tolist())),
+                'steam_direction': dir_names[steam_dir] if steam_dir >= 0 else None,
+                'steam_lines': self.grid[m][steam_cells[:, steam_dir]].tolist() if steam_dir >= 0 else [],
+                'steam_share': {name: float(np.mean(book_steam == s)) for s, name in enumerate(dir_names)},
+                'kld': dict(zip(dir_names, kld.tolist())),
+                'kld_books_mean': dict(zip(dir_names, self.kld[:, m].mean(axis=0).tolist())),
+            }
+        return result
+
+    def divergent_books(self):
+        """
+        Bookmakerii cu mișcări divergente: distanța medie față de mediana pieței pe celulele cotate,
+        normalizată cu MAD-ul între bookmakeri (z robust), plus Steam opus majorității.
+        """
+        n_books = len(self.book_names)
+        if n_books < self.min_books:
+            return []
+
+        scores = np.zeros(n_books)
+        for m in range(len(self.markets)):
+            moves = self.aligned_open[m] - self.aligned_close[m]
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', RuntimeWarning)
+                median = np.nanmedian(moves, axis=0)
+                deviation = np.abs(moves - median)
+                scale = np.maximum(1.4826 * np.nanmedian(deviation, axis=0), 0.01)   # pas de cotă minim: 0.01
+                scores = np.maximum(scores, np.nan_to_num(np.nanmean(deviation / scale, axis=(1, 2))))
+
+        flagged = []
+        steam = self.steam_dir
+        for b, name in enumerate(self.book_names):
+            reasons = []
+            if scores[b] > self.divergence_z:
+                reasons.append(f'mișcări divergente (z={scores[b]:.1f})')
+            for m, market in enumerate(self.markets):
+                others = np.delete(steam[:, m], b)
+                others = others[others >= 0]
+                if steam[b, m] >= 0 and len(others) >= self.min_books - 1 and np.all(others != steam[b, m]):
+                    reasons.append(f'Steam {market} {self.direction_names[m][steam[b, m]]} opus pieței')
+            if reasons:
+                flagged.append({'book': name, 'score': float(scores[b]), 'reasons': reasons})
+        flagged.sort(key=lambda f: -f['score'])
+        return flagged
+
+    def summary(self):
+        """Per bookmaker + cross-book + bookmakeri divergenți."""
+        return {
+            'books': self.per_book(),
+            'market': self.cross_book(),
+            'divergent_books': self.divergent_books(),
+        }
+
@@ -0,0 +1,285 @@
+import asyncio
+import json
+import time
+from collections import defaultdict
+
+# =============================================================================
+# INGESTIE ASYNCIO A FEED-URILOR DE COTE (+ SERVER LOCAL DE REPLAY)
+# =============================================================================
+
+# Toleranța de potrivire a liniei (aceeași ca în _select_optimal_line_FIXED / _find_line_key)
+LINE_MATCH_TOLERANCE = 0.1
+
+
+def normalize_update(raw, analyzer):
+    """
+    Normalizează un update brut al unei surse într-un tick pentru ladder-ul analizorului.
+    Acceptă fie `line_key` ('m3'...'p3'), fie valoarea `line` (căutată binar în ladder-ul market-ului, O(log L)).
+    Returnează (market, line_key, side, close_odds) sau None dacă market-ul / linia nu există în analizor.
+    """
+    market = str(raw['market']).upper()
+    if market not in analyzer.MARKETS:
+        return None
+    side = str(raw['side']).lower()
+    if side not in analyzer.MARKET_SPECS[market].dir_keys:
+        return None
+
+    lines_data = analyzer.MARKETS[market]
+    line_key = raw.get('line_key')
+    if line_key is not None:
+        line_key = str(line_key).lower()
+        if line_key not in lines_data:
+            return None
+    else:
+        # Căutare binară pe valorile sortate ale ladder-ului (aceeași regulă ca selecția liniei Steam)
+        line_key = analyzer._find_line_key(market, float(raw['line']), LINE_MATCH_TOLERANCE)
+        if line_key is None:
+            return None
+
+    return market, line_key, side, float(raw['odds'])
+
+
+class SourceMetrics:
+    """Metrici per sursă: volum, lag sursă → recepție și așteptare în coadă."""
+
+    __slots__ = ('received', 'applied', 'dropped', 'errors', 'reconnects', 'backpressure_waits',
+                 'lag_last', 'lag_max', 'lag_ewma', 'queue_wait_max', 'queue_wait_ewma')
+
+    EWMA_ALPHA = 0.1
+
+    def __init__(self):
+        self.received = 0
+        self.applied = 0
+        self.dropped = 0
+        self.errors = 0
+        self.reconnects = 0
+        self.backpressure_waits = 0
+        self.lag_last = 0.0
+        self.lag_max = 0.0
+        self.lag_ewma = 0.0
+        self.queue_wait_max = 0.0
+        self.queue_wait_ewma = 0.0
+
+    def observe_lag(self, lag):
+        self.lag_last = lag
+        self.lag_max = max(self.lag_max, lag)
+        self.lag_ewma += self.EWMA_ALPHA * (lag - self.lag_ewma)
+
+    def observe_queue_wait(self, wait):
+        self.queue_wait_max = max(self.queue_wait_max, wait)
+        self.queue_wait_ewma += self.EWMA_ALPHA * (wait - self.queue_wait_ewma)
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class OddsFeedIngestor:
+    """
+    Ingestie concurentă a feed-urilor de cote:
+    1. ✅ O sarcină asyncio per sursă (o sursă lentă nu blochează celelalte)
+    2. ✅ Coadă mărginită → backpressure către surse când analiza rămâne în urmă
+    3. ✅ Update-urile sunt normalizate în tick-uri pe ladder-ele TOTAL_LINES/HANDICAP_LINES
+    4. ✅ Metrici de lag per sursă (timestamp sursă → recepție, așteptare în coadă)
+    5. ✅ Un update respins de analizor e numărat (errors / dropped), consumatorul continuă
+    """
+
+    def __init__(self, analyzers, queue_size=1000, on_decision=None, reconnect_delay=1.0):
+        # analyzers: dict cheie_meci -> LiveAnalyzerV73
+        self.analyzers = analyzers
+        self.on_decision = on_decision
+        self.queue_size = queue_size
+        self.reconnect_delay = reconnect_delay
+        self.metrics = defaultdict(SourceMetrics)
+        self.queue_high_water = 0
+        self.unknown_matches = 0
+        self._sources = {}
+        self._queue = None
+        self._tasks = []
+        self._source_tasks = []
+
+    def add_source(self, name, source_factory):
+        """
+        Înregistrează o sursă. `source_factory()` returnează un iterabil asincron de update-uri brute
+        (dict cu match, market, side, odds, line/line_key și opțional ts).
+        """
+        self._sources[name] = source_factory
+
+    async def _run_source(self, name, source_factory):
+        metrics = self.metrics[name]
+        while True:
+            try:
+                async for raw in source_factory():
+                    metrics.received += 1
+                    if self._queue.full():
+                        metrics.backpressure_waits += 1
+                    await self._queue.put((name, raw, time.time()))
+                    self.queue_high_water = max(self.queue_high_water, self._queue.qsize())
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                metrics.errors += 1
+                metrics.reconnects += 1
+                await asyncio.sleep(self.reconnect_delay)
+
+    async def _consume(self):
+        while True:
+            name, raw, received_at = await self._queue.get()
+            try:
+                self._apply(name, raw, received_at)
+            except Exception:
+                # Un update defect (ts invalid, callback on_decision care aruncă) nu oprește consumatorul
+                self.metrics[name].errors += 1
+            finally:
+                self._queue.task_done()
+
+    def _apply(self, name, raw, received_at):
+        metrics = self.metrics[name]
+        now = time.time()
+        metrics.observe_queue_wait(now - received_at)
+        if raw.get('ts') is not None:
+            metrics.observe_lag(received_at - float(raw['ts']))
+
+        analyzer = self.analyzers.get(raw.get('match'))
+        if analyzer is None:
+            self.unknown_matches += 1
+            metrics.dropped += 1
+            return
+
+        try:
+            tick = normalize_update(raw, analyzer)
+        except (KeyError, TypeError, ValueError):
+            tick = None
+        if tick is None:
+            metrics.dropped += 1
+            return
+
+        try:
+            result = analyzer.apply_tick(*tick, timestamp=raw.get('ts'))
+        except (ValueError, ZeroDivisionError):
+            # Cotă invalidă sau timestamp în afara ordinii (istoricul intraday) - update-ul e respins
+            metrics.errors += 1
+            metrics.dropped += 1
+            return
+        metrics.applied += 1
+        if result is not None and self.on_decision is not None:
+            self.on_decision(raw['match'], result)
+
+    async def start(self):
+        """Pornește sarcinile surselor și consumatorul."""
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._tasks = [asyncio.create_task(self._consume())]
+        self._source_tasks = [asyncio.create_task(self._run_source(name, factory))
+                              for name, factory in self._sources.items()]
+        self._tasks.extend(self._source_tasks)
+
+    async def wait_sources(self):
+        """Așteaptă epuizarea surselor finite și golirea cozii."""
+        await asyncio.gather(*self._source_tasks)
+        await self._queue.join()
+
+    async def stop(self):
+        """Oprește toate sarcinile."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def run(self, duration=None):
+        """Rulează ingestia până la epuizarea surselor sau până expiră `duration` (secunde)."""
+        await self.start()
+        try:
+            if duration is None:
+                await self.wait_sources()
+            else:
+                try:
+                    await asyncio.wait_for(self.wait_sources(), timeout=duration)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            await self.stop()
+
+    def get_metrics(self):
+        """Metricile surselor și ale cozii."""
+        return {
+            'sources': {name: m.to_dict() for name, m in self.metrics.items()},
+            'queue_depth': self._queue.qsize() if self._queue else 0,
+            'queue_high_water': self.queue_high_water,
+            'unknown_matches': self.unknown_matches
+        }
+
+
+# -----------------------------------------------------------------------------
+# Surse TCP (JSON lines) și server local de replay
+# -----------------------------------------------------------------------------
+
+def tcp_json_source(host, port):
+    """Sursă care citește update-uri JSON (câte unul pe linie) de la un server TCP."""
+    async def factory():
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                yield json.loads(line)
+        finally:
+            writer.close()
+    return factory
+
+
+def load_recorded_ticks(path):
+    """Citește tick-uri înregistrate (JSON lines, câmpul `ts` în secunde)."""
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class ReplayServer:
+    """
+    Server TCP local care retransmite tick-uri înregistrate, cu accelerare configurabilă.
+    Fiecare client primește toată înregistrarea; `ts` e rescris la momentul trimiterii,
+    iar valoarea originală e păstrată în `recorded_ts`.
+    """
+
+    def __init__(self, ticks, speedup=10.0, host='127.0.0.1', port=0):
+        if speedup <= 0:
+            raise ValueError("speedup trebuie să fie pozitiv")
+        self.ticks = sorted(ticks, key=lambda t: t.get('ts', 0.0))
+        self.speedup = speedup
+        self.host = host
+        self.port = port
+        self._server = None
+
+    async def _handle(self, reader, writer):
+        prev_ts = None
+        try:
+            for tick in self.ticks:
+                ts = tick.get('ts')
+                if prev_ts is not None and ts is not None and ts > prev_ts:
+                    await asyncio.sleep((ts - prev_ts) / self.speedup)
+                prev_ts = ts if ts is not None else prev_ts
+
+                payload = dict(tick, recorded_ts=ts, ts=time.time())
+                writer.write((json.dumps(payload) + '\n').encode('utf-8'))
+                await writer.drain()
+        except (ConnectionResetError, BrokenPipeError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
@@ -0,0 +1,222 @@
+import math
+import time
+from datetime import datetime
+import numpy as np
+from HybridAnalyzerV73 import BASE_LADDER_SIZE, ladder_line_names
+
+# =============================================================================
+# ISTORIC COTE PER LINIE (BUFFER CIRCULAR DELTA-ENCODAT, MEMORIE FIXĂ)
+# =============================================================================
+
+class OddsHistoryBuffer:
+    """
+    Istoric intraday al cotelor pentru UN meci:
+    1. ✅ Buffer circular per (market, linie, direcție) cu capacitate fixă
+    2. ✅ Snapshot-uri delta-encodate (cote în miimi int16, timp în ms int32)
+    3. ✅ KLD și Steam calculate pe toată traiectoria (divergența maximă într-o fereastră)
+    4. ✅ Memorie per meci fixă și cunoscută dinainte (vezi bytes_per_match)
+    """
+
+    MARKETS = {
+        'TOTAL': (('over', 'OVER'), ('under', 'UNDER')),
+        'HANDICAP': (('home', 'HOME'), ('away', 'AWAY'))
+    }
+    LINE_KEYS = ladder_line_names(3)
+    ODDS_SCALE = 1000
+    STEAM_THRESHOLD = 0.08
+
+    # Octeți per snapshot (delta cotă int16 + delta timp int32) și stare per serie
+    _SNAPSHOT_BYTES = np.dtype(np.int16).itemsize + np.dtype(np.int32).itemsize
+    _SERIES_STATE_BYTES = 2 * np.dtype(np.int32).itemsize + 2 * np.dtype(np.int64).itemsize + 2 * np.dtype(np.int32).itemsize
+
+    def __init__(self, capacity=64, line_keys=None):
+        """`line_keys`: liniile ladder-ului (implicit m3..p3; pentru ladder-e mai lungi, ex. ladder_line_names(6))."""
+        if capacity < 2:
+            raise ValueError("Capacitatea buffer-ului trebuie să fie cel puțin 2")
+        self.capacity = capacity
+        self.line_keys = list(line_keys) if line_keys is not None else list(self.LINE_KEYS)
+        self._series_index = {}
+        for market, directions in self.MARKETS.items():
+            for line_key in self.line_keys:
+                for dir_key, _ in directions:
+                    self._series_index[(market, line_key, dir_key)] = len(self._series_index)
+        n_series = len(self._series_index)
+
+        self._odds_delta = np.zeros((n_series, capacity), dtype=np.int16)
+        self._time_delta = np.zeros((n_series, capacity), dtype=np.int32)
+        self._head_odds = np.zeros(n_series, dtype=np.int32)
+        self._last_odds = np.zeros(n_series, dtype=np.int32)
+        self._head_time = np.zeros(n_series, dtype=np.int64)
+        self._last_time = np.zeros(n_series, dtype=np.int64)
+        self._start = np.zeros(n_series, dtype=np.int32)
+        self._count = np.zeros(n_series, dtype=np.int32)
+
+    @classmethod
+    def bytes_per_match(cls, capacity=64, n_lines=None):
+        """Memoria exactă (în octeți) a buffer-elor numerice pentru un meci (ladder de n_lines linii)."""
+        n_lines = n_lines if n_lines is not None else len(cls.LINE_KEYS)
+        n_series = sum(len(dirs) for dirs in cls.MARKETS.values()) * n_lines
+        return n_series * (capacity * cls._SNAPSHOT_BYTES + cls._SERIES_STATE_BYTES)
+
+    @property
+    def nbytes(self):
+        """Memoria efectiv alocată de array-urile buffer-ului."""
+        return sum(a.nbytes for a in (self._odds_delta, self._time_delta, self._head_odds, self._last_odds,
+                                      self._head_time, self._last_time, self._start, self._count))
+
+    @staticmethod
+    def _to_millis(timestamp):
+        if timestamp is None:
+            timestamp = time.time()
+        if isinstance(timestamp, datetime):
+            timestamp = timestamp.timestamp()
+        return int(round(timestamp * 1000))
+
+    def _series(self, market, line_key, side):
+        key = (market.upper(), line_key.lower(), side.lower())
+        if key not in self._series_index:
+            raise ValueError(f"Serie necunoscută: {key}")
+        return self._series_index[key]
+
+    def record(self, market, line_key, side, odds, timestamp=None):
+        """Adaugă un snapshot de cotă; cel mai vechi e suprascris când buffer-ul e plin."""
+        i = self._series(market, line_key, side)
+        q = int(round(odds * self.ODDS_SCALE))
+        t = self._to_millis(timestamp)
+        count = self._count[i]
+
+        if count == 0:
+            self._head_odds[i] = q
+            self._head_time[i] = t
+            self._odds_delta[i, self._start[i]] = 0
+            self._time_delta[i, self._start[i]] = 0
+        else:
+            odds_delta = q - int(self._last_odds[i])
+            time_delta = t - int(self._last_time[i])
+            if not -32768 <= odds_delta <= 32767:
+                raise ValueError(f"Salt de cotă prea mare pentru encodare delta: {odds_delta / self.ODDS_SCALE}")
+            if time_delta < 0:
+                raise ValueError("Snapshot-urile trebuie înregistrate în ordine cronologică")
+            if time_delta > np.iinfo(np.int32).max:
+                raise ValueError("Pauză prea mare între snapshot-uri pentru encodare delta (max ~24 zile)")
+
+            if count == self.capacity:
+                # Evacuare: noul cap de serie devine al doilea snapshot
+                start = self._start[i]
+                nxt = (start + 1) % self.capacity
+                self._head_odds[i] += self._odds_delta[i, nxt]
+                self._head_time[i] += self._time_delta[i, nxt]
+                self._start[i] = nxt
+                count -= 1
+
+            pos = (self._start[i] + count) % self.capacity
+            self._odds_delta[i, pos] = odds_delta
+            self._time_delta[i, pos] = time_delta
+
+        self._count[i] = min(count + 1, self.capacity)
+        self._last_odds[i] = q
+        self._last_time[i] = t
+
+    def record_ladder(self, market, lines_data, timestamp=None, field='close'):
+        """Înregistrează toate cotele unui ladder (câmpul `*_open` sau `*_close`)."""
+        market = market.upper()
+        for line_key in self.line_keys:
+            for dir_key, _ in self.MARKETS[market]:
+                self.record(market, line_key, dir_key, lines_data[line_key][f'{dir_key}_{field}'], timestamp)
+
+    def trajectory(self, market, line_key, side):
+        """Decodează traiectoria unei serii: (timpi în secunde, cote), în ordine cronologică."""
+        i = self._series(market, line_key, side)
+        count = int(self._count[i])
+        if count == 0:
+            return np.empty(0), np.empty(0)
+        order = (self._start[i] + np.arange(count)) % self.capacity
+        odds_d = self._odds_delta[i, order].astype(np.int64)
+        time_d = self._time_delta[i, order].astype(np.int64)
+        odds_d[0], time_d[0] = 0, 0
+        odds = (self._head_odds[i] + np.cumsum(odds_d)) / self.ODDS_SCALE
+        times = (self._head_time[i] + np.cumsum(time_d)) / 1000.0
+        return times, odds
+
+    @staticmethod
+    def _window_pairs(times, window_seconds):
+        """Masca perechilor (i < j) aflate în aceeași fereastră de timp."""
+        n = len(times)
+        pairs = np.triu(np.ones((n, n), dtype=bool), k=1)
+        if window_seconds is not None:
+            pairs &= (times[None, :] - times[:, None]) <= window_seconds
+        return pairs
+
+    def trajectory_kld(self, market, window_seconds=None, analyzer=None):
+        """
+        KLD pe traiectoria liniei close (aceeași formulă ca _calculate_kl_divergence_FIXED):
+        - open_close: primul vs ultimul snapshot din buffer
+        - max_window: divergența maximă între oricare două snapshot-uri din fereastră
+        Dacă se dă `analyzer`, include și KLD-ul open/close clasic al analizorului.
+        """
+        market = market.upper()
+        result = {}
+        best_max, best_direction = -1.0, None
+
+        for dir_key, dir_name in self.MARKETS[market]:
+            times, odds = self.trajectory(market, 'close', dir_key)
+            entry = {'open_close': 0.0, 'max_window': 0.0, 'max_window_span': None, 'snapshots': len(odds)}
+
+            if len(odds) >= 2:
+                p = 1.0 / odds
+                entry['open_close'] = float(p[-1] * np.log(p[-1] / p[0]))
+
+                pairs = self._window_pairs(times, window_seconds)
+                if pairs.any():
+                    kld = np.abs(p[None, :] * np.log(p[None, :] / p[:, None]))
+                    kld = np.where(pairs, kld, -1.0)
+                    i, j = np.unravel_index(np.argmax(kld), kld.shape)
+                    entry['max_window'] = float(kld[i, j])
+                    entry['max_window_span'] = (float(times[i]), float(times[j]))
+
+            if analyzer is not None:
+                entry['open_close_V73'] = analyzer._kld_scores[market][dir_name]
+
+            if entry['max_window'] > best_max:
+                best_max, best_direction = entry['max_window'], dir_name
+            result[dir_name] = entry
+
+        result['max'] = max(best_max, 0.0)
+        result['dominant_direction'] = best_direction
+        return result
+
+    def trajectory_steam(self, market, window_seconds=None):
+        """
+        Steam pe traiectorie: scăderea maximă de cotă (i < j) din fereastră, per linie.
+        Aceleași reguli ca _detect_steam_moves (prag 0.08, minim 3 linii din 7, scalat cu lungimea ladder-ului).
+        """
+        market = market.upper()
+        moves = {dir_name: [] for _, dir_name in self.MARKETS[market]}
+        max_moves = {}
+
+        for line_key in self.line_keys:
+            for dir_key, dir_name in self.MARKETS[market]:
+                times, odds = self.trajectory(market, line_key, dir_key)
+                best = 0.0
+                if len(odds) >= 2:
+                    pairs = self._window_pairs(times, window_seconds)
+                    if pairs.any():
+                        drops = odds[:, None] - odds[None, :]
+                        best = float(np.max(np.where(pairs, drops, -np.inf)))
+                max_moves[(line_key, dir_name)] = best
+                if best > self.STEAM_THRESHOLD:
+                    moves[dir_name].append({'line_key': line_key, 'move': best})
+
+        steam = None
+        min_lines = math.ceil(3 * len(self.line_keys) / BASE_LADDER_SIZE)
+        for _, dir_name in self.MARKETS[market]:
+            if len(moves[dir_name]) >= min_lines:
+                steam = {
+                    'direction': dir_name,
+                    'strength': len(moves[dir_name]),
+                    'avg_move': float(np.mean([m['move'] for m in moves[dir_name]])),
+                    'lines_affected': moves[dir_name]
+                }
+                break
+
+        return {'steam': steam, 'max_moves': max_moves}
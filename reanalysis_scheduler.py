@@ -0,0 +1,285 @@
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from datetime import datetime
+import numpy as np
+from HybridAnalyzerV73 import HybridAnalyzerV73
+
+# =============================================================================
+# PLANIFICATOR RE-ANALIZĂ (PRIORITATE DUPĂ TIP-OFF ȘI VOLATILITATE)
+# =============================================================================
+
+def line_volatility(analyzer):
+    """
+    Volatilitatea recentă a liniei (0 = stabil): mișcarea istorică raportată la pragul de conflict
+    plus forța Steam raportată la numărul de linii din ladder, pe toate market-urile analizorului.
+    """
+    volatility = 0.0
+    for market, lines_data in analyzer.MARKETS.items():
+        historic = analyzer.historic_analysis.get(market) or {}
+        volatility += abs(historic.get('movement', 0.0)) / analyzer.THRESHOLD_HISTORIC_CONFLICT
+        steam = analyzer.steam_detection.get(market)
+        if steam:
+            volatility += steam['strength'] / len(lines_data)
+    return volatility
+
+
+def analyze_payload(payload):
+    """Rulează HybridAnalyzerV73 pe un meci; returnează (predicție, volatilitate, secunde CPU)."""
+    cpu_start = time.thread_time()
+    analyzer = HybridAnalyzerV73(
+        payload['league'], payload['home_team'], payload['away_team'],
+        payload['total_lines'], payload['handicap_lines'], markets=payload.get('markets')
+    )
+    prediction = analyzer.generate_prediction()
+    return prediction, line_volatility(analyzer), time.thread_time() - cpu_start
+
+
+def analyze_payload_batch(payloads):
+    """Varianta pe loturi (același contract, câte un rezultat per meci)."""
+    return [analyze_payload(payload) for payload in payloads]
+
+
+class _TrackedMatch:
+    __slots__ = ('key', 'payload', 'tipoff', 'volatility', 'next_due', 'ready_since',
+                 'in_flight', 'version', 'dispatched_version', 'runs', 'last_result')
+
+    def __init__(self, key, payload, tipoff):
+        self.key = key
+        self.payload = payload
+        self.tipoff = tipoff
+        self.volatility = 0.0
+        self.next_due = 0.0
+        self.ready_since = None
+        self.in_flight = False
+        self.version = 0
+        self.dispatched_version = None  # versiunea la trimiterea în worker (track() în timpul analizei o schimbă)
+        self.runs = 0
+        self.last_result = None
+
+
+class ReanalysisScheduler:
+    """
+    Planificator de re-analiză pentru sute de meciuri urmărite:
+    1. ✅ Intervalul de refresh scade odată cu timpul rămas până la tip-off
+    2. ✅ Volatilitatea recentă (mișcare istorică, Steam) accelerează refresh-ul
+    3. ✅ Buget global de CPU (secunde CPU per secundă de ceas, token bucket)
+    4. ✅ Pool de workeri (thread-uri sau procese) pentru meciuri individuale sau loturi
+    5. ✅ Percentile ale latenței de coadă (scadent → pornit în worker)
+    """
+
+    # Refresh = fracțiune din timpul rămas, limitat între MIN și MAX
+    REFRESH_FRACTION = 0.05
+    MIN_INTERVAL = 30.0
+    MAX_INTERVAL = 6 * 3600.0
+    LATENCY_WINDOW = 10000
+
+    def __init__(self, analyze_fn=analyze_payload, batch_fn=None, batch_size=1, workers=4,
+                 cpu_budget=1.0, burst_seconds=5.0, use_processes=False, on_result=None, clock=time.time):
+        self.analyze_fn = analyze_fn
+        self.batch_fn = batch_fn or (analyze_payload_batch if analyze_fn is analyze_payload else None)
+        self.batch_size = max(1, batch_size)
+        self.workers = workers
+        self.cpu_budget = cpu_budget
+        self.burst = cpu_budget * burst_seconds
+        self.on_result = on_result
+        self.clock = clock
+
+        executor_cls = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        self._executor = executor_cls(max_workers=workers)
+        self._lock = threading.Lock()
+        self._matches = {}
+        self._due_heap = []
+        self._ready_heap = []
+        self._seq = itertools.count()
+        self._in_flight = 0
+        self._tokens = self.burst
+        self._tokens_at = clock()
+        self._queue_latencies = deque(maxlen=self.LATENCY_WINDOW)
+        self.cpu_seconds_used = 0.0
+        self.completed = 0
+        self.failed = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ------------------------------------------------------------------
+    # Meciuri urmărite
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _to_epoch(tipoff):
+        return tipoff.timestamp() if isinstance(tipoff, datetime) else float(tipoff)
+
+    def track(self, key, payload, tipoff):
+        """Începe urmărirea unui meci (sau îi actualizează ladder-ele); re-analiza e scadentă imediat."""
+        with self._lock:
+            match = self._matches.get(key)
+            if match is None:
+                match = _TrackedMatch(key, payload, self._to_epoch(tipoff))
+                self._matches[key] = match
+            else:
+                match.payload = payload
+                match.tipoff = self._to_epoch(tipoff)
+            self._schedule(match, self.clock())
+
+    def untrack(self, key):
+        """Oprește urmărirea unui meci (intrările din heap devin invalide)."""
+        with self._lock:
+            match = self._matches.pop(key, None)
+            if match is not None:
+                match.version += 1
+
+    def refresh_interval(self, match, now):
+        """Intervalul de refresh pentru meci, după tip-off și volatilitate."""
+        time_to_tipoff = max(0.0, match.tipoff - now)
+        interval = time_to_tipoff * self.REFRESH_FRACTION / (1.0 + match.volatility)
+        return min(self.MAX_INTERVAL, max(self.MIN_INTERVAL, interval))
+
+    def priority(self, match, now):
+        """Prioritate mai mare = mai urgent (aproape de tip-off, volatil)."""
+        hours_to_tipoff = max(0.0, match.tipoff - now) / 3600.0
+        return (1.0 + match.volatility) / (1.0 + hours_to_tipoff)
+
+    def _schedule(self, match, due):
+        match.version += 1
+        match.next_due = due
+        match.ready_since = None
+        heapq.heappush(self._due_heap, (due, next(self._seq), match.key, match.version))
+
+    # ------------------------------------------------------------------
+    # Dispecerizare
+    # ------------------------------------------------------------------
+
+    def _refill_tokens(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._tokens_at) * self.cpu_budget)
+        self._tokens_at = now
+
+    def _promote_due(self, now):
+        """Mută meciurile scadente în coada de priorități."""
+        while self._due_heap and self._due_heap[0][0] <= now:
+            due, _, key, version = heapq.heappop(self._due_heap)
+            match = self._matches.get(key)
+            if match is None or match.version != version or match.in_flight:
+                continue
+            match.ready_since = due
+            heapq.heappush(self._ready_heap, (-self.priority(match, now), next(self._seq), key, version))
+
+    def dispatch(self):
+        """Un pas de dispecerizare; returnează numărul de meciuri trimise la workeri."""
+        submitted = 0
+        futures = []
+        with self._lock:
+            now = self.clock()
+            self._refill_tokens(now)
+            self._promote_due(now)
+
+            while self._ready_heap and self._in_flight < self.workers and self._tokens > 0:
+                batch = []
+                while self._ready_heap and len(batch) < self.batch_size:
+                    _, _, key, version = heapq.heappop(self._ready_heap)
+                    match = self._matches.get(key)
+                    if match is None or match.version != version or match.in_flight:
+                        continue
+                    match.in_flight = True
+                    match.dispatched_version = match.version
+                    self._queue_latencies.append(now - match.ready_since)
+                    batch.append(match)
+                if not batch:
+                    break
+
+                self._in_flight += 1
+                submitted += len(batch)
+                payloads = [m.payload for m in batch]
+                if len(batch) == 1:
+                    future = self._executor.submit(self.analyze_fn, payloads[0])
+                elif self.batch_fn is not None:
+                    future = self._executor.submit(self.batch_fn, payloads)
+                else:
+                    future = self._executor.submit(_run_each, self.analyze_fn, payloads)
+                futures.append((batch, future))
+
+        # Callback-urile se atașează în afara lock-ului (un future deja terminat rulează callback-ul imediat)
+        for batch, future in futures:
+            future.add_done_callback(lambda f, b=batch: self._on_done(b, f))
+        return submitted
+
+    def _on_done(self, batch, future):
+        try:
+            results = future.result()
+            if len(batch) == 1:
+                results = [results]
+        except Exception:
+            results = None
+
+        with self._lock:
+            self._in_flight -= 1
+            now = self.clock()
+            for i, match in enumerate(batch):
+                match.in_flight = False
+                # Ladder-e noi primite prin track() cât timp meciul era în worker: re-analiză imediată
+                retracked = match.version != match.dispatched_version
+                if results is None:
+                    self.failed += 1
+                    if match.key in self._matches:
+                        self._schedule(match, now if retracked else now + self.MIN_INTERVAL)
+                    continue
+                prediction, volatility, cpu_seconds = results[i]
+                self.completed += 1
+                self.cpu_seconds_used += cpu_seconds
+                self._tokens -= cpu_seconds
+                match.runs += 1
+                match.volatility = volatility
+                match.last_result = prediction
+                if match.key in self._matches:
+                    self._schedule(match, now if retracked else now + self.refresh_interval(match, now))
+
+        if results is not None and self.on_result is not None:
+            for i, match in enumerate(batch):
+                self.on_result(match.key, results[i][0])
+
+    # ------------------------------------------------------------------
+    # Rulare în fundal
+    # ------------------------------------------------------------------
+
+    def start(self, poll_interval=0.05):
+        """Pornește bucla de dispecerizare într-un thread de fundal."""
+        def loop():
+            while not self._stop.is_set():
+                self.dispatch()
+                self._stop.wait(poll_interval)
+        self._stop.clear()
+        self._thread = threading.Thread(target=loop, name='reanalysis-dispatcher', daemon=True)
+        self._thread.start()
+
+    def stop(self, wait=True):
+        """Oprește bucla și pool-ul de workeri."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._executor.shutdown(wait=wait)
+
+    def get_stats(self):
+        """Statistici: percentile latență coadă, buget CPU, volum."""
+        with self._lock:
+            latencies = np.array(self._queue_latencies) if self._queue_latencies else np.zeros(1)
+            return {
+                'tracked': len(self._matches),
+                'ready': len(self._ready_heap),
+                'in_flight': self._in_flight,
+                'completed': self.completed,
+                'failed': self.failed,
+                'cpu_seconds_used': self.cpu_seconds_used,
+                'cpu_tokens': self._tokens,
+                'queue_latency_p50': float(np.percentile(latencies, 50)),
+                'queue_latency_p90': float(np.percentile(latencies, 90)),
+                'queue_latency_p99': float(np.percentile(latencies, 99)),
+            }
+
+
+def _run_each(analyze_fn, payloads):
+    """Rulează funcția de analiză individual pe un lot (fallback fără batch_fn)."""
+    return [analyze_fn(payload) for payload in payloads]
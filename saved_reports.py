@@ -0,0 +1,72 @@
+import math
+from HybridAnalyzerV73 import ANALYZER_VERSION, HybridAnalyzerV73
+
+# =============================================================================
+# RECONSTRUIREA RAPOARTELOR SALVATE (RE-ANALIZĂ PE LADDER-ELE STOCATE)
+# =============================================================================
+
+# Versiunea salvată în 'Version' -> clasa de analizor care a produs-o
+ANALYZER_VERSIONS = {ANALYZER_VERSION: HybridAnalyzerV73}
+
+# Câmpurile deciziei salvate comparate cu decizia recalculată (câmp document -> cheie predicție)
+DECISION_FIELDS = {
+    'Decision_Type': 'v7_action',
+    'Decision_Market': 'market',
+    'Decision_Direction_Final': 'direction_final',
+    'Decision_Line_BUFFERED': 'line_buffered',
+    'Decision_Cota_REFERENCE': 'cota',
+}
+
+
+def register_analyzer_version(version, analyzer_cls):
+    """Înregistrează clasa care reconstruiește documentele salvate cu `Version` = version."""
+    ANALYZER_VERSIONS[version] = analyzer_cls
+    return analyzer_cls
+
+
+class ReportRehydrationError(ValueError):
+    """Documentul salvat nu poate fi re-analizat (versiune necunoscută sau ladder-e lipsă)."""
+
+
+def _same(saved, recomputed):
+    if isinstance(saved, (int, float)) and isinstance(recomputed, (int, float)):
+        return math.isclose(saved, recomputed, rel_tol=1e-9, abs_tol=1e-9)
+    return saved == recomputed
+
+
+def rehydrate_report(doc):
+    """
+    Re-rulează analizorul versiunii salvate pe All_Total_Lines / All_Handicap_Lines (+ All_Market_Lines)
+    și întoarce raportul complet:
+    {'result': predicția cu 'details', 'lines_input': (total, handicap), 'markets_input': All_Market_Lines,
+     'version': ...,
+     'differences': [(câmp, salvat, recalculat)] - gol dacă decizia recalculată e identică celei salvate}.
+    """
+    version = doc.get('Version')
+    analyzer_cls = ANALYZER_VERSIONS.get(version)
+    if analyzer_cls is None:
+        raise ReportRehydrationError(f"Versiune de analizor necunoscută: {version!r}")
+    total_lines, handicap_lines = doc.get('All_Total_Lines'), doc.get('All_Handicap_Lines')
+    if not total_lines or not handicap_lines:
+        raise ReportRehydrationError("Documentul nu conține ladder-ele (All_Total_Lines / All_Handicap_Lines)")
+
+    analyzer = analyzer_cls(
+        doc.get('League', 'N/A'), doc.get('HomeTeam', 'N/A'), doc.get('AwayTeam', 'N/A'),
+        total_lines, handicap_lines, markets=doc.get('All_Market_Lines')
+    )
+    result = analyzer.generate_prediction()
+
+    differences = []
+    if result['decision'] != 'PLAY':
+        differences.append(('Decision_Type', doc.get('Decision_Type'), result['decision']))
+    else:
+        for field, key in DECISION_FIELDS.items():
+            if field in doc and not _same(doc[field], result[key]):
+                differences.append((field, doc[field], result[key]))
+    return {
+        'result': result,
+        'lines_input': (total_lines, handicap_lines),
+        'markets_input': doc.get('All_Market_Lines'),
+        'version': version,
+        'differences': differences,
+    }
@@ -0,0 +1,123 @@
+import time
+import numpy as np
+from batch_analyzer import BatchAnalyzerV73, outcome_labels, select_final_decisions
+from compact_result import LINE_ORDER, MARKETS, market_fields, pack_match
+
+# =============================================================================
+# ANALIZĂ DE SENSIBILITATE (WHAT-IF) PE UN MECI - UN BATCH VECTORIZAT PER MARKET
+# =============================================================================
+
+# Grila de perturbare: cote ±0.30 (pas 0.01), linii ±6 puncte (pas 0.5)
+ODDS_GRID = np.round(np.arange(-0.30, 0.30001, 0.01), 2)
+LINE_GRID = np.round(np.arange(-6.0, 6.0001, 0.5), 1)
+MIN_ODDS = 1.01
+
+
+def sensitivity_inputs(line_keys=LINE_ORDER, markets=MARKETS, present=None):
+    """
+    Intrările perturbate: (etichetă, market, index linie, câmp) pentru cote și linii.
+    `present` (M, L) marchează liniile cotate de fiecare market (None = toate); cele de padding sunt omise.
+    """
+    inputs = []
+    for m, market in enumerate(markets):
+        for i, line_key in enumerate(line_keys):
+            if present is not None and not present[m, i]:
+                continue
+            for f, field in enumerate(market_fields(market)):
+                inputs.append((f'{market}.{line_key}.{field}', m, i, f))
+    return inputs
+
+
+def _first_flip(deltas, labels, base_label):
+    """Cea mai mică perturbare (în modul) care schimbă decizia, cu noua decizie; (None, None) dacă nu există."""
+    changed = labels != base_label
+    if not changed.any():
+        return None, None
+    k = np.flatnonzero(changed)[np.argmin(np.abs(deltas[changed]))]
+    return float(deltas[k]), labels[k]
+
+
+def analyze_sensitivity(total_lines, handicap_lines, odds_grid=ODDS_GRID, line_grid=LINE_GRID, markets=None):
+    """
+    Perturbă fiecare cotă (open/close), fiecare linie și open_line_value pe grilă și evaluează toate
+    variantele vectorizat (BatchAnalyzerV73). Pentru fiecare intrare returnează distanța minimă
+    (în sus / în jos) la care se schimbă decizia (SKIP / KEEP_V3 / INVERT_V3 / ... + market și direcție).
+    `markets` = market-urile suplimentare ale meciului; ladder-ele de lungimi diferite sunt aliniate
+    pe reuniunea liniilor (NaN = linie necotată, neperturbată).
+    Etapele analizei sunt per market până la alegerea deciziei, deci variantele unui market sunt evaluate
+    doar pe market-ul lor și combinate cu scorurile / acțiunile de bază ale celorlalte market-uri.
+    """
+    started = time.perf_counter()
+    odds_grid = np.asarray(odds_grid, dtype=np.float64)
+    line_grid = np.asarray(line_grid, dtype=np.float64)
+    base_ladders, base_open, line_keys, market_names = pack_match(total_lines, handicap_lines, markets)
+
+    base = BatchAnalyzerV73(base_ladders[None], base_open[None], line_keys=line_keys, markets=market_names)
+    base_label = base.outcome_labels()[0]
+    base_scores = base.scores.reshape(1, -1)
+    base_actions = base.actions.reshape(1, -1)
+
+    inputs = sensitivity_inputs(line_keys, market_names, ~np.isnan(base_ladders[..., 0]))
+    rows = []
+    evaluated = base.n
+    for m, market in enumerate(market_names):
+        # Variantele market-ului: grila fiecărei intrări (fără completare), apoi open_line_value dacă există
+        market_inputs = [entry for entry in inputs if entry[1] == m]
+        grids = [line_grid if f == 0 else odds_grid for _, _, _, f in market_inputs]
+        n_cells = sum(len(grid) for grid in grids)
+        if not np.isnan(base_open[m]):
+            grids.append(line_grid)
+        deltas = np.concatenate(grids)
+
+        variants = np.broadcast_to(base_ladders[m], (len(deltas),) + base_ladders.shape[1:]).copy()
+        sizes = [len(grid) for grid in grids[:len(market_inputs)]]
+        i_idx = np.repeat([i for _, _, i, _ in market_inputs], sizes)
+        f_idx = np.repeat([f for _, _, _, f in market_inputs], sizes)
+        cells = variants[np.arange(n_cells), i_idx, f_idx] + deltas[:n_cells]
+        variants[np.arange(n_cells), i_idx, f_idx] = np.where(f_idx == 0, cells, np.maximum(cells, MIN_ODDS))
+        open_lines = np.full(len(deltas), base_open[m])
+        open_lines[n_cells:] += deltas[n_cells:]
+
+        batch = BatchAnalyzerV73(variants[:, None], open_lines[:, None], line_keys=line_keys, markets=(market,))
+        scores = np.repeat(base_scores, batch.n, axis=0)
+        actions = np.repeat(base_actions, batch.n, axis=0)
+        scores[:, 2 * m:2 * m + 2] = batch.scores.reshape(batch.n, 2)
+        actions[:, 2 * m:2 * m + 2] = batch.actions.reshape(batch.n, 2)
+        play, best_key, _, action = select_final_decisions(scores, actions)
+        labels = outcome_labels(play, best_key, action, base.direction_keys)
+        evaluated += batch.n
+
+        offset = 0
+        for (label, _, i, f), grid in zip(market_inputs, grids):
+            rows.append(_sensitivity_row(label, base_ladders[m, i, f], grid, labels[offset:offset + len(grid)],
+                                         base_label))
+            offset += len(grid)
+        if offset < len(deltas):
+            rows.append(_sensitivity_row(f'{market}.close.open_line_value', base_open[m], line_grid,
+                                         labels[offset:], base_label))
+
+    rows.sort(key=lambda r: (r['flip_distance'] is None, r['flip_distance'] or 0.0, r['input']))
+    return {
+        'base_outcome': base_label,
+        'base': base.prediction(0),
+        'inputs': rows,
+        'evaluated': evaluated,
+        'seconds': time.perf_counter() - started
+    }
+
+
+def _sensitivity_row(label, base_value, deltas, labels, base_label):
+    up = deltas > 0
+    down = deltas < 0
+    flip_up, outcome_up = _first_flip(deltas[up], labels[up], base_label)
+    flip_down, outcome_down = _first_flip(deltas[down], labels[down], base_label)
+    distances = [abs(d) for d in (flip_up, flip_down) if d is not None]
+    return {
+        'input': label,
+        'value': float(base_value),
+        'flip_up': flip_up,
+        'outcome_up': outcome_up,
+        'flip_down': flip_down,
+        'outcome_down': outcome_down,
+        'flip_distance': min(distances) if distances else None
+    }
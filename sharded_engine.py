@@ -0,0 +1,360 @@
+import bisect
+import hashlib
+import json
+import multiprocessing as mp
+import os
+import pickle
+import queue
+import time
+from live_analyzer import LiveAnalyzerV73
+
+# =============================================================================
+# MOTOR LIVE SHARDAT MULTI-PROCES (PLASARE PRIN CONSISTENT HASHING)
+# =============================================================================
+
+def match_key(league, home_team, away_team):
+    """Cheia de plasare a unui meci: (liga, gazdă, oaspete)."""
+    return f"{league.upper()}|{home_team.upper()}|{away_team.upper()}"
+
+
+class ConsistentHashRing:
+    """Inel de consistent hashing cu noduri virtuale (adăugarea unui nod mută ~1/N din chei)."""
+
+    def __init__(self, nodes=(), vnodes=64):
+        self.vnodes = vnodes
+        self._hashes = []
+        self._owners = []
+        for node in nodes:
+            self.add_node(node)
+
+    @staticmethod
+    def _hash(value):
+        return int.from_bytes(hashlib.md5(value.encode('utf-8')).digest()[:8], 'big')
+
+    def add_node(self, node):
+        for v in range(self.vnodes):
+            h = self._hash(f"{node}#{v}")
+            i = bisect.bisect(self._hashes, h)
+            self._hashes.insert(i, h)
+            self._owners.insert(i, node)
+
+    def remove_node(self, node):
+        keep = [(h, o) for h, o in zip(self._hashes, self._owners) if o != node]
+        self._hashes = [h for h, _ in keep]
+        self._owners = [o for _, o in keep]
+
+    def node_for(self, key):
+        if not self._hashes:
+            raise ValueError("Inelul nu are noduri")
+        i = bisect.bisect(self._hashes, self._hash(key)) % len(self._hashes)
+        return self._owners[i]
+
+    @property
+    def nodes(self):
+        return sorted(set(self._owners))
+
+
+# -----------------------------------------------------------------------------
+# Procesul worker (un shard)
+# -----------------------------------------------------------------------------
+
+def _checkpoint_paths(checkpoint_dir, shard_id):
+    base = os.path.join(checkpoint_dir, f"shard_{shard_id}")
+    return base + '.pkl', base + '.journal'
+
+
+def _quarantine_path(checkpoint_dir, shard_id):
+    """Intrările de jurnal care eșuează la reluare (păstrate pentru inspecție, nu reaplicate)."""
+    return os.path.join(checkpoint_dir, f"shard_{shard_id}.quarantine")
+
+
+def _build_analyzer(payload):
+    return LiveAnalyzerV73(
+        payload['league'], payload['home_team'], payload['away_team'],
+        payload['total_lines'], payload['handicap_lines'], markets=payload.get('markets')
+    )
+
+
+def _load_shard_state(checkpoint_dir, shard_id):
+    """Refacere shard: ultimul checkpoint + reluarea jurnalului de tick-uri de după el."""
+    state_path, journal_path = _checkpoint_paths(checkpoint_dir, shard_id)
+    analyzers = {}
+    if os.path.exists(state_path):
+        with open(state_path, 'rb') as f:
+            analyzers = pickle.load(f)
+    replayed = quarantined = 0
+    if os.path.exists(journal_path):
+        with open(journal_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break  # ultima linie poate fi incompletă după un crash
+                key = entry['key']
+                try:
+                    if 'track' in entry:
+                        analyzers[key] = _build_analyzer(entry['track'])
+                    elif 'untrack' in entry:
+                        analyzers.pop(key, None)
+                    elif key in analyzers:
+                        analyzers[key].apply_tick(*entry['tick'])
+                        replayed += 1
+                except Exception as e:
+                    # O intrare care nu se poate reaplica nu trebuie să blocheze pornirea shard-ului
+                    with open(_quarantine_path(checkpoint_dir, shard_id), 'a', encoding='utf-8') as q:
+                        q.write(json.dumps({'entry': entry, 'error': repr(e)}) + '\n')
+                    quarantined += 1
+    return analyzers, replayed, quarantined
+
+
+def _write_checkpoint(checkpoint_dir, shard_id, analyzers, journal):
+    """Checkpoint atomic al shard-ului și trunchierea jurnalului."""
+    state_path, journal_path = _checkpoint_paths(checkpoint_dir, shard_id)
+    tmp_path = state_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(analyzers, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, state_path)
+    journal.seek(0)
+    journal.truncate()
+    journal.flush()
+
+
+def _shard_worker(shard_id, inbox, outbox, checkpoint_dir, checkpoint_every):
+    analyzers, replayed, quarantined = _load_shard_state(checkpoint_dir, shard_id)
+    _, journal_path = _checkpoint_paths(checkpoint_dir, shard_id)
+    journal = open(journal_path, 'a+', encoding='utf-8')
+    if quarantined:
+        # Starea refăcută fără intrările în carantină devine noul punct de plecare
+        _write_checkpoint(checkpoint_dir, shard_id, analyzers, journal)
+    stats = {'ticks': 0, 'decisions': 0, 'busy_seconds': 0.0, 'recovered_matches': len(analyzers),
+             'replayed_ticks': replayed, 'quarantined_entries': quarantined, 'checkpoints': 0,
+             'tick_errors': 0, 'track_errors': 0, 'last_error': None}
+    ticks_since_checkpoint = 0
+    outbox.put(('ready', shard_id, len(analyzers)))
+
+    while True:
+        command = inbox.get()
+        op = command[0]
+        started = time.perf_counter()
+
+        if op == 'tick':
+            _, key, tick = command
+            analyzer = analyzers.get(key)
+            if analyzer is not None:
+                # Întâi aplicarea, apoi jurnalul: un tick respins nu ajunge în jurnal (nu e reluat la restart)
+                try:
+                    result = analyzer.apply_tick(*tick)
+                except Exception as e:
+                    stats['tick_errors'] += 1
+                    stats['last_error'] = f"{key}: {e!r}"
+                else:
+                    journal.write(json.dumps({'key': key, 'tick': list(tick)}) + '\n')
+                    journal.flush()
+                    stats['ticks'] += 1
+                    ticks_since_checkpoint += 1
+                    if result is not None:
+                        stats['decisions'] += 1
+                        outbox.put(('decision', shard_id, key, result))
+                    if ticks_since_checkpoint >= checkpoint_every:
+                        _write_checkpoint(checkpoint_dir, shard_id, analyzers, journal)
+                        stats['checkpoints'] += 1
+                        ticks_since_checkpoint = 0
+        elif op == 'track':
+            _, key, payload = command
+            try:
+                analyzers[key] = _build_analyzer(payload)
+            except Exception as e:
+                stats['track_errors'] += 1
+                stats['last_error'] = f"{key}: {e!r}"
+            else:
+                journal.write(json.dumps({'key': key, 'track': payload}) + '\n')
+                journal.flush()
+        elif op == 'untrack':
+            journal.write(json.dumps({'key': command[1], 'untrack': True}) + '\n')
+            journal.flush()
+            analyzers.pop(command[1], None)
+        elif op == 'export':
+            moved = {key: analyzers.pop(key) for key in command[1] if key in analyzers}
+            _write_checkpoint(checkpoint_dir, shard_id, analyzers, journal)
+            outbox.put(('exported', shard_id, moved))
+        elif op == 'import':
+            analyzers.update(command[1])
+            _write_checkpoint(checkpoint_dir, shard_id, analyzers, journal)
+            outbox.put(('imported', shard_id, len(command[1])))
+        elif op == 'checkpoint':
+            journal.flush()
+            _write_checkpoint(checkpoint_dir, shard_id, analyzers, journal)
+            stats['checkpoints'] += 1
+            ticks_since_checkpoint = 0
+            outbox.put(('checkpointed', shard_id, len(analyzers)))
+        elif op == 'stats':
+            journal.flush()
+            outbox.put(('stats', shard_id, dict(stats, matches=len(analyzers))))
+        elif op == 'stop':
+            journal.flush()
+            _write_checkpoint(checkpoint_dir, shard_id, analyzers, journal)
+            journal.close()
+            outbox.put(('stopped', shard_id, len(analyzers)))
+            return
+
+        stats['busy_seconds'] += time.perf_counter() - started
+
+
+# -----------------------------------------------------------------------------
+# Motorul (procesul coordonator)
+# -----------------------------------------------------------------------------
+
+class ShardedLiveEngine:
+    """
+    Motor Live Shardat V7.3:
+    1. ✅ Starea live (LiveAnalyzerV73) e împărțită pe procese worker
+    2. ✅ Plasare prin consistent hashing pe (liga, gazdă, oaspete)
+    3. ✅ Adăugarea unui worker mută doar meciurile care îi revin
+    4. ✅ Checkpoint + jurnal de tick-uri: un worker repornit se reface fără rebuild complet
+    5. ✅ Tick-uri invalide respinse și numărate (shard-ul nu cade); intrările de jurnal
+       care eșuează la reluare merg în carantină
+    6. ✅ Raportare încărcare per shard
+    """
+
+    REPLY_TIMEOUT = 30.0
+
+    def __init__(self, n_workers, checkpoint_dir, vnodes=64, checkpoint_every=500):
+        self.checkpoint_dir = checkpoint_dir
+        self.checkpoint_every = checkpoint_every
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        self._ctx = mp.get_context('spawn')
+        self._workers = {}  # shard -> (proces, inbox, outbox)
+        self._placement = {}
+        self.decisions = []
+        self.ring = ConsistentHashRing(vnodes=vnodes)
+        for shard_id in range(n_workers):
+            self._spawn(shard_id)
+            self.ring.add_node(shard_id)
+
+    def _spawn(self, shard_id):
+        # Cozi proprii per worker: un worker oprit brusc în timpul unui put() ar bloca lock-ul
+        # de scriere al unei cozi comune pentru toți ceilalți; coada lui e înlocuită la repornire
+        inbox, outbox = self._ctx.Queue(), self._ctx.Queue()
+        process = self._ctx.Process(
+            target=_shard_worker,
+            args=(shard_id, inbox, outbox, self.checkpoint_dir, self.checkpoint_every),
+            name=f'live-shard-{shard_id}', daemon=True
+        )
+        process.start()
+        self._workers[shard_id] = (process, inbox, outbox)
+        self._wait_for('ready', {shard_id})
+
+    def _wait_for(self, kind, shard_ids):
+        """Așteaptă răspunsurile de tip `kind`; deciziile sosite între timp sunt păstrate."""
+        replies = {}
+        deadline = time.time() + self.REPLY_TIMEOUT
+        for shard_id in shard_ids:
+            outbox = self._workers[shard_id][2]
+            while shard_id not in replies:
+                try:
+                    message = outbox.get(timeout=max(0.01, deadline - time.time()))
+                except queue.Empty:
+                    raise TimeoutError(f"Shard-urile {set(shard_ids) - set(replies)} nu au răspuns la '{kind}'")
+                if message[0] == 'decision':
+                    self.decisions.append(message[1:])
+                elif message[0] == kind:
+                    replies[message[1]] = message[2]
+        return replies
+
+    def _send(self, shard_id, command):
+        self._workers[shard_id][1].put(command)
+
+    def track(self, league, home_team, away_team, total_lines, handicap_lines, markets=None):
+        """
+        Plasează un meci pe shard-ul lui și construiește starea live acolo.
+        `markets` = market-urile suplimentare din MARKET_REGISTRY ({nume: ladder}), ca la LiveAnalyzerV73.
+        """
+        key = match_key(league, home_team, away_team)
+        shard_id = self.ring.node_for(key)
+        self._placement[key] = shard_id
+        self._send(shard_id, ('track', key, {
+            'league': league, 'home_team': home_team, 'away_team': away_team,
+            'total_lines': total_lines, 'handicap_lines': handicap_lines, 'markets': markets
+        }))
+        return key
+
+    def untrack(self, key):
+        shard_id = self._placement.pop(key, None)
+        if shard_id is not None:
+            self._send(shard_id, ('untrack', key))
+
+    def tick(self, key, market, line_key, side, close_odds, timestamp=None):
+        """Rutează un tick către shard-ul care deține meciul."""
+        shard_id = self._placement.get(key)
+        if shard_id is None:
+            raise KeyError(f"Meci neurmărit: {key}")
+        self._send(shard_id, ('tick', key, (market, line_key, side, close_odds, timestamp)))
+
+    def drain_decisions(self):
+        """Returnează deciziile emise de shard-uri de la ultimul apel."""
+        for _, _, outbox in self._workers.values():
+            while True:
+                try:
+                    message = outbox.get_nowait()
+                except queue.Empty:
+                    break
+                if message[0] == 'decision':
+                    self.decisions.append(message[1:])
+        decisions, self.decisions = self.decisions, []
+        return decisions
+
+    def add_worker(self):
+        """Adaugă un shard nou; migrează doar meciurile pe care inelul i le atribuie."""
+        shard_id = max(self._workers) + 1 if self._workers else 0
+        self._spawn(shard_id)
+        self.ring.add_node(shard_id)
+
+        moves = {}
+        for key, old_shard in self._placement.items():
+            new_shard = self.ring.node_for(key)
+            if new_shard != old_shard:
+                moves.setdefault(old_shard, []).append(key)
+
+        for old_shard, keys in moves.items():
+            self._send(old_shard, ('export', keys))
+        exported = self._wait_for('exported', set(moves))
+        moved = {}
+        for analyzers in exported.values():
+            moved.update(analyzers)
+        self._send(shard_id, ('import', moved))
+        self._wait_for('imported', {shard_id})
+        for key in moved:
+            self._placement[key] = shard_id
+        return shard_id, len(moved)
+
+    def restart_worker(self, shard_id, kill=True):
+        """Repornește un worker (simulare crash): starea e refăcută din checkpoint + jurnal."""
+        process = self._workers[shard_id][0]
+        if kill:
+            process.terminate()
+        else:
+            self._send(shard_id, ('stop',))
+            self._wait_for('stopped', {shard_id})
+        process.join()
+        self._spawn(shard_id)
+
+    def checkpoint(self):
+        """Forțează checkpoint pe toate shard-urile."""
+        for shard_id in self._workers:
+            self._send(shard_id, ('checkpoint',))
+        return self._wait_for('checkpointed', set(self._workers))
+
+    def shard_load(self):
+        """Încărcarea per shard: meciuri, tick-uri, decizii, timp ocupat, refaceri, erori."""
+        for shard_id in self._workers:
+            self._send(shard_id, ('stats',))
+        return self._wait_for('stats', set(self._workers))
+
+    def shutdown(self):
+        """Oprește toți workerii (cu checkpoint final)."""
+        for shard_id in self._workers:
+            self._send(shard_id, ('stop',))
+        self._wait_for('stopped', set(self._workers))
+        for process, _, _ in self._workers.values():
+            process.join()
+        self._workers = {}
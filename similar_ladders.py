@@ -0,0 +1,236 @@
+import json
+import math
+import os
+import numpy as np
+from HybridAnalyzerV73 import MARKET_REGISTRY
+
+# =============================================================================
+# CĂUTARE DE MECIURI ISTORICE SIMILARE (VECTORI DIN LADDER-E NORMALIZATE)
+# =============================================================================
+
+VECTOR_MARKETS = ('TOTAL', 'HANDICAP')
+SLOTS_PER_SIDE = 2  # liniile m2..p2 în jurul close (ladder-ele mai scurte repetă ultima linie)
+MOVE_SCALE = 5.0        # mișcare de cotă 0.10 -> 0.5
+KLD_SCALE = 10.0
+HISTORIC_SCALE = 0.2    # 5 puncte de mișcare istorică -> 1.0
+MARKET_DIM = (2 * SLOTS_PER_SIDE + 1) * 3 + 3
+VECTOR_DIM = MARKET_DIM * len(VECTOR_MARKETS)
+# Câmpurile documentului salvat păstrate pentru afișarea vecinilor
+META_FIELDS = {
+    'league': 'League', 'home_team': 'HomeTeam', 'away_team': 'AwayTeam', 'date': 'Data_Analiza_Salvare',
+    'decision': 'Decision_Type', 'market': 'Decision_Market', 'direction': 'Decision_Direction_Final',
+    'line': 'Decision_Line_BUFFERED', 'confidence': 'Decision_Confidence_V3', 'outcome': 'Settled_Outcome',
+}
+
+
+def _slot_keys(lines_data):
+    """Cheile m2..p2 ale ladder-ului; o parte mai scurtă repetă linia cea mai depărtată disponibilă."""
+    sides = {}
+    for prefix in ('m', 'p'):
+        last, side = 'close', []
+        for k in range(1, SLOTS_PER_SIDE + 1):
+            last = f'{prefix}{k}' if f'{prefix}{k}' in lines_data else last
+            side.append(last)
+        sides[prefix] = side
+    return sides['m'][::-1] + ['close'] + sides['p']
+
+
+def _market_features(lines_data, spec):
+    dir1, dir2 = spec.dir_keys
+    features = []
+    for key in _slot_keys(lines_data):
+        data = lines_data[key]
+        p1, p2 = 1.0 / data[f'{dir1}_close'], 1.0 / data[f'{dir2}_close']
+        features.append(p1 / (p1 + p2) - 0.5)  # probabilitatea implicită fără marjă, centrată
+        features.append((data[f'{dir1}_open'] - data[f'{dir1}_close']) * MOVE_SCALE)
+        features.append((data[f'{dir2}_open'] - data[f'{dir2}_close']) * MOVE_SCALE)
+
+    close = lines_data['close']
+    for dir_key in (dir1, dir2):
+        p_open, p_close = 1.0 / close[f'{dir_key}_open'], 1.0 / close[f'{dir_key}_close']
+        features.append(p_close * math.log(p_close / p_open) * KLD_SCALE)
+    open_line = close.get('open_line_value')
+    features.append((close['line'] - open_line) * HISTORIC_SCALE if open_line is not None else 0.0)
+    return features
+
+
+def ladder_vector(total_lines, handicap_lines):
+    """
+    Vectorul de caracteristici al unui meci (float32, VECTOR_DIM): per market, pe liniile m2..p2 -
+    probabilitatea implicită normalizată și mișcările open→close ale ambelor direcții; plus KLD-ul
+    pe close și mișcarea istorică a liniei. Independent de nivelul absolut al liniei (comparabil între ligi).
+    """
+    features = []
+    for market, lines_data in zip(VECTOR_MARKETS, (total_lines, handicap_lines)):
+        features.extend(_market_features(lines_data, MARKET_REGISTRY[market]))
+    return np.asarray(features, dtype=np.float32)
+
+
+def document_meta(document):
+    """Câmpurile de afișare ale unui document salvat (valori JSON-serializabile)."""
+    return {field: (str(document[source]) if field == 'date' and document.get(source) is not None else document.get(source))
+            for field, source in META_FIELDS.items()}
+
+
+class SimilarityIndex:
+    """
+    Index de vecini apropiați pe vectorii ladder-elor:
+    1. ✅ Căutare brute-force vectorizată pe blocuri (‖x‖² - 2·X·q + ‖q‖², argpartition per bloc)
+    2. ✅ Inserări incrementale O(1) amortizat (array prealocat, capacitate dublată la nevoie)
+    3. ✅ Filtru opțional pe ligă, excluderea unor ID-uri (ex. meciul curent) și rezultatele decontate
+       (împrospătate din documentele sursă prin refresh_outcomes)
+    4. ✅ Persistență .npz (vectori + ID-uri + metadate JSON)
+    """
+
+    BLOCK_ROWS = 131072
+
+    def __init__(self, capacity=1024):
+        self._vectors = np.empty((capacity, VECTOR_DIM), dtype=np.float32)
+        self._norms = np.empty(capacity, dtype=np.float32)
+        self._league_codes = np.empty(capacity, dtype=np.int32)
+        self._leagues = {}  # ligă -> cod
+        self.ids = []
+        self.meta = []
+        self._rows = {}     # id -> rând
+        self.unsaved = 0    # inserări de la ultima salvare
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _reserve(self, extra):
+        needed = len(self.ids) + extra
+        if needed <= len(self._vectors):
+            return
+        capacity = max(needed, 2 * len(self._vectors))
+        for name in ('_vectors', '_norms', '_league_codes'):
+            old = getattr(self, name)
+            new = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:len(self.ids)] = old[:len(self.ids)]
+            setattr(self, name, new)
+
+    def add(self, item_id, vector, meta=None):
+        """Adaugă (sau înlocuiește, pentru același ID) un meci în index."""
+        vector = np.asarray(vector, dtype=np.float32)
+        meta = meta or {}
+        league = self._leagues.setdefault(meta.get('league'), len(self._leagues))
+        row = self._rows.get(item_id)
+        if row is None:
+            self._reserve(1)
+            row = len(self.ids)
+            self._rows[item_id] = row
+            self.ids.append(item_id)
+            self.meta.append(meta)
+        else:
+            self.meta[row] = meta
+        self._vectors[row] = vector
+        self._norms[row] = float(vector @ vector)
+        self._league_codes[row] = league
+        self.unsaved += 1
+        return row
+
+    def add_match(self, item_id, total_lines, handicap_lines, meta=None):
+        return self.add(item_id, ladder_vector(total_lines, handicap_lines), meta)
+
+    def add_document(self, item_id, document):
+        """Documentul salvat (All_Total_Lines / All_Handicap_Lines + câmpurile de decizie)."""
+        return self.add_match(item_id, document['All_Total_Lines'], document['All_Handicap_Lines'],
+                              document_meta(document))
+
+    def set_outcome(self, item_id, outcome):
+        """Rezultatul decontat al unui meci deja indexat. Returnează True dacă s-a schimbat."""
+        meta = self.meta[self._rows[item_id]]
+        if meta.get('outcome') == outcome:
+            return False
+        meta['outcome'] = outcome
+        self.unsaved += 1
+        return True
+
+    def refresh_outcomes(self, outcomes):
+        """
+        Actualizează rezultatele din documentele sursă (dict id -> rezultat, ex. 'Settled_Outcome' citit
+        la interogare); ID-urile neindexate sunt ignorate. Returnează numărul de rezultate schimbate.
+        """
+        return sum(self.set_outcome(item_id, outcome) for item_id, outcome in outcomes.items()
+                   if item_id in self._rows)
+
+    def query(self, vector, k=10, league=None, exclude=()):
+        """
+        Cei mai apropiați k vecini: listă de {'id', 'distance', **meta}, crescător după distanța euclidiană.
+        `league` limitează căutarea la o ligă; `exclude` = ID-uri omise (ex. meciul analizat).
+        """
+        n = len(self.ids)
+        if n == 0 or k <= 0:
+            return []
+        query = np.asarray(vector, dtype=np.float32)
+        query_norm = float(query @ query)
+        exclude_rows = {self._rows[item_id] for item_id in exclude if item_id in self._rows}
+        want = min(n, k + len(exclude_rows))
+        league_code = self._leagues.get(league) if league is not None else None
+        if league is not None and league_code is None:
+            return []
+
+        best_rows, best_distances = [], []
+        for start in range(0, n, self.BLOCK_ROWS):
+            stop = min(n, start + self.BLOCK_ROWS)
+            distances = self._norms[start:stop] - 2.0 * (self._vectors[start:stop] @ query)
+            if league_code is not None:
+                distances[self._league_codes[start:stop] != league_code] = np.inf
+            take = min(want, stop - start)
+            top = np.argpartition(distances, take - 1)[:take] if take < stop - start else np.arange(stop - start)
+            best_rows.append(top + start)
+            best_distances.append(distances[top])
+
+        rows = np.concatenate(best_rows)
+        distances = np.concatenate(best_distances)
+        order = np.argsort(distances, kind='stable')
+        results = []
+        for i in order:
+            row = int(rows[i])
+            if row in exclude_rows or not np.isfinite(distances[i]):
+                continue
+            results.append({'id': self.ids[row], 'distance': math.sqrt(max(0.0, float(distances[i]) + query_norm)),
+                            **self.meta[row]})
+            if len(results) == k:
+                break
+        return results
+
+    def query_match(self, total_lines, handicap_lines, k=10, league=None, exclude=()):
+        return self.query(ladder_vector(total_lines, handicap_lines), k, league, exclude)
+
+    @classmethod
+    def from_documents(cls, documents):
+        """Index construit din documentele salvate (id, dict); cele fără ladder-e valide sunt sărite."""
+        index = cls()
+        for item_id, document in documents:
+            try:
+                index.add_document(item_id, document)
+            except (KeyError, TypeError, ValueError, ZeroDivisionError):
+                continue
+        index.unsaved = 0
+        return index
+
+    def save(self, path):
+        n = len(self.ids)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, vectors=self._vectors[:n], ids=np.array(self.ids, dtype=str),
+                 meta=np.array([json.dumps(meta, default=str) for meta in self.meta], dtype=str))
+        os.replace(tmp_path, path)
+        self.unsaved = 0
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            vectors = data['vectors']
+            if vectors.shape[1] != VECTOR_DIM:
+                raise ValueError(f"Index salvat cu dimensiunea {vectors.shape[1]}, așteptat {VECTOR_DIM}")
+            ids = data['ids'].tolist()
+            metas = [json.loads(meta) for meta in data['meta']]
+        index = cls(capacity=max(1024, len(ids)))
+        index._vectors[:len(ids)] = vectors
+        index._norms[:len(ids)] = np.einsum('ij,ij->i', vectors, vectors)
+        for row, (item_id, meta) in enumerate(zip(ids, metas)):
+            index._rows[item_id] = row
+            index._league_codes[row] = index._leagues.setdefault(meta.get('league'), len(index._leagues))
+        index.ids = ids
+        index.meta = metas
+        return index
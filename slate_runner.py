@@ -0,0 +1,87 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from HybridAnalyzerV73 import HybridAnalyzerV73
+
+# =============================================================================
+# ANALIZA UNUI SLATE ÎNTREG ÎN PARALEL (REZULTATE ÎN ORDINEA TERMINĂRII)
+# =============================================================================
+
+def analyze_match(match):
+    """
+    Analiza completă a unui meci din slate: raportul generate_prediction (cu 'details', pentru drill-down)
+    + datele de salvare. O eroare de date nu oprește slate-ul: e întoarsă în 'error'.
+    """
+    try:
+        analyzer = HybridAnalyzerV73(
+            match.get('league'), match.get('home_team'), match.get('away_team'),
+            match['total_lines'], match['handicap_lines'], markets=match.get('markets')
+        )
+        result = analyzer.generate_prediction()
+        return {'result': result, 'decision_data': getattr(analyzer, 'decision', None), 'error': None}
+    except Exception as exc:
+        return {'result': None, 'decision_data': None, 'error': f'{type(exc).__name__}: {exc}'}
+
+
+def slate_row(match, outcome):
+    """Rândul de tabel al unui meci analizat (None = încă în lucru)."""
+    row = {
+        'Meci': f"{match.get('league') or '-'} - {match.get('home_team') or '?'} vs {match.get('away_team') or '?'}",
+        'Decizie': '⏳', 'Market': '', 'Direcție': '', 'Linie (buffer)': None, 'Cotă': None,
+        'Încredere': None, 'Acțiune KLD': '',
+    }
+    if outcome is None:
+        return row
+    if outcome['error']:
+        row.update({'Decizie': 'EROARE', 'Acțiune KLD': outcome['error']})
+        return row
+    result = outcome['result']
+    row.update({'Decizie': result['decision'], 'Încredere': round(result['confidence'], 1)})
+    if result['decision'] == 'PLAY':
+        row.update({
+            'Market': result['market'],
+            'Direcție': result['direction_final'],
+            'Linie (buffer)': result['line_buffered'],
+            'Cotă': result['cota'],
+            'Acțiune KLD': result['v7_action'],
+        })
+    return row
+
+
+class SlateRunner:
+    """
+    Analiza paralelă a unui slate (50-150+ meciuri):
+    1. ✅ Pool de procese (sau thread-uri) refolosit între slate-uri
+    2. ✅ run() întoarce (index, rezultat) în ordinea terminării, pentru afișare progresivă
+    3. ✅ Doar indicii ceruți sunt trimiși (reluarea unui slate întrerupt nu reface meciurile gata)
+    """
+
+    def __init__(self, workers=None, use_processes=True, start_method='spawn'):
+        """`start_method='spawn'`: procese curate, sigure și când aplicația are deja thread-uri (Streamlit)."""
+        self.workers = workers or os.cpu_count() or 1
+        if use_processes:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context(start_method))
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers)
+
+    def run(self, matches, indices=None):
+        """Generator (index, rezultat analyze_match) pe măsură ce meciurile se termină."""
+        indices = range(len(matches)) if indices is None else indices
+        futures = {self._executor.submit(analyze_match, matches[i]): i for i in indices}
+        try:
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        finally:
+            # Generator abandonat (ex. rerun Streamlit): meciurile încă nepornite nu mai ocupă pool-ul
+            for future in futures:
+                future.cancel()
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,9 +1,23 @@
 import streamlit as st
+import hashlib
 import json
+import math
+import os
+import time
 from datetime import datetime
 import firebase_admin
 from firebase_admin import credentials, firestore
-from HybridAnalyzerV73 import HybridAnalyzerV73
+from HybridAnalyzerV73 import HybridAnalyzerV73, ladder_line_names
+from analysis_service import batch_backend
+from calibration import CalibrationMap, outcome_value
+from league_sketches import FEATURES, LeagueSketches
+from ladder_import import LadderImportError, matches_to_csv, parse_ladders
+from saved_reports import rehydrate_report
+from similar_ladders import SimilarityIndex
+from slate_runner import SlateRunner, slate_row
+from sensitivity import analyze_sensitivity
+from synthetic_ladders import generate_slate
+from weekly_rollups import TRAP_TYPES, load_firestore_rollups, rebuild_firestore_rollups, update_firestore_rollup
 
 # Configurare pagină
 st.set_page_config(
@@ -13,6 +27,111 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Fragmente: st.fragment (Streamlit ≥ 1.37), st.experimental_fragment (1.33-1.36); altfel funcția simplă
+fragment = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None) or (lambda func: func)
+
+# Rezultatele păstrate în session_state (ultimele N per tip), ca rerun-urile să nu refacă analiza
+SESSION_CACHE_SIZE = 20
+
+# Schițele de cuantile per ligă (KLD, Steam, gradient, entropie), actualizate din fiecare analiză nouă
+LEAGUE_SKETCHES_PATH = os.environ.get('LEAGUE_SKETCHES_PATH', 'league_sketches.json')
+
+# Indexul de meciuri similare (vectori din ladder-e); reconstruit din Firebase dacă fișierul lipsește
+SIMILARITY_INDEX_PATH = os.environ.get('SIMILARITY_INDEX_PATH', 'similarity_index.npz')
+SIMILARITY_SAVE_EVERY = 25  # inserări între salvările indexului pe disc
+
+# Maparea izotonică a încrederii (python calibration.py arhiva --fit calibration.json); opțională
+CALIBRATION_PATH = os.environ.get('CALIBRATION_PATH', 'calibration.json')
+
+def input_hash(*parts):
+    """Hash stabil al datelor de intrare (cheia rezultatelor din session_state)."""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:20]
+
+def session_cached(namespace, key, compute=None):
+    """Rezultatul `key` din session_state[namespace]; calculat cu `compute` dacă lipsește (None = doar citire)."""
+    cache = st.session_state.setdefault(namespace, {})
+    if key not in cache and compute is not None:
+        cache[key] = compute()
+        while len(cache) > SESSION_CACHE_SIZE:
+            cache.pop(next(iter(cache)))
+    return cache.get(key)
+
+@st.cache_resource
+def get_calibration():
+    """Maparea încredere -> probabilitate din CALIBRATION_PATH, dacă fișierul există."""
+    if not os.path.exists(CALIBRATION_PATH):
+        return None
+    try:
+        return CalibrationMap.load(CALIBRATION_PATH)
+    except (OSError, ValueError, KeyError) as e:
+        st.warning(f"Calibrarea din {CALIBRATION_PATH} nu a putut fi încărcată: {e}")
+        return None
+
+@st.cache_resource
+def get_league_sketches():
+    """Schițele per ligă din LEAGUE_SKETCHES_PATH (goale la prima pornire)."""
+    try:
+        return LeagueSketches.load(LEAGUE_SKETCHES_PATH)
+    except (OSError, ValueError, KeyError) as e:
+        st.warning(f"Schițele din {LEAGUE_SKETCHES_PATH} nu au putut fi încărcate: {e}")
+        return LeagueSketches()
+
+@st.cache_resource
+def get_similarity_index(_db):
+    """Indexul de vecini: din SIMILARITY_INDEX_PATH sau construit o dată din meciurile salvate."""
+    if os.path.exists(SIMILARITY_INDEX_PATH):
+        try:
+            return SimilarityIndex.load(SIMILARITY_INDEX_PATH)
+        except (OSError, ValueError, KeyError) as e:
+            st.warning(f"Indexul de meciuri similare nu a putut fi încărcat ({e}) - se reconstruiește")
+    if not _db:
+        return SimilarityIndex()
+    try:
+        index = SimilarityIndex.from_documents((doc.id, doc.to_dict()) for doc in _db.collection('baschet').stream())
+        index.save(SIMILARITY_INDEX_PATH)
+    except Exception as e:
+        st.warning(f"Indexul de meciuri similare nu a putut fi construit: {e}")
+        return SimilarityIndex()
+    return index
+
+def join_neighbour_outcomes(db, index, neighbours):
+    """
+    Rezultatele vecinilor citite la interogare din documentele sursă ('Settled_Outcome' poate fi decontat
+    după indexare). Rezultatele schimbate sunt scrise și în index, care e salvat pe disc.
+    """
+    if not db or not neighbours:
+        return
+    collection = db.collection('baschet')
+    snapshots = db.get_all([collection.document(n['id']) for n in neighbours], field_paths=['Settled_Outcome'])
+    outcomes = {snapshot.id: (snapshot.to_dict() or {}).get('Settled_Outcome')
+                for snapshot in snapshots if snapshot.exists}
+    for neighbour in neighbours:
+        if neighbour['id'] in outcomes:
+            neighbour['outcome'] = outcomes[neighbour['id']]
+    if index.refresh_outcomes(outcomes):
+        index.save(SIMILARITY_INDEX_PATH)
+
+def run_analysis(league, home_team, away_team, total_lines, handicap_lines, markets=None):
+    """Analiza completă a unui meci, în forma păstrată în session_state (rezultat + date pentru salvare)."""
+    sketches = get_league_sketches()
+    analyzer = HybridAnalyzerV73(league, home_team, away_team, total_lines, handicap_lines, markets=markets,
+                                 calibration=get_calibration(), league_sketches=sketches)
+    result = analyzer.generate_prediction()
+    # Meciul intră în schițe după ce a fost comparat cu liga (nu se compară cu el însuși)
+    sketches.observe(analyzer)
+    try:
+        sketches.save(LEAGUE_SKETCHES_PATH)
+    except OSError as e:
+        st.warning(f"Schițele ligii nu au putut fi salvate: {e}")
+    return {
+        'result': result,
+        'decision_data': analyzer.decision,
+        'lines_input': (total_lines, handicap_lines),
+        'markets_input': markets,
+        'saved_id': None,
+    }
+
 # Inițializare Firebase corectată pentru firestore_creds
 def init_firebase():
     try:
@@ -47,10 +166,23 @@ def save_to_firebase(decision_data, db):
         match_id = f"{decision_data['League']}_{decision_data['HomeTeam']}_VS_{decision_data['AwayTeam']}_V7_3_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         decision_data_clean = json.loads(json.dumps(decision_data, default=str))
         db.collection('baschet').document(match_id).set(decision_data_clean)
-        return match_id
     except Exception as e:
         st.error(f"Eroare salvare Firebase: {e}")
         return None
+    try:
+        # Agregatul săptămânal al ligii: un singur document actualizat, fără re-scanarea arhivei
+        update_firestore_rollup(db, decision_data_clean)
+    except Exception as e:
+        st.warning(f"Analiza a fost salvată, dar agregatul săptămânal nu a fost actualizat: {e}")
+    try:
+        # Meciul devine imediat căutabil ca vecin; indexul se scrie pe disc la fiecare SIMILARITY_SAVE_EVERY inserări
+        index = get_similarity_index(db)
+        index.add_document(match_id, decision_data_clean)
+        if index.unsaved >= SIMILARITY_SAVE_EVERY:
+            index.save(SIMILARITY_INDEX_PATH)
+    except Exception as e:
+        st.warning(f"Analiza a fost salvată, dar nu a fost adăugată în indexul de meciuri similare: {e}")
+    return match_id
 
 def get_saved_matches(db):
     """Returnează toate meciurile salvate din Firebase."""
@@ -139,22 +271,48 @@ def create_line_inputs(prefix, line_names):
     
     return lines_data
 
-def display_professional_report(result, is_saved_match=False):
-    """Afișează raportul profesional complet cu TOATE analizele."""
-    
-    st.markdown("---")
-    st.header("📊 RAPORT PROFESIONAL COMPLET V7.3")
-    if is_saved_match:
-        st.warning("📋 **RAPORT SALVAT** - Unele analize detaliate pot fi limitate")
+@fragment
+def display_sensitivity_panel(total_lines, handicap_lines, markets=None):
+    """Secțiunea What-If: cât se poate mișca fiecare cotă / linie (toate market-urile) până se schimbă decizia."""
     st.markdown("---")
+    st.header("🧪 SECȚIUNEA 10: SENSIBILITATE DECIZIE (WHAT-IF)")
     
-    if result['decision'] == 'SKIP':
-        st.error("❌ DECIZIE: SKIP MECI")
-        st.info(f"**Motiv:** {result['reason']}")
-        st.info(f"**Scor Maxim V3:** {result['confidence']:.1f}/100")
+    try:
+        sensitivity = session_cached('sensitivity', input_hash(total_lines, handicap_lines, markets),
+                                     lambda: analyze_sensitivity(total_lines, handicap_lines, markets=markets))
+    except (KeyError, TypeError, ValueError) as e:
+        st.warning(f"⚠️ Analiza de sensibilitate nu este disponibilă: {e}")
+        return
+    
+    fragile = [row for row in sensitivity['inputs'] if row['flip_distance'] is not None]
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("DECIZIE DE BAZĂ", sensitivity['base_outcome'])
+    with col2:
+        st.metric("INTRĂRI CARE SCHIMBĂ DECIZIA", f"{len(fragile)}/{len(sensitivity['inputs'])}")
+    with col3:
+        st.metric("VARIANTE EVALUATE", f"{sensitivity['evaluated']} ({sensitivity['seconds'] * 1000:.0f} ms)")
+    
+    if not fragile:
+        st.success("✅ Decizie stabilă: nicio perturbare din grilă (cote ±0.30, linii ±6) nu o schimbă")
         return
     
-    # SECȚIUNEA 1: DECIZIA FINALĂ
+    st.caption("Cele mai fragile intrări (distanța minimă până la schimbarea deciziei)")
+    st.dataframe([
+        {
+            'Intrare': row['input'],
+            'Valoare': row['value'],
+            'Flip ↑': row['flip_up'],
+            'Decizie ↑': row['outcome_up'],
+            'Flip ↓': row['flip_down'],
+            'Decizie ↓': row['outcome_down'],
+        }
+        for row in fragile[:15]
+    ], use_container_width=True)
+
+@fragment
+def display_section_decision(result):
+    """SECȚIUNEA 1: DECIZIA FINALĂ."""
     st.success("🎯 SECȚIUNEA 1: DECIZIE FINALĂ")
     col1, col2, col3, col4 = st.columns(4)
     
@@ -175,9 +333,15 @@ def display_professional_report(result, is_saved_match=False):
     with col7:
         st.metric("SURSA LINIE", result['source'])
     
-    st.info(f"**🔍 Raționament Final:** {result['reason']}")
+    if 'calibrated_probability' in result:
+        st.metric("PROBABILITATE CALIBRATĂ", f"{result['calibrated_probability']:.1%}",
+                  help="Rata de câștig istorică pentru această încredere (mapare izotonică pe arhiva decontată)")
     
-    # SECȚIUNEA 2: ANALIZĂ CONSENSUS
+    st.info(f"**🔍 Raționament Final:** {result['reason']}")
+
+@fragment
+def display_section_consensus(result):
+    """SECȚIUNEA 2: ANALIZĂ CONSENSUS."""
     st.markdown("---")
     st.header("📈 SECȚIUNEA 2: ANALIZĂ CONSENSUS")
     
@@ -212,8 +376,10 @@ def display_professional_report(result, is_saved_match=False):
                 st.success(f"✅ CONSENSUS DOMINANT: AWAY (+{away_score - home_score:.1f}%)")
     else:
         st.warning("⚠️ Date consensus indisponibile pentru acest meci salvat")
-    
-    # SECȚIUNEA 3: DETECȚIE STEAM & MONEY FLOW
+
+@fragment
+def display_section_steam(result, is_saved_match=False):
+    """SECȚIUNEA 3: DETECȚIE STEAM & MONEY FLOW."""
     st.markdown("---")
     st.header("🔥 SECȚIUNEA 3: ANALIZĂ STEAM MONEY")
     
@@ -245,8 +411,10 @@ def display_professional_report(result, is_saved_match=False):
                 st.warning("⚠️ NU s-a detectat Steam pe HANDICAP")
     else:
         st.info("ℹ️ Analiza Steam nu este disponibilă pentru meciuri salvate")
-    
-    # SECȚIUNEA 4: ANALIZĂ GRADIENT ȘI MANIPULARE
+
+@fragment
+def display_section_gradient(result, is_saved_match=False):
+    """SECȚIUNEA 4: ANALIZĂ GRADIENT ȘI MANIPULARE."""
     st.markdown("---")
     st.header("📊 SECȚIUNEA 4: ANALIZĂ GRADIENT ȘI MANIPULARE")
     
@@ -283,8 +451,10 @@ def display_professional_report(result, is_saved_match=False):
                 st.success("✅ NICIO MANIPULARE DETECTATĂ")
     else:
         st.info("ℹ️ Analiza Gradient și Manipulare nu este disponibilă pentru meciuri salvate")
-    
-    # SECȚIUNEA 5: ANALIZĂ KLD BIDIMENSIONALĂ
+
+@fragment
+def display_section_kld(result):
+    """SECȚIUNEA 5: ANALIZĂ KLD BIDIMENSIONALĂ."""
     st.markdown("---")
     st.header("🌡️ SECȚIUNEA 5: ANALIZĂ KLD (VOLATILITATE)")
     
@@ -322,8 +492,10 @@ def display_professional_report(result, is_saved_match=False):
                 st.info(f"**Direcție dominantă KLD:** {kld_data.get('dominant_direction', 'N/A')}")
     else:
         st.warning("⚠️ Date KLD indisponibile pentru acest meci")
-    
-    # SECȚIUNEA 6: ANALIZĂ ISTORICĂ ȘI CONFLICT
+
+@fragment
+def display_section_historic(result):
+    """SECȚIUNEA 6: ANALIZĂ ISTORICĂ ȘI CONFLICT."""
     st.markdown("---")
     st.header("📜 SECȚIUNEA 6: ANALIZĂ MIȘCARE ISTORICĂ")
     
@@ -354,8 +526,10 @@ def display_professional_report(result, is_saved_match=False):
                                 st.error(f"🚨 CONFLICT: Mișcarea istorică ({data['dominant_direction']}) contrazice direcția {result['direction_final']}")
     else:
         st.info("ℹ️ Analiza Istorică nu este disponibilă pentru acest meci")
-    
-    # SECȚIUNEA 7: ANALIZĂ ENȚROPIE ȘI CONCENTRARE
+
+@fragment
+def display_section_entropy(result, is_saved_match=False):
+    """SECȚIUNEA 7: ANALIZĂ ENȚROPIE ȘI CONCENTRARE."""
     st.markdown("---")
     st.header("🧠 SECȚIUNEA 7: ANALIZĂ ENȚROPIE")
     
@@ -387,8 +561,10 @@ def display_professional_report(result, is_saved_match=False):
                 st.info("Distribuție sănătoasă a probabilităților")
     else:
         st.info("ℹ️ Analiza Entropie nu este disponibilă pentru meciuri salvate")
-    
-    # SECȚIUNEA 8: MATRICEA DE ÎNCREDERE DETALIATĂ
+
+@fragment
+def display_section_confidence(result):
+    """SECȚIUNEA 8: MATRICEA DE ÎNCREDERE DETALIATĂ."""
     st.markdown("---")
     st.header("🎯 SECȚIUNEA 8: MATRICEA ÎNCREDERE V3 DETALIATĂ")
     
@@ -456,8 +632,10 @@ def display_professional_report(result, is_saved_match=False):
                                 st.info(f"**Acțiune:** {trap_class['action']}")
     else:
         st.warning("⚠️ Matricea de încredere nu este disponibilă pentru acest meci")
-    
-    # SECȚIUNEA 9: REZUMAT STRATEGIC
+
+@fragment
+def display_section_strategy(result, is_saved_match=False):
+    """SECȚIUNEA 9: REZUMAT STRATEGIC."""
     st.markdown("---")
     st.header("💡 SECȚIUNEA 9: REZUMAT STRATEGIC")
     
@@ -507,6 +685,130 @@ def display_professional_report(result, is_saved_match=False):
     else:
         st.info("ℹ️ Analiza Confluence Strategic nu este disponibilă pentru meciuri salvate")
 
+@fragment
+def display_section_similar(lines_input, db, exclude=()):
+    """SECȚIUNEA 12: MECIURI ISTORICE CU LADDER-E SIMILARE ȘI CUM S-AU DECONTAT."""
+    st.markdown("---")
+    st.header("🧭 SECȚIUNEA 12: MECIURI ISTORICE SIMILARE")
+    
+    index = get_similarity_index(db)
+    if not len(index):
+        st.info("ℹ️ Nu există meciuri salvate în index. Meciurile salvate devin căutabile imediat.")
+        return
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        k = st.slider("Număr vecini", 5, 50, 10, step=5)
+    with col2:
+        leagues = sorted({meta.get('league') for meta in index.meta if meta.get('league')})
+        league = st.selectbox("Liga vecinilor", ["Toate"] + leagues)
+    
+    started = time.perf_counter()
+    try:
+        neighbours = index.query_match(*lines_input, k=k, league=None if league == "Toate" else league,
+                                       exclude=[item_id for item_id in exclude if item_id])
+    except (KeyError, TypeError, ValueError, ZeroDivisionError) as e:
+        st.warning(f"⚠️ Vectorul ladder-elor nu poate fi calculat: {e}")
+        return
+    elapsed_ms = (time.perf_counter() - started) * 1e3
+    if not neighbours:
+        st.info("ℹ️ Niciun meci similar în liga selectată")
+        return
+    try:
+        join_neighbour_outcomes(db, index, neighbours)
+    except Exception as e:
+        st.warning(f"⚠️ Rezultatele vecinilor nu au putut fi actualizate din Firebase (se afișează cele din index): {e}")
+    
+    # Doar rezultatele decontate câștig / pierdere (push-urile și valorile necunoscute nu intră în rată)
+    settled = []
+    for neighbour in neighbours:
+        try:
+            value = outcome_value(neighbour.get('outcome'))
+        except ValueError:
+            continue
+        if not math.isnan(value):
+            settled.append(value)
+    wins = sum(settled)
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("VECINI", len(neighbours))
+    with col2:
+        st.metric("DECONTAȚI", len(settled))
+    with col3:
+        st.metric("RATĂ CÂȘTIG VECINI", f"{wins / len(settled):.0%}" if settled else "-")
+    
+    st.dataframe([
+        {
+            'Meci': f"{n.get('league') or '-'} - {n.get('home_team') or '?'} vs {n.get('away_team') or '?'}",
+            'Data': str(n.get('date') or '')[:10],
+            'Distanță': round(n['distance'], 3),
+            'Decizie': n.get('decision'),
+            'Market': n.get('market'),
+            'Direcție': n.get('direction'),
+            'Linie': n.get('line'),
+            'Rezultat': n.get('outcome') or '-',
+        }
+        for n in neighbours
+    ], use_container_width=True)
+    st.caption(f"Căutare în {len(index)} meciuri: {elapsed_ms:.1f} ms")
+
+@fragment
+def display_section_league_percentiles(result):
+    """SECȚIUNEA 11: CARACTERISTICILE MECIULUI CA PERCENTILE ÎN PROPRIA LIGĂ."""
+    percentiles = result['details'].get('league_percentiles')
+    if percentiles is None:
+        return
+    st.markdown("---")
+    st.header("📐 SECȚIUNEA 11: PERCENTILE ÎN LIGĂ")
+    
+    if not percentiles:
+        st.info("ℹ️ Prea puține analize în această ligă pentru percentile (minim 30 per caracteristică)")
+        return
+    
+    markets = list(dict.fromkeys(name.split('.', 1)[0] for name in percentiles))
+    st.dataframe([
+        {'Market': market, **{feature: (f"{percentiles[f'{market}.{feature}']:.0f}%"
+                                        if f'{market}.{feature}' in percentiles else '-') for feature in FEATURES}}
+        for market in markets
+    ], use_container_width=True)
+    st.caption("Percentila = ce parte din meciurile ligii au avut o valoare mai mică (ex. KLD la 95% = șoc rar în ligă)")
+
+def display_professional_report(result, is_saved_match=False, lines_input=None, markets_input=None):
+    """
+    Afișează raportul profesional complet cu TOATE analizele.
+    `lines_input` = (total_lines, handicap_lines) activează secțiunea de sensibilitate;
+    `markets_input` = market-urile suplimentare ale meciului, perturbate și ele.
+    """
+    
+    st.markdown("---")
+    st.header("📊 RAPORT PROFESIONAL COMPLET V7.3")
+    if is_saved_match:
+        st.warning("📋 **RAPORT SALVAT** - Unele analize detaliate pot fi limitate")
+    st.markdown("---")
+    
+    if result['decision'] == 'SKIP':
+        st.error("❌ DECIZIE: SKIP MECI")
+        st.info(f"**Motiv:** {result['reason']}")
+        st.info(f"**Scor Maxim V3:** {result['confidence']:.1f}/100")
+        if lines_input:
+            display_sensitivity_panel(*lines_input, markets=markets_input)
+        return
+    
+    # Fiecare secțiune e un fragment: interacțiunile din ea re-randează doar secțiunea (fără re-analiză)
+    display_section_decision(result)
+    display_section_consensus(result)
+    display_section_steam(result, is_saved_match)
+    display_section_gradient(result, is_saved_match)
+    display_section_kld(result)
+    display_section_historic(result)
+    display_section_entropy(result, is_saved_match)
+    display_section_confidence(result)
+    display_section_strategy(result, is_saved_match)
+    
+    if lines_input:
+        display_sensitivity_panel(*lines_input, markets=markets_input)
+    display_section_league_percentiles(result)
+
 # Interfața principală
 def main():
     st.title("🏀 Analizor Baschet Hibrid V7.3 - Raport Profesional")
@@ -517,12 +819,17 @@ def main():
     
     # Sidebar pentru navigare
     st.sidebar.title("Navigare")
-    app_mode = st.sidebar.radio("Alege modul:", ["Analiză Nouă", "Meciuri Salvate"])
+    app_mode = st.sidebar.radio("Alege modul:", ["Analiză Nouă", "Slate (mai multe meciuri)", "Meciuri Salvate",
+                                                 "Rollup Săptămânal"])
     
     if app_mode == "Analiză Nouă":
         render_new_analysis(db)
-    else:
+    elif app_mode == "Slate (mai multe meciuri)":
+        render_slate_dashboard(db)
+    elif app_mode == "Meciuri Salvate":
         render_saved_matches(db)
+    else:
+        render_weekly_rollups(db)
 
 def render_new_analysis(db):
     """Render pentru analiza nouă."""
@@ -539,47 +846,246 @@ def render_new_analysis(db):
     
     st.markdown("---")
     
+    # Import în bloc (CSV / JSON, un singur submit) sau câmpuri individuale
+    input_mode = st.radio("Mod introducere ladder-e", ["Câmpuri individuale", "Import CSV / JSON"], horizontal=True)
+    if input_mode == "Import CSV / JSON":
+        render_bulk_analysis(db, league, home_team, away_team)
+        return
+    
+    # Lungimea ladder-ului (liniile alternative de fiecare parte a close; 3 → 7 linii)
+    n_per_side = int(st.number_input("Linii alternative per parte", min_value=1, max_value=15, value=3, step=1))
+    n_lines = 2 * n_per_side + 1
+    
     # Secțiunea TOTAL
-    st.subheader("📈 Total Puncte - 7 Linii")
-    total_line_names = ['m3', 'm2', 'm1', 'close', 'p1', 'p2', 'p3']
+    st.subheader(f"📈 Total Puncte - {n_lines} Linii")
+    total_line_names = ladder_line_names(n_per_side)
     total_lines = create_line_inputs('total', total_line_names)
     
     st.markdown("---")
     
     # Secțiunea HANDICAP
-    st.subheader("⚖️ Handicap - 7 Linii")
-    handicap_line_names = ['m3', 'm2', 'm1', 'close', 'p1', 'p2', 'p3']
+    st.subheader(f"⚖️ Handicap - {n_lines} Linii")
+    handicap_line_names = ladder_line_names(n_per_side)
     handicap_lines = create_line_inputs('handicap', handicap_line_names)
     
     st.markdown("---")
     
-    # Butonul de analiză
+    # Analiza se face doar la apăsarea butonului; rezultatul rămâne în session_state, cheiat după datele
+    # de intrare, deci salvarea și celelalte interacțiuni nu o refac (și nu o pierd)
+    key = input_hash(league.upper(), home_team.upper(), away_team.upper(), total_lines, handicap_lines)
     if st.button("🚀 GENEREAZĂ RAPORT PROFESIONAL V7.3", type="primary", use_container_width=True):
         with st.spinner("Generare raport profesional complet..."):
             try:
-                analyzer = HybridAnalyzerV73(
-                    league.upper(),
-                    home_team.upper(),
-                    away_team.upper(),
-                    total_lines,
-                    handicap_lines
-                )
-                
-                result = analyzer.generate_prediction()
-                
-                # ✅ APELEAZĂ FUNCȚIA PENTRU AFIȘARE RAPORT (is_saved_match=False)
-                display_professional_report(result, is_saved_match=False)
-                
-                # Opțiune salvare
-                if result['decision'] != 'SKIP' and db:
-                    st.markdown("---")
-                    if st.button("💾 Salvează Raportul în Firebase", type="secondary", use_container_width=True):
-                        match_id = save_to_firebase(analyzer.decision, db)
-                        if match_id:
-                            st.success(f"✅ Raport salvat cu ID: {match_id}")
-                
+                session_cached('analyses', key, lambda: run_analysis(
+                    league.upper(), home_team.upper(), away_team.upper(), total_lines, handicap_lines
+                ))
             except Exception as e:
                 st.error(f"Eroare la generare raport: {e}")
+    
+    analysis = session_cached('analyses', key)
+    if analysis:
+        display_analysis(analysis, db, key)
+
+def display_analysis(analysis, db, key):
+    """Raportul unei analize păstrate în session_state + opțiunea de salvare."""
+    display_professional_report(analysis['result'], is_saved_match=False, lines_input=analysis['lines_input'],
+                                markets_input=analysis.get('markets_input'))
+    if db:
+        display_section_similar(analysis['lines_input'], db, exclude=(analysis['saved_id'],))
+    if analysis['result']['decision'] != 'SKIP' and db:
+        display_save_section(analysis, db, key)
+
+@fragment
+def display_save_section(analysis, db, key):
+    """Salvarea în Firebase ca fragment: click-ul re-randează doar butonul, analiza nu se reface."""
+    st.markdown("---")
+    if analysis['saved_id']:
+        st.success(f"✅ Raport salvat cu ID: {analysis['saved_id']}")
+        return
+    if st.button("💾 Salvează Raportul în Firebase", type="secondary", use_container_width=True,
+                 key=f"save_{key}"):
+        match_id = save_to_firebase(analysis['decision_data'], db)
+        if match_id:
+            analysis['saved_id'] = match_id
+            st.success(f"✅ Raport salvat cu ID: {match_id}")
+
+def bulk_input_form(form_key, submit_label, defaults=None):
+    """
+    Formularul de import (fișier CSV / JSON sau text lipit) într-un singur st.form.
+    Returnează meciurile parsate la submit, altfel None (erorile de format sunt afișate).
+    """
+    st.caption(
+        "**CSV:** un rând per linie - `league, home_team, away_team, market, line_key, line, "
+        "over_open, over_close, under_open, under_close, home_open, home_close, away_open, away_close, "
+        "open_line_value` (separator `,` `;` sau tab). **JSON:** un meci `{total_lines, handicap_lines}` "
+        "sau o listă de meciuri. Liga / echipele lipsă se iau din câmpurile de mai sus."
+    )
+    st.download_button("⬇️ Descarcă șablon CSV", matches_to_csv(list(generate_slate(1))),
+                       file_name="ladder_template.csv", mime="text/csv", key=f"{form_key}_template")
+    
+    with st.form(form_key):
+        uploaded = st.file_uploader("Fișier CSV / JSON", type=['csv', 'tsv', 'txt', 'json'])
+        pasted = st.text_area("sau lipește datele aici", height=220)
+        submitted = st.form_submit_button(submit_label, type="primary", use_container_width=True)
+    
+    if not submitted:
+        return None
+    try:
+        if uploaded is not None:
+            return parse_ladders(uploaded.getvalue(), defaults, filename=uploaded.name)
+        return parse_ladders(pasted, defaults)
+    except LadderImportError as e:
+        st.error(f"Date invalide: {e}")
+        return None
+
+def render_bulk_analysis(db, league, home_team, away_team):
+    """
+    Import în bloc: ladder-e dintr-un fișier sau text lipit (un meci sau un slate), parsate o singură dată
+    la submit. Câmpurile sunt într-un st.form, deci editarea lor nu declanșează rerun-uri.
+    """
+    matches = bulk_input_form("bulk_ladders", "🚀 GENEREAZĂ RAPORT PROFESIONAL V7.3",
+                              {'league': league, 'home_team': home_team, 'away_team': away_team})
+    if matches:
+        st.session_state['bulk_matches'] = matches
+    
+    matches = st.session_state.get('bulk_matches')
+    if not matches:
+        return
+    
+    selected = 0
+    if len(matches) > 1:
+        # Slate: sumarul tuturor meciurilor într-un singur batch vectorizat (calculat o dată per slate)
+        st.subheader(f"📋 Slate importat - {len(matches)} meciuri")
+        predictions = session_cached('slate_predictions', input_hash(matches), lambda: batch_backend(matches))
+        st.dataframe([
+            {
+                'Meci': f"{m['league']} - {m['home_team']} vs {m['away_team']}",
+                'Decizie': 'EROARE' if isinstance(p, Exception) else p['decision'],
+                'Market': p.get('market', '') if isinstance(p, dict) else '',
+                'Direcție': p.get('direction_final', '') if isinstance(p, dict) else '',
+                'Linie': p.get('line_buffered') if isinstance(p, dict) else None,
+                'Cotă': p.get('cota') if isinstance(p, dict) else None,
+                'Încredere': round(p['confidence'], 1) if isinstance(p, dict) else None,
+                'Acțiune': p.get('v7_action', '') if isinstance(p, dict) else str(p),
+            }
+            for m, p in zip(matches, predictions)
+        ], use_container_width=True)
+        labels = [f"{i + 1}. {m['league']} - {m['home_team']} vs {m['away_team']}" for i, m in enumerate(matches)]
+        selected = labels.index(st.selectbox("Raport detaliat pentru:", labels))
+    
+    match = matches[selected]
+    identity = (match['league'] or league.upper(), match['home_team'] or home_team.upper(),
+                match['away_team'] or away_team.upper())
+    key = input_hash(*identity, match['total_lines'], match['handicap_lines'], match.get('markets'))
+    try:
+        analysis = session_cached('analyses', key, lambda: run_analysis(
+            *identity, match['total_lines'], match['handicap_lines'], markets=match.get('markets')
+        ))
+    except Exception as e:
+        st.error(f"Eroare la generare raport: {e}")
+        return
+    display_analysis(analysis, db, key)
+
+@st.cache_resource
+def get_slate_runner():
+    """Pool-ul de procese pentru slate-uri, pornit o singură dată per server."""
+    return SlateRunner()
+
+def render_slate_dashboard(db):
+    """
+    Slate întreg (50-150+ meciuri): analiză paralelă în pool-ul de procese, rânduri afișate progresiv
+    pe măsură ce meciurile se termină, drill-down în raportul profesional pentru orice meci.
+    """
+    st.header("📋 Slate - Analiză Multi-Meci")
+    
+    matches = bulk_input_form("slate_ladders", "🚀 ANALIZEAZĂ SLATE-UL", {'league': 'NBA'})
+    if matches:
+        key = input_hash(matches)
+        slate = st.session_state.get('slate')
+        if not slate or slate['key'] != key:
+            st.session_state['slate'] = {'key': key, 'matches': matches, 'outcomes': [None] * len(matches)}
+    
+    slate = st.session_state.get('slate')
+    if not slate:
+        st.info("Încarcă sau lipește un slate (CSV / JSON) pentru a porni analiza.")
+        return
+    matches, outcomes = slate['matches'], slate['outcomes']
+    
+    # Analiza meciurilor încă neterminate (inclusiv după un rerun care a întrerupt slate-ul)
+    pending = [i for i, outcome in enumerate(outcomes) if outcome is None]
+    progress = st.progress(1 - len(pending) / len(matches),
+                           text=f"{len(matches) - len(pending)}/{len(matches)} meciuri analizate")
+    table = st.empty()
+    if pending:
+        last_render = 0.0
+        for done, (i, outcome) in enumerate(get_slate_runner().run(matches, pending), start=1):
+            outcomes[i] = outcome
+            finished = len(matches) - len(pending) + done
+            # Re-randare limitată (~10/s), ca un slate mare să nu trimită un tabel per meci
+            if time.perf_counter() - last_render > 0.1 or done == len(pending):
+                last_render = time.perf_counter()
+                progress.progress(finished / len(matches), text=f"{finished}/{len(matches)} meciuri analizate")
+                table.dataframe([slate_row(m, o) for m, o in zip(matches, outcomes)], use_container_width=True)
+    else:
+        table.dataframe([slate_row(m, o) for m, o in zip(matches, outcomes)], use_container_width=True)
+    
+    rows = [slate_row(m, o) for m, o in zip(matches, outcomes)]
+    played = sum(1 for row in rows if row['Decizie'] == 'PLAY')
+    errors = sum(1 for row in rows if row['Decizie'] == 'EROARE')
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("MECIURI", len(matches))
+    with col2:
+        st.metric("PLAY", played)
+    with col3:
+        st.metric("ERORI", errors)
+    
+    # Drill-down: raportul complet al meciului ales, din rezultatul deja calculat
+    st.markdown("---")
+    order = sorted(range(len(matches)), key=lambda i: -(rows[i]['Încredere'] or 0))
+    labels = [f"{rows[i]['Decizie']} | {rows[i]['Meci']} | {rows[i]['Încredere'] or 0:.1f}" for i in order]
+    choice = st.selectbox("Raport detaliat pentru:", range(len(order)), format_func=lambda k: labels[k])
+    i = order[choice]
+    if outcomes[i]['error']:
+        st.error(f"Eroare la analiza meciului: {outcomes[i]['error']}")
+        return
+    # Dict-ul analizei stă în session_state (în outcome): fragmentul de salvare scrie saved_id direct în el,
+    # deci după un rerun complet butonul nu reapare și meciul nu poate fi salvat de două ori
+    analysis = outcomes[i].setdefault('analysis', {
+        'result': outcomes[i]['result'],
+        'decision_data': outcomes[i]['decision_data'],
+        'lines_input': (matches[i]['total_lines'], matches[i]['handicap_lines']),
+        'markets_input': matches[i].get('markets'),
+        'saved_id': None,
+    })
+    display_analysis(analysis, db, f"{slate['key']}_{i}")
+
+def legacy_saved_result(match_data):
+    """Raportul din câmpurile salvate (fără re-analiză) - pentru documentele fără ladder-e / versiune cunoscută."""
+    return {
+        'decision': 'PLAY' if match_data.get('Decision_Type') != 'SKIP' else 'SKIP',
+        'market': match_data.get('Decision_Market', ''),
+        'direction_initial': match_data.get('Decision_Direction_Initial_V3', ''),
+        'direction_final': match_data.get('Decision_Direction_Final', ''),
+        'line_original': match_data.get('Decision_Line_ORIGINAL', 0),
+        'line_buffered': match_data.get('Decision_Line_BUFFERED', 0),
+        'cota': match_data.get('Decision_Cota_REFERENCE', 0),
+        'source': match_data.get('Decision_LineSource', ''),
+        'reason': match_data.get('Decision_Reason', ''),
+        'confidence': match_data.get('Decision_Confidence_V3', 0),
+        'v7_action': match_data.get('Decision_Type', ''),
+        'details': {
+            'consensus_score': match_data.get('Consensus_Score', {}),
+            'steam_detection': {},  # Nu este salvat în datele originale
+            'gradient_analysis': {}, # Nu este salvat în datele originale  
+            'manipulation_flags': [], # Nu este salvat în datele originale
+            'entropy_alerts': {}, # Nu este salvat în datele originale
+            'historic_analysis': match_data.get('Historic_Analysis', {}),
+            'kld_scores': match_data.get('KLD_Scores_Bidimensional', {}),
+            'confidence_matrix': match_data.get('Confidence_Matrix_V3', {}),
+            'score_data': {} # Nu este salvat în datele originale
+        }
+    }
 
 def render_saved_matches(db):
     """Render pentru meciurile salvate."""
@@ -612,36 +1118,27 @@ def render_saved_matches(db):
         with col3:
             st.metric("Oaspete", match_data.get('AwayTeam', 'N/A'))
         
-        # Buton pentru a afișa raportul complet din datele salvate
+        # Buton pentru a afișa raportul complet: re-analiză cu versiunea salvată pe ladder-ele stocate,
+        # memorată per document (o singură recalculare, fără intermediarele voluminoase în Firestore)
+        doc_id = matches[match_index]['id']
         if st.button("📊 Afișează Raportul Profesional Salvat", type="primary"):
-            # Reconstruim result-ul din datele salvate
-            result = {
-                'decision': 'PLAY' if match_data.get('Decision_Type') != 'SKIP' else 'SKIP',
-                'market': match_data.get('Decision_Market', ''),
-                'direction_initial': match_data.get('Decision_Direction_Initial_V3', ''),
-                'direction_final': match_data.get('Decision_Direction_Final', ''),
-                'line_original': match_data.get('Decision_Line_ORIGINAL', 0),
-                'line_buffered': match_data.get('Decision_Line_BUFFERED', 0),
-                'cota': match_data.get('Decision_Cota_REFERENCE', 0),
-                'source': match_data.get('Decision_LineSource', ''),
-                'reason': match_data.get('Decision_Reason', ''),
-                'confidence': match_data.get('Decision_Confidence_V3', 0),
-                'v7_action': match_data.get('Decision_Type', ''),
-                'details': {
-                    'consensus_score': match_data.get('Consensus_Score', {}),
-                    'steam_detection': {},  # Nu este salvat în datele originale
-                    'gradient_analysis': {}, # Nu este salvat în datele originale  
-                    'manipulation_flags': [], # Nu este salvat în datele originale
-                    'entropy_alerts': {}, # Nu este salvat în datele originale
-                    'historic_analysis': match_data.get('Historic_Analysis', {}),
-                    'kld_scores': match_data.get('KLD_Scores_Bidimensional', {}),
-                    'confidence_matrix': match_data.get('Confidence_Matrix_V3', {}),
-                    'score_data': {} # Nu este salvat în datele originale
-                }
-            }
-            
-            # ✅ CORECTARE: APELEAZĂ CU is_saved_match=True
-            display_professional_report(result, is_saved_match=True)
+            st.session_state['saved_report_doc'] = doc_id
+        
+        if st.session_state.get('saved_report_doc') == doc_id:
+            try:
+                report = session_cached('saved_reports', doc_id, lambda: rehydrate_report(match_data))
+            except Exception as e:
+                st.warning(f"⚠️ Raportul nu poate fi reconstruit ({e}) - se afișează doar câmpurile salvate")
+                display_professional_report(legacy_saved_result(match_data), is_saved_match=True)
+            else:
+                st.info(f"♻️ Raport reconstruit cu analizorul {report['version']} din ladder-ele salvate")
+                if report['differences']:
+                    st.error("🚨 Decizia recalculată diferă de cea salvată: " + ", ".join(
+                        f"{field}: {saved} → {recomputed}" for field, saved, recomputed in report['differences']))
+                display_professional_report(report['result'], is_saved_match=False,
+                                            lines_input=report['lines_input'],
+                                            markets_input=report.get('markets_input'))
+                display_section_similar(report['lines_input'], db, exclude=(doc_id,))
         
         # Afișare decizie originală
         st.subheader("Decizie Originală")
@@ -655,6 +1152,68 @@ def render_saved_matches(db):
         with col4:
             st.info(f"**Încredere:** {match_data.get('Decision_Confidence_V3', 'N/A')}")
 
+def render_weekly_rollups(db):
+    """Dashboard-ul săptămânal: citește doar documentele de agregat (ligă × săptămână), nu arhiva."""
+    st.header("📅 Rollup Săptămânal - Regimul Pieței")
+    
+    if not db:
+        st.error("Firebase nu este inițializat. Nu se pot încărca agregatele.")
+        return
+    
+    if st.button("🔄 Reconstruiește din arhivă", help="Recalculează toate agregatele din meciurile salvate"):
+        try:
+            written, skipped = rebuild_firestore_rollups(db)
+            st.success(f"✅ {written} agregate reconstruite")
+            if skipped:
+                st.warning(f"⚠️ {skipped} analize sărite (fără semnale salvate și imposibil de re-analizat)")
+        except Exception as e:
+            st.error(f"Eroare reconstruire agregate: {e}")
+    
+    try:
+        store = load_firestore_rollups(db)
+    except Exception as e:
+        st.error(f"Eroare citire agregate: {e}")
+        return
+    if not store.leagues():
+        st.info("Nu există agregate săptămânale. Salvează o analiză sau reconstruiește din arhivă.")
+        return
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        league = st.selectbox("Liga:", store.leagues())
+    with col2:
+        week = st.selectbox("Săptămâna:", store.weeks(league))
+    summary = store.get(league, week).summary()
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("ANALIZE", summary['analyses'])
+    with col2:
+        st.metric("CONFLICT ISTORIC", f"{summary['historic_conflict_rate']:.0%}")
+    with col3:
+        top = max(summary['decision_counts'], key=summary['decision_counts'].get)
+        st.metric("DECIZIE DOMINANTĂ", top)
+    
+    st.subheader("Per Market")
+    st.dataframe([
+        {
+            'Market': market,
+            'Analize': stats['analyses'],
+            'Frecvență Steam': f"{stats['steam_rate']:.0%}",
+            'Direcții Steam': ', '.join(f"{d} {share:.0%}" for d, share in stats['steam_directions'].items()) or '-',
+            'KLD mediu': round(stats['mean_kld'], 4) if stats['mean_kld'] is not None else None,
+            'Trap-uri': stats['traps'],
+            **{f"Trap {t}": f"{stats['trap_mix'].get(t, 0):.0%}" for t in TRAP_TYPES},
+        }
+        for market, stats in summary['markets'].items()
+    ], use_container_width=True)
+    
+    st.subheader("Distribuția Deciziilor")
+    st.dataframe([
+        {'Decizie': decision, 'Analize': count, 'Pondere': f"{summary['decisions'][decision]:.0%}"}
+        for decision, count in sorted(summary['decision_counts'].items(), key=lambda item: -item[1])
+    ], use_container_width=True)
+
 # Rulare aplicație
 if __name__ == "__main__":
     main()
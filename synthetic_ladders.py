@@ -0,0 +1,187 @@
+import math
+import numpy as np
+from HybridAnalyzerV73 import BASE_LADDER_SIZE, MARKET_REGISTRY, ladder_line_names
+
+# =============================================================================
+# GENERATOR DETERMINIST DE LADDER-E SINTETICE (TOTAL / HANDICAP + MARKET-URI SUPLIMENTARE)
+# =============================================================================
+
+LINE_KEYS = ladder_line_names(3)
+SCENARIOS = ('normal', 'steam', 'trap', 'shock', 'historic_conflict')
+
+# Parametri per ligă: (total mediu, deviație total, pas linii TOTAL, deviație handicap)
+LEAGUE_PROFILES = {
+    'NBA': (226.0, 9.0, 1.0, 7.0),
+    'EUROLEAGUE': (161.0, 7.0, 1.0, 6.0),
+    'NCAA': (143.0, 8.0, 1.0, 9.0),
+    'WNBA': (164.0, 7.0, 1.0, 6.5),
+}
+
+MARGIN = 0.05  # marja bookmaker-ului (overround)
+
+# Partea din punctele meciului acoperită de market-urile suplimentare (după prefix)
+POINTS_SHARE = (('TEAM_TOTAL', 0.5), ('H1', 0.5), ('Q', 0.25))
+
+
+def _fair_odds(p, margin=MARGIN):
+    """Cota cu marjă pentru o probabilitate reală p."""
+    return 1.0 / (p * (1.0 + margin))
+
+
+def _round_odds(x):
+    return float(max(1.01, round(x, 2)))
+
+
+def _build_ladder(rng, market, close_line, step, sigma, drift, n_per_side=3):
+    """
+    Construiește un ladder realist: linia close ~ echilibrată, liniile alternative mai ieftine/scumpe
+    după distanța față de close; cotele open diferă prin zgomot + drift.
+    """
+    spec = MARKET_REGISTRY[market]
+    dir_keys = spec.dir_keys
+    mu = close_line + rng.normal(0.0, sigma * 0.05)
+    ladder = {}
+    for i, key in enumerate(ladder_line_names(n_per_side)):
+        line = close_line + (i - n_per_side) * step
+        # TOTAL: P(over) scade când linia crește; HANDICAP: P(home acoperă) crește cu linia
+        z = (mu - line) / sigma if spec.kind == 'total' else (line - mu) / sigma
+        p1 = 0.5 * (1.0 + math.erf(z / math.sqrt(2.0)))
+        p1 = min(0.95, max(0.05, p1))
+        close1 = _fair_odds(p1)
+        close2 = _fair_odds(1.0 - p1)
+        open1 = close1 + drift[0] + rng.normal(0.0, 0.025)
+        open2 = close2 + drift[1] + rng.normal(0.0, 0.025)
+        ladder[key] = {
+            'line': round(line, 1),
+            f'{dir_keys[0]}_open': _round_odds(open1),
+            f'{dir_keys[0]}_close': _round_odds(close1),
+            f'{dir_keys[1]}_open': _round_odds(open2),
+            f'{dir_keys[1]}_close': _round_odds(close2),
+        }
+    return ladder, dir_keys
+
+
+def _apply_steam(rng, ladder, dir_key, n_lines):
+    """Steam: cotele open ale direcției sunt cu 0.09-0.20 peste close pe n_lines linii."""
+    for key in rng.choice(list(ladder), size=n_lines, replace=False):
+        ladder[key][f'{dir_key}_open'] = _round_odds(ladder[key][f'{dir_key}_close'] + rng.uniform(0.09, 0.20))
+
+
+def _apply_trap(rng, ladder, dir_key):
+    """Trap: o linie alternativă cu cota close mult sub cea a liniei close (> 0.20)."""
+    key = str(rng.choice([k for k in ladder if k != 'close']))
+    close_odds = ladder['close'][f'{dir_key}_close']
+    ladder[key][f'{dir_key}_close'] = _round_odds(close_odds - rng.uniform(0.22, 0.40))
+    ladder[key][f'{dir_key}_open'] = _round_odds(ladder[key][f'{dir_key}_close'] + rng.uniform(0.0, 0.35))
+
+
+def _apply_shock(rng, ladder, dir_key):
+    """Șoc KLD: mișcare mare open → close pe linia close (KLD ≥ ~0.06)."""
+    close_odds = ladder['close'][f'{dir_key}_close']
+    ladder['close'][f'{dir_key}_open'] = _round_odds(close_odds * rng.uniform(1.13, 1.30))
+
+
+def _steam_range(n_lines, low, high):
+    """Intervalul [low, high) de linii cu Steam (calibrat pe 7 linii), scalat la lungimea ladder-ului."""
+    return math.ceil(low * n_lines / BASE_LADDER_SIZE), math.ceil((high - 1) * n_lines / BASE_LADDER_SIZE) + 1
+
+
+def _points_share(market):
+    for prefix, share in POINTS_SHARE:
+        if market.startswith(prefix):
+            return share
+    raise ValueError(f"Market fără profil sintetic: {market}")
+
+
+def _build_extra_ladder(rng, market, total_close, handicap_close, step, handicap_sd, n_per_side):
+    """Ladder-ul unui market suplimentar, scalat din TOTAL / HANDICAP cu partea lui de puncte."""
+    share = _points_share(market)
+    scale = math.sqrt(share)
+    line_step = max(0.5, round(step * share * 2) / 2)
+    if MARKET_REGISTRY[market].kind == 'total':
+        close_line = round(rng.normal(total_close * share, 2.0 * scale) * 2) / 2
+        lines, _ = _build_ladder(rng, market, close_line, line_step, 12.0 * scale,
+                                 tuple(rng.normal(0.0, 0.03, size=2)), n_per_side)
+        lines['close']['open_line_value'] = round((close_line + rng.normal(0.0, 1.2 * scale)) * 2) / 2
+    else:
+        close_line = round(rng.normal(handicap_close * share, handicap_sd * scale * 0.3) * 2) / 2
+        lines, _ = _build_ladder(rng, market, close_line, 0.5 * line_step, 11.0 * scale,
+                                 tuple(rng.normal(0.0, 0.03, size=2)), n_per_side)
+        lines['close']['open_line_value'] = round((close_line + rng.normal(0.0, 0.8 * scale)) * 2) / 2
+    return lines
+
+
+def generate_match(rng, scenario=None, league=None, index=0, n_per_side=3, extra_markets=()):
+    """
+    Generează un meci sintetic. `rng` e un numpy Generator (determinist la aceeași sămânță).
+    `n_per_side` = liniile alternative de fiecare parte a liniei close (3 → ladder-ul standard m3..p3).
+    `extra_markets` = market-uri suplimentare din MARKET_REGISTRY (ex. 'H1_TOTAL', 'Q1_HANDICAP');
+    fără ele, meciul generat e identic cu cel de până acum.
+    Returnează dict cu league, home_team, away_team, total_lines, handicap_lines, scenario (+ markets).
+    """
+    if scenario is None:
+        scenario = SCENARIOS[int(rng.integers(len(SCENARIOS)))]
+    if league is None:
+        league = list(LEAGUE_PROFILES)[int(rng.integers(len(LEAGUE_PROFILES)))]
+    total_mean, total_sd, total_step, handicap_sd = LEAGUE_PROFILES[league]
+
+    total_close = round(rng.normal(total_mean, total_sd) * 2) / 2
+    handicap_close = round(rng.normal(0.0, handicap_sd) * 2) / 2
+    total_drift = tuple(rng.normal(0.0, 0.03, size=2))
+    handicap_drift = tuple(rng.normal(0.0, 0.03, size=2))
+
+    total_lines, total_dirs = _build_ladder(rng, 'TOTAL', total_close, total_step, 12.0, total_drift, n_per_side)
+    handicap_lines, handicap_dirs = _build_ladder(rng, 'HANDICAP', handicap_close, 0.5 * total_step, 11.0,
+                                                  handicap_drift, n_per_side)
+    n_lines = 2 * n_per_side + 1
+
+    # Mișcare istorică obișnuită (sub pragul de conflict în majoritatea cazurilor)
+    total_lines['close']['open_line_value'] = round((total_close + rng.normal(0.0, 1.2)) * 2) / 2
+    handicap_lines['close']['open_line_value'] = round((handicap_close + rng.normal(0.0, 0.8)) * 2) / 2
+
+    markets = {market: _build_extra_ladder(rng, market, total_close, handicap_close, total_step, handicap_sd,
+                                           n_per_side) for market in extra_markets}
+
+    market_lines = [(total_lines, total_dirs), (handicap_lines, handicap_dirs)] + \
+        [(lines, MARKET_REGISTRY[market].dir_keys) for market, lines in markets.items()]
+    lines, dirs = market_lines[int(rng.integers(len(market_lines)))]
+    side = int(rng.integers(2))
+
+    if scenario == 'steam':
+        _apply_steam(rng, lines, dirs[side], int(rng.integers(*_steam_range(n_lines, 3, 8))))
+    elif scenario == 'trap':
+        _apply_trap(rng, lines, dirs[side])
+        if rng.random() < 0.5:
+            _apply_steam(rng, lines, dirs[side], int(rng.integers(*_steam_range(n_lines, 3, 6))))
+    elif scenario == 'shock':
+        _apply_shock(rng, lines, dirs[side])
+    elif scenario == 'historic_conflict':
+        _apply_steam(rng, lines, dirs[side], int(rng.integers(*_steam_range(n_lines, 3, 7))))
+        # Linia istorică mută ≥ 2 puncte în direcția opusă Steam-ului
+        # (linia urcă → bani pe UNDER/AWAY; coboară → bani pe OVER/HOME)
+        shift = rng.uniform(2.5, 7.0)
+        close_line = lines['close']['line']
+        lines['close']['open_line_value'] = round(close_line + (shift if side == 1 else -shift), 1)
+    if rng.random() < 0.05:
+        # Date lipsă: fără open_line_value pe TOTAL
+        total_lines['close'].pop('open_line_value', None)
+
+    match = {
+        'league': league,
+        'home_team': f'HOME{index}',
+        'away_team': f'AWAY{index}',
+        'total_lines': total_lines,
+        'handicap_lines': handicap_lines,
+        'scenario': scenario,
+    }
+    if markets:
+        match['markets'] = markets
+    return match
+
+
+def generate_slate(n, seed=0, scenario=None, league=None, n_per_side=3, extra_markets=()):
+    """Generator lazy de n meciuri deterministe (memorie constantă, potrivit și pentru 1M)."""
+    rng = np.random.default_rng(seed)
+    for i in range(n):
+        yield generate_match(rng, scenario=scenario, league=league, index=i, n_per_side=n_per_side,
+                             extra_markets=extra_markets)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Modulele proiectului sunt la rădăcina repository-ului (layout plat)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
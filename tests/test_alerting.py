@@ -0,0 +1,122 @@
+import numpy as np
+import pytest
+
+from HybridAnalyzerV73 import MARKET_REGISTRY, HybridAnalyzerV73
+from alerting import AlertEngine, parse_conditions
+from synthetic_ladders import generate_match
+
+# =============================================================================
+# PARSERUL CONDIȚIILOR DE ALERTĂ
+# =============================================================================
+
+
+@pytest.fixture(scope='module')
+def all_market_signals():
+    """Semnalele unui meci care cotează toate market-urile din MARKET_REGISTRY."""
+    extra = [market for market in MARKET_REGISTRY if market not in ('TOTAL', 'HANDICAP')]
+    match = generate_match(np.random.default_rng(3), extra_markets=extra)
+    analyzer = HybridAnalyzerV73(match['league'], match['home_team'], match['away_team'],
+                                 match['total_lines'], match['handicap_lines'], markets=match['markets'],
+                                 build_reasoning=False)
+    return analyzer.get_signals()
+
+
+def test_signals_cover_every_registry_market(all_market_signals):
+    for market, spec in MARKET_REGISTRY.items():
+        assert f'{market}.kld_max' in all_market_signals
+        for direction in spec.dir_names:
+            assert f'{market}_{direction}.confidence' in all_market_signals
+
+
+@pytest.mark.parametrize('op, value', [('>=', '0.06'), ('crosses_above', '60'), ('==', 'true')])
+def test_every_signal_key_parses(all_market_signals, op, value):
+    for key in all_market_signals:
+        conditions = parse_conditions(f'{key} {op} {value}')
+        assert [(c.metric, c.op) for c in conditions] == [(key, op)]
+
+
+def test_digit_markets_parse_in_compound_expression():
+    conditions = parse_conditions('H1_TOTAL.kld_max >= 0.06 and Q1_HANDICAP_HOME.confidence crosses_above 60')
+    assert [(c.metric, c.op, c.value) for c in conditions] == [
+        ('H1_TOTAL.kld_max', '>=', 0.06), ('Q1_HANDICAP_HOME.confidence', 'crosses_above', 60.0)]
+
+
+@pytest.mark.parametrize('expression', ['1H_TOTAL.kld_max >= 1', 'h1_total.kld_max >= 1', 'TOTAL >= 1'])
+def test_malformed_metric_is_rejected(expression):
+    with pytest.raises(ValueError, match='Condiție invalidă'):
+        parse_conditions(expression)
+
+
+# =============================================================================
+# INDEXUL COMPILAT AL PRAGURILOR ȘI TRANZIȚIILE ALERTELOR
+# =============================================================================
+
+
+class _Signals:
+    """Analizor minimal pentru AlertEngine.evaluate: doar get_signals()."""
+
+    def __init__(self, **signals):
+        self.signals = {key.replace('__', '.'): value for key, value in signals.items()}
+
+    def get_signals(self):
+        return self.signals
+
+
+def test_threshold_index_checks_only_reachable_rules():
+    engine = AlertEngine(constants={})
+    for threshold in range(1, 11):
+        engine.add_rule(f'ge_{threshold}', f'TOTAL.steam_strength >= {threshold}')
+        engine.add_rule(f'le_{threshold}', f'TOTAL.steam_strength <= {threshold}')
+
+    fired = engine.evaluate('m1', _Signals(TOTAL__steam_strength=3.5))
+
+    # >= 1..3 și <= 4..10: fiecare candidat din index chiar potrivește
+    assert engine.candidates_checked == 10
+    assert sorted(alert['rule'] for alert in fired) == sorted(
+        [f'ge_{t}' for t in range(1, 4)] + [f'le_{t}' for t in range(4, 11)])
+
+
+def test_rule_fires_only_on_inactive_to_active_transition():
+    engine = AlertEngine(constants={})
+    engine.add_rule('kld', 'TOTAL.kld_max >= 0.06')
+
+    assert len(engine.evaluate('m1', _Signals(TOTAL__kld_max=0.08))) == 1
+    assert engine.evaluate('m1', _Signals(TOTAL__kld_max=0.09)) == []
+    assert engine.evaluate('m1', _Signals(TOTAL__kld_max=0.01)) == []
+    assert len(engine.evaluate('m1', _Signals(TOTAL__kld_max=0.07))) == 1
+    # Starea e per meci
+    assert len(engine.evaluate('m2', _Signals(TOTAL__kld_max=0.07))) == 1
+    assert engine.alerts_fired == 3
+
+
+def test_crossing_needs_previous_value_on_the_other_side():
+    engine = AlertEngine(constants={})
+    engine.add_rule('up', 'TOTAL_OVER.confidence crosses_above 60')
+    engine.add_rule('down', 'TOTAL_OVER.confidence crosses_below 40')
+
+    assert engine.evaluate('m1', _Signals(TOTAL_OVER__confidence=65)) == []  # fără valoare anterioară
+    assert engine.evaluate('m1', _Signals(TOTAL_OVER__confidence=55)) == []
+    assert [a['rule'] for a in engine.evaluate('m1', _Signals(TOTAL_OVER__confidence=61))] == ['up']
+    assert [a['rule'] for a in engine.evaluate('m1', _Signals(TOTAL_OVER__confidence=30))] == ['down']
+
+
+def test_secondary_conditions_are_checked_after_index_lookup():
+    engine = AlertEngine(constants={})
+    engine.add_rule('steam_conflict', 'TOTAL.steam_strength >= 3 and TOTAL.historic_conflict == true')
+
+    assert engine.evaluate('m1', _Signals(TOTAL__steam_strength=5, TOTAL__historic_conflict=False)) == []
+    fired = engine.evaluate('m1', _Signals(TOTAL__steam_strength=5, TOTAL__historic_conflict=True))
+    assert [a['signals'] for a in fired] == [{'TOTAL.steam_strength': 5, 'TOTAL.historic_conflict': True}]
+
+
+def test_symbolic_thresholds_and_text_equality():
+    engine = AlertEngine(constants={'KLD_THRESHOLD_SHOCK': 0.12})
+    engine.add_rule('shock', 'TOTAL.kld_max >= KLD_THRESHOLD_SHOCK')
+    engine.add_rule('steam_over', 'TOTAL.steam_direction == OVER')
+    assert engine.rules[0].conditions[0].value == 0.12
+
+    fired = engine.evaluate('m1', _Signals(TOTAL__kld_max=0.2, TOTAL__steam_direction='OVER'))
+    assert sorted(a['rule'] for a in fired) == ['shock', 'steam_over']
+
+    with pytest.raises(ValueError, match='Prag simbolic necunoscut'):
+        engine.add_rule('bad', 'TOTAL.kld_max >= NO_SUCH_CONSTANT')
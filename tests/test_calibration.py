@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from calibration import IsotonicCalibration
+
+# =============================================================================
+# CALIBRAREA IZOTONICĂ (PAV)
+# =============================================================================
+
+
+def _sample(n=20000, seed=0):
+    rng = np.random.default_rng(seed)
+    confidence = rng.uniform(40, 95, n)
+    hit = (rng.random(n) < 0.2 + 0.6 * (confidence - 40) / 55).astype(float)
+    return confidence, hit
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_fit_is_monotonic_and_bounded(seed):
+    confidence, hit = _sample(seed=seed)
+    curve = IsotonicCalibration.fit(confidence, hit, resolution=0.5)
+    assert np.all(np.diff(curve.y) >= 0)
+    assert np.all(np.diff(curve.x) > 0)
+    assert 0.0 <= curve.y.min() and curve.y.max() <= 1.0
+
+    grid = np.linspace(0, 100, 1001)
+    assert np.all(np.diff(curve(grid)) >= 0)
+
+
+def test_decreasing_data_pools_to_weighted_mean():
+    curve = IsotonicCalibration.fit([50, 50, 60, 70, 70, 70], [1, 1, 1, 0, 0, 1])
+    np.testing.assert_allclose(curve.y, 4 / 6)
+    assert curve.n == 6
+
+
+def test_already_monotonic_levels_are_kept():
+    confidence = [50, 50, 60, 60, 70, 70]
+    hit = [0, 0, 0, 1, 1, 1]
+    curve = IsotonicCalibration.fit(confidence, hit, resolution=1.0)
+    np.testing.assert_allclose(curve.x, [50, 60, 70])
+    np.testing.assert_allclose(curve.y, [0.0, 0.5, 1.0])
+    # Constantă în afara intervalului văzut, interpolare liniară între niveluri
+    assert curve(10) == 0.0 and curve(99) == 1.0 and curve(55) == pytest.approx(0.25)
+
+
+def test_unsettled_rows_are_ignored_and_dict_round_trip():
+    confidence, hit = _sample(n=2000)
+    hit[::3] = np.nan
+    curve = IsotonicCalibration.fit(confidence, hit)
+    assert curve.n == int(np.sum(~np.isnan(hit)))
+    restored = IsotonicCalibration.from_dict(curve.to_dict())
+    np.testing.assert_array_equal(restored(confidence), curve(confidence))
+
+    with pytest.raises(ValueError, match='decontate'):
+        IsotonicCalibration.fit([60, 70], [np.nan, np.nan])
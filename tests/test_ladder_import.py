@@ -0,0 +1,77 @@
+import json
+
+import pytest
+
+from HybridAnalyzerV73 import MARKET_REGISTRY
+from ladder_import import LadderImportError, matches_to_csv, parse_ladders
+from synthetic_ladders import generate_slate
+
+# =============================================================================
+# IMPORTUL LADDER-ELOR: DUS-ÎNTORS CSV / JSON
+# =============================================================================
+
+FIELDS = ('league', 'home_team', 'away_team', 'total_lines', 'handicap_lines', 'markets')
+
+
+def _slate(n=4, extra=('H1_TOTAL', 'Q1_HANDICAP')):
+    matches = []
+    for match in generate_slate(n, seed=11, extra_markets=extra):
+        match = {field: match[field] for field in FIELDS if field in match}
+        match['home_team'], match['away_team'] = match['home_team'].upper(), match['away_team'].upper()
+        matches.append(match)
+    return matches
+
+
+def _ladders(match):
+    return {'TOTAL': match['total_lines'], 'HANDICAP': match['handicap_lines'], **match.get('markets', {})}
+
+
+def _assert_same(imported, original):
+    assert len(imported) == len(original)
+    for got, want in zip(imported, original):
+        for field in ('league', 'home_team', 'away_team'):
+            assert got[field] == want[field]
+        got_ladders, want_ladders = _ladders(got), _ladders(want)
+        assert list(got_ladders) == list(want_ladders)
+        for market, lines in want_ladders.items():
+            assert list(got_ladders[market]) == list(lines)
+            for key, data in lines.items():
+                for field, value in data.items():
+                    assert got_ladders[market][key][field] == pytest.approx(value), (market, key, field)
+
+
+def test_csv_round_trip():
+    matches = _slate()
+    text = matches_to_csv(matches)
+    _assert_same(parse_ladders(text, filename='export.csv'), matches)
+    # Detectare după conținut, fără extensie
+    _assert_same(parse_ladders(text.encode('utf-8-sig')), matches)
+
+
+def test_json_round_trip():
+    matches = _slate()
+    _assert_same(parse_ladders(json.dumps({'matches': matches})), matches)
+    _assert_same(parse_ladders(json.dumps(matches[0]), filename='meci.json'), matches[:1])
+
+
+def test_semicolon_csv_with_decimal_commas():
+    matches = _slate(n=1, extra=())
+    text = matches_to_csv(matches)
+    rows = [line.split(',') for line in text.splitlines()]
+    semicolon = '\n'.join(';'.join(cell.replace('.', ',') if cell[:1].isdigit() else cell for cell in row)
+                          for row in rows)
+    _assert_same(parse_ladders(semicolon), matches)
+
+
+def test_template_covers_every_registry_direction():
+    header = matches_to_csv([]).strip().split(',')
+    for spec in MARKET_REGISTRY.values():
+        for key in spec.dir_keys:
+            assert f'{key}_open' in header and f'{key}_close' in header
+
+
+def test_errors_point_to_the_row():
+    text = matches_to_csv(_slate(n=1, extra=())).splitlines()
+    text[3] = text[3].replace('TOTAL', 'CORNERS', 1)
+    with pytest.raises(LadderImportError, match='rândul 4: market necunoscut'):
+        parse_ladders('\n'.join(text))
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from league_sketches import KLLSketch
+
+# =============================================================================
+# SCHIȚA KLL: EROAREA DE RANG ȘI MERGE
+# =============================================================================
+
+K = 200
+MAX_RANK_ERROR = 0.02  # ~O(1/k) cu marjă pentru aleatoriul compactărilor
+
+
+def _max_rank_error(sketch, data):
+    data = np.sort(data)
+    probes = np.quantile(data, np.linspace(0.01, 0.99, 99))
+    exact = (np.searchsorted(data, probes, 'left') + np.searchsorted(data, probes, 'right')) / 2 / len(data)
+    return max(abs(sketch.rank(p) - e) for p, e in zip(probes, exact))
+
+
+def _sketch(data, seed=0):
+    sketch = KLLSketch(k=K, seed=seed)
+    for value in data:
+        sketch.update(value)
+    return sketch
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_rank_error_and_bounded_memory(seed):
+    data = np.random.default_rng(seed).lognormal(size=50000)
+    sketch = _sketch(data, seed)
+    assert sketch.n == len(data)
+    assert _max_rank_error(sketch, data) < MAX_RANK_ERROR
+    assert sum(len(items) for items in sketch._levels) < 3 * K
+    assert (sketch.min, sketch.max) == (data.min(), data.max())
+    assert sketch.quantile(0) == data.min() and sketch.quantile(1) == data.max()
+    assert sketch.quantile(0.5) == pytest.approx(np.median(data), rel=0.05)
+
+
+def test_merge_keeps_rank_error_of_union():
+    rng = np.random.default_rng(4)
+    parts = [rng.normal(loc, 1.0, 20000) for loc in (0.0, 3.0, -2.0)]
+    merged = _sketch(parts[0], 1)
+    for i, part in enumerate(parts[1:], start=2):
+        merged.merge(_sketch(part, i))
+    union = np.concatenate(parts)
+    assert merged.n == len(union)
+    assert _max_rank_error(merged, union) < MAX_RANK_ERROR
+    assert (merged.min, merged.max) == (union.min(), union.max())
+
+
+def test_merge_with_empty_and_nan_ignored():
+    sketch = _sketch([1.0, 2.0, float('nan'), 3.0])
+    assert sketch.n == 3
+    sketch.merge(KLLSketch(k=K))
+    assert sketch.rank(2.0) == pytest.approx(0.5)
+    assert KLLSketch(k=K).merge(sketch).rank(2.0) == pytest.approx(0.5)
+    assert KLLSketch(k=K).rank(1.0) is None and KLLSketch(k=K).quantile(0.5) is None
+
+
+def test_dict_round_trip_preserves_ranks():
+    data = np.random.default_rng(9).exponential(size=10000)
+    sketch = _sketch(data)
+    restored = KLLSketch.from_dict(sketch.to_dict())
+    for probe in (0.1, 0.5, 1.0, 3.0):
+        assert restored.rank(probe) == sketch.rank(probe)
+    restored.update(100.0)
+    assert restored.max == 100.0 and restored.n == sketch.n + 1
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from odds_history import OddsHistoryBuffer
+
+# =============================================================================
+# BUFFER-UL CIRCULAR DELTA-ENCODAT AL ISTORICULUI DE COTE
+# =============================================================================
+
+
+def _fill(buffer, odds, start=1_700_000_000.0, step=30.0):
+    for i, value in enumerate(odds):
+        buffer.record('TOTAL', 'close', 'over', value, start + i * step)
+
+
+def test_trajectory_before_wrap_is_exact():
+    buffer = OddsHistoryBuffer(capacity=8)
+    odds = [1.91, 1.88, 1.95, 1.85]
+    _fill(buffer, odds)
+
+    times, decoded = buffer.trajectory('TOTAL', 'close', 'over')
+    np.testing.assert_allclose(decoded, odds)
+    np.testing.assert_allclose(np.diff(times), 30.0)
+
+
+@pytest.mark.parametrize('extra', [1, 5, 17])
+def test_wrap_around_keeps_the_latest_capacity_snapshots(extra):
+    capacity = 6
+    buffer = OddsHistoryBuffer(capacity=capacity)
+    odds = [round(1.70 + 0.013 * i, 3) for i in range(capacity + extra)]
+    _fill(buffer, odds)
+
+    times, decoded = buffer.trajectory('TOTAL', 'close', 'over')
+    np.testing.assert_allclose(decoded, odds[-capacity:])
+    np.testing.assert_allclose(times, 1_700_000_000.0 + 30.0 * np.arange(extra, capacity + extra))
+    # Celelalte serii rămân goale
+    assert len(buffer.trajectory('TOTAL', 'close', 'under')[1]) == 0
+
+
+def test_memory_is_fixed_and_matches_bytes_per_match():
+    buffer = OddsHistoryBuffer(capacity=16)
+    before = buffer.nbytes
+    _fill(buffer, [1.9 + 0.001 * i for i in range(100)])
+    assert buffer.nbytes == before == OddsHistoryBuffer.bytes_per_match(capacity=16)
+
+
+def test_out_of_order_and_oversized_jumps_are_rejected():
+    buffer = OddsHistoryBuffer(capacity=4)
+    buffer.record('TOTAL', 'close', 'over', 1.90, 100.0)
+    with pytest.raises(ValueError, match='cronologică'):
+        buffer.record('TOTAL', 'close', 'over', 1.91, 99.0)
+    with pytest.raises(ValueError, match='Salt de cotă'):
+        buffer.record('TOTAL', 'close', 'over', 40.0, 101.0)
+    with pytest.raises(ValueError, match='Serie necunoscută'):
+        buffer.record('TOTAL', 'p9', 'over', 1.9, 102.0)
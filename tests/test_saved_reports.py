@@ -0,0 +1,59 @@
+import copy
+
+import numpy as np
+import pytest
+
+from HybridAnalyzerV73 import HybridAnalyzerV73
+from saved_reports import ReportRehydrationError, rehydrate_report
+from synthetic_ladders import SCENARIOS, generate_match
+
+# =============================================================================
+# RECONSTRUIREA RAPOARTELOR SALVATE
+# =============================================================================
+
+
+def _saved_document(scenario, extra=()):
+    """
+    Documentul pe care _save_decision_data l-ar fi scris în Firebase (doar deciziile PLAY sunt salvate):
+    primul meci PLAY generat pentru scenariu.
+    """
+    rng = np.random.default_rng(5)
+    for _ in range(200):
+        match = generate_match(rng, scenario=scenario, extra_markets=extra)
+        analyzer = HybridAnalyzerV73(match['league'], match['home_team'], match['away_team'],
+                                     match['total_lines'], match['handicap_lines'], markets=match.get('markets'))
+        analyzer.generate_prediction()
+        if analyzer.decision:
+            return copy.deepcopy(analyzer.decision)
+    pytest.skip(f"Niciun meci PLAY generat pentru scenariul {scenario}")
+
+
+@pytest.mark.parametrize('scenario', SCENARIOS)
+def test_rehydrated_decision_matches_saved_one(scenario):
+    doc = _saved_document(scenario)
+    report = rehydrate_report(doc)
+    assert report['differences'] == []
+    assert report['result']['v7_action'] == doc['Decision_Type']
+
+
+def test_extra_markets_are_reanalyzed():
+    doc = _saved_document('steam', extra=('H1_TOTAL', 'Q1_HANDICAP'))
+    assert set(doc['All_Market_Lines']) == {'H1_TOTAL', 'Q1_HANDICAP'}
+    report = rehydrate_report(doc)
+    assert report['differences'] == []
+    assert report['markets_input'] is doc['All_Market_Lines']
+
+
+def test_changed_decision_is_reported_as_difference():
+    doc = _saved_document('normal')
+    doc['Decision_Type'] = 'NOT_A_DECISION'
+    fields = [field for field, _, _ in rehydrate_report(doc)['differences']]
+    assert fields == ['Decision_Type']
+
+
+def test_unknown_version_or_missing_ladders_raise():
+    doc = _saved_document('normal')
+    with pytest.raises(ReportRehydrationError, match='Versiune'):
+        rehydrate_report({**doc, 'Version': 'V0'})
+    with pytest.raises(ReportRehydrationError, match='ladder'):
+        rehydrate_report({**doc, 'All_Handicap_Lines': None})
@@ -0,0 +1,190 @@
+import json
+import random
+
+import numpy as np
+import pytest
+
+from live_analyzer import LiveAnalyzerV73
+from sharded_engine import (ConsistentHashRing, ShardedLiveEngine, _checkpoint_paths, _load_shard_state,
+                            _quarantine_path, match_key)
+from synthetic_ladders import generate_slate
+
+# =============================================================================
+# MOTORUL SHARDAT: PLASARE, MIGRARE, REFACERE DIN CHECKPOINT + JURNAL
+# =============================================================================
+
+N_MATCHES = 24
+
+
+def _matches(n=N_MATCHES, seed=7):
+    return list(generate_slate(n, seed=seed))
+
+
+def _ticks(matches, n, seed=0):
+    """Tick-uri deterministe (meci, market, linie, direcție, cotă)."""
+    rng = random.Random(seed)
+    ticks = []
+    for _ in range(n):
+        match = rng.choice(matches)
+        market = rng.choice(['TOTAL', 'HANDICAP'])
+        side = rng.choice(['over', 'under'] if market == 'TOTAL' else ['home', 'away'])
+        ticks.append((match, market, rng.choice(['m1', 'close', 'p2']), side, round(rng.uniform(1.6, 2.2), 2)))
+    return ticks
+
+
+def _track_all(engine, matches):
+    return [engine.track(m['league'], m['home_team'], m['away_team'], m['total_lines'], m['handicap_lines'])
+            for m in matches]
+
+
+def _reference(matches, ticks):
+    """Aceleași tick-uri aplicate local, într-un singur proces."""
+    analyzers = {match_key(m['league'], m['home_team'], m['away_team']):
+                 LiveAnalyzerV73(m['league'], m['home_team'], m['away_team'], m['total_lines'], m['handicap_lines'])
+                 for m in matches}
+    for match, market, line_key, side, odds in ticks:
+        analyzers[match_key(match['league'], match['home_team'], match['away_team'])].apply_tick(
+            market, line_key, side, odds)
+    return analyzers
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = ShardedLiveEngine(2, str(tmp_path), checkpoint_every=25)
+    yield engine
+    if engine._workers:
+        engine.shutdown()
+
+
+def test_ring_adding_node_moves_only_keys_it_now_owns():
+    ring = ConsistentHashRing([0, 1, 2])
+    keys = [match_key('NBA', f'H{i}', f'A{i}') for i in range(2000)]
+    before = {key: ring.node_for(key) for key in keys}
+    ring.add_node(3)
+    moved = [key for key in keys if ring.node_for(key) != before[key]]
+    assert moved and all(ring.node_for(key) == 3 for key in moved)
+    assert len(moved) < len(keys) / 2
+
+
+def test_placement_follows_ring(engine):
+    keys = _track_all(engine, _matches())
+    load = engine.shard_load()
+    assert sum(stats['matches'] for stats in load.values()) == len(keys)
+    for key in keys:
+        assert engine._placement[key] == engine.ring.node_for(key)
+
+
+def test_add_worker_migrates_only_reassigned_matches(engine):
+    matches = _matches()
+    keys = _track_all(engine, matches)
+    ticks = _ticks(matches, 200)
+    for match, market, line_key, side, odds in ticks:
+        engine.tick(match_key(match['league'], match['home_team'], match['away_team']), market, line_key, side, odds)
+
+    shard_id, moved = engine.add_worker()
+    assert moved == sum(engine.ring.node_for(key) == shard_id for key in keys)
+    load = engine.shard_load()
+    assert load[shard_id]['matches'] == moved
+    assert sum(stats['matches'] for stats in load.values()) == len(keys)
+    assert all(engine._placement[key] == engine.ring.node_for(key) for key in keys)
+
+    # Starea migrată (inclusiv tick-urile aplicate înainte de mutare) ajunge intactă pe noul shard
+    engine.shutdown()
+    reference = _reference(matches, ticks)
+    analyzers, _, _ = _load_shard_state(engine.checkpoint_dir, shard_id)
+    assert len(analyzers) == moved
+    for key, analyzer in analyzers.items():
+        assert analyzer.confidence_matrix == reference[key].confidence_matrix
+        assert analyzer.MARKETS == reference[key].MARKETS
+
+
+def test_killed_worker_recovers_from_checkpoint_and_journal(engine):
+    matches = _matches()
+    _track_all(engine, matches)
+    ticks = _ticks(matches, 230)  # 25 tick-uri per checkpoint → rămân tick-uri doar în jurnal
+    for match, market, line_key, side, odds in ticks:
+        engine.tick(match_key(match['league'], match['home_team'], match['away_team']), market, line_key, side, odds)
+    before = engine.shard_load()  # răspunsul vine după ce toate tick-urile au fost procesate
+
+    shard_id = max(before, key=lambda s: before[s]['matches'])
+    engine.restart_worker(shard_id, kill=True)
+    after = engine.shard_load()[shard_id]
+    assert after['recovered_matches'] == before[shard_id]['matches']
+    assert after['replayed_ticks'] == before[shard_id]['ticks'] % engine.checkpoint_every
+    assert after['quarantined_entries'] == 0
+
+    engine.shutdown()
+    reference = _reference(matches, ticks)
+    analyzers, _, _ = _load_shard_state(engine.checkpoint_dir, shard_id)
+    assert len(analyzers) == before[shard_id]['matches']
+    for key, analyzer in analyzers.items():
+        assert analyzer.confidence_matrix == reference[key].confidence_matrix
+        assert analyzer.MARKETS == reference[key].MARKETS
+
+
+def test_invalid_tick_is_rejected_without_killing_the_shard(engine):
+    matches = _matches(4)
+    keys = _track_all(engine, matches)
+    shard_id = engine._placement[keys[0]]
+    engine.tick(keys[0], 'TOTAL', 'close', 'over', 0.0)
+    engine.tick(keys[0], 'TOTAL', 'close', 'over', 1.85)
+
+    stats = engine.shard_load()[shard_id]
+    assert stats['tick_errors'] == 1
+    assert stats['ticks'] == 1
+    assert 'Cotă invalidă' in stats['last_error']
+
+    # Tick-ul respins nu e în jurnal: repornirea nu îl reia
+    engine.restart_worker(shard_id, kill=True)
+    stats = engine.shard_load()[shard_id]
+    assert stats['quarantined_entries'] == 0
+    assert stats['replayed_ticks'] == 1
+
+
+def test_replay_quarantines_failing_journal_entries(tmp_path):
+    match = _matches(1)[0]
+    key = match_key(match['league'], match['home_team'], match['away_team'])
+    payload = {'league': match['league'], 'home_team': match['home_team'], 'away_team': match['away_team'],
+               'total_lines': match['total_lines'], 'handicap_lines': match['handicap_lines']}
+    _, journal_path = _checkpoint_paths(str(tmp_path), 0)
+    with open(journal_path, 'w', encoding='utf-8') as f:
+        for entry in ({'key': key, 'track': payload},
+                      {'key': key, 'tick': ['TOTAL', 'close', 'over', 0, None]},
+                      {'key': key, 'tick': ['TOTAL', 'm1', 'under', 1.91, None]}):
+            f.write(json.dumps(entry) + '\n')
+
+    analyzers, replayed, quarantined = _load_shard_state(str(tmp_path), 0)
+    assert (replayed, quarantined) == (1, 1)
+    assert np.isclose(analyzers[key].TOTAL_LINES['m1']['under_close'], 1.91)
+    with open(_quarantine_path(str(tmp_path), 0), encoding='utf-8') as f:
+        rows = [json.loads(line) for line in f]
+    assert len(rows) == 1 and rows[0]['entry']['tick'][3] == 0
+
+
+def test_extra_markets_reach_the_shard_and_survive_restart(engine):
+    matches = list(generate_slate(6, seed=3, extra_markets=('H1_TOTAL', 'Q1_HANDICAP')))
+    keys = [engine.track(m['league'], m['home_team'], m['away_team'], m['total_lines'], m['handicap_lines'],
+                         markets=m['markets']) for m in matches]
+    ticks = [(m, 'H1_TOTAL', 'close', 'over', 1.72) for m in matches] + \
+            [(m, 'Q1_HANDICAP', 'm1', 'away', 2.05) for m in matches]
+    for match, market, line_key, side, odds in ticks:
+        engine.tick(match_key(match['league'], match['home_team'], match['away_team']), market, line_key, side, odds)
+    shard_id = engine._placement[keys[0]]
+    before = engine.shard_load()[shard_id]  # răspunsul vine după ce tick-urile au fost procesate
+    assert before['tick_errors'] == 0 and before['track_errors'] == 0
+    engine.restart_worker(shard_id, kill=True)
+    assert engine.shard_load()[shard_id]['recovered_matches'] == before['matches']
+
+    engine.shutdown()
+    reference = {match_key(m['league'], m['home_team'], m['away_team']):
+                 LiveAnalyzerV73(m['league'], m['home_team'], m['away_team'], m['total_lines'], m['handicap_lines'],
+                                 markets=m['markets']) for m in matches}
+    for match, market, line_key, side, odds in ticks:
+        reference[match_key(match['league'], match['home_team'], match['away_team'])].apply_tick(
+            market, line_key, side, odds)
+    analyzers, _, _ = _load_shard_state(engine.checkpoint_dir, shard_id)
+    assert analyzers
+    for key, analyzer in analyzers.items():
+        assert set(analyzer.MARKETS) == {'TOTAL', 'HANDICAP', 'H1_TOTAL', 'Q1_HANDICAP'}
+        assert analyzer.MARKETS == reference[key].MARKETS
+        assert analyzer.confidence_matrix == reference[key].confidence_matrix
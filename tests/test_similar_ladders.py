@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from similar_ladders import VECTOR_DIM, SimilarityIndex, ladder_vector
+from synthetic_ladders import generate_slate
+
+# =============================================================================
+# INDEXUL DE MECIURI SIMILARE: EXCLUDERE, FILTRU PE LIGĂ, PERSISTENȚĂ
+# =============================================================================
+
+
+@pytest.fixture(scope='module')
+def slate():
+    return list(generate_slate(60, seed=21))
+
+
+def _index(slate):
+    index = SimilarityIndex(capacity=4)  # capacitate mică: forțează realocări
+    for i, match in enumerate(slate):
+        index.add_match(f'm{i}', match['total_lines'], match['handicap_lines'], {'league': match['league']})
+    return index
+
+
+def _brute_force(slate, query, league=None, exclude=()):
+    vectors = np.stack([ladder_vector(m['total_lines'], m['handicap_lines']) for m in slate])
+    distances = np.linalg.norm(vectors - query, axis=1)
+    return [f'm{i}' for i in np.argsort(distances, kind='stable')
+            if f'm{i}' not in exclude and (league is None or slate[i]['league'] == league)]
+
+
+def test_query_matches_brute_force_and_self_is_nearest(slate):
+    index = _index(slate)
+    assert len(index) == len(slate)
+    query = ladder_vector(slate[3]['total_lines'], slate[3]['handicap_lines'])
+    assert query.shape == (VECTOR_DIM,)
+    results = index.query(query, k=5)
+    assert results[0]['id'] == 'm3' and results[0]['distance'] == pytest.approx(0.0, abs=1e-3)
+    assert [r['id'] for r in results] == _brute_force(slate, query)[:5]
+
+
+def test_exclude_drops_ids_but_still_returns_k(slate):
+    index = _index(slate)
+    match = slate[3]
+    results = index.query_match(match['total_lines'], match['handicap_lines'], k=5, exclude=('m3', 'unknown'))
+    query = ladder_vector(match['total_lines'], match['handicap_lines'])
+    assert [r['id'] for r in results] == _brute_force(slate, query, exclude={'m3'})[:5]
+
+
+def test_league_filter_returns_only_that_league(slate):
+    index = _index(slate)
+    league = slate[0]['league']
+    query = ladder_vector(slate[0]['total_lines'], slate[0]['handicap_lines'])
+    results = index.query(query, k=len(slate), league=league, exclude=('m0',))
+    assert results and all(r['league'] == league for r in results)
+    assert [r['id'] for r in results] == _brute_force(slate, query, league=league, exclude={'m0'})
+    assert index.query(query, k=5, league='NO_SUCH_LEAGUE') == []
+
+
+def test_small_blocks_give_same_neighbours(slate, monkeypatch):
+    index = _index(slate)
+    query = ladder_vector(slate[7]['total_lines'], slate[7]['handicap_lines'])
+    expected = index.query(query, k=8, league=slate[7]['league'])
+    monkeypatch.setattr(SimilarityIndex, 'BLOCK_ROWS', 7)
+    assert index.query(query, k=8, league=slate[7]['league']) == expected
+
+
+def test_save_load_round_trip(slate, tmp_path):
+    index = _index(slate)
+    index.set_outcome('m5', 'WIN')
+    path = tmp_path / 'similarity_index.npz'
+    index.save(str(path))
+    loaded = SimilarityIndex.load(str(path))
+    query = ladder_vector(slate[5]['total_lines'], slate[5]['handicap_lines'])
+    expected = index.query(query, k=6)
+    results = loaded.query(query, k=6)
+    assert [r['id'] for r in results] == [r['id'] for r in expected]
+    assert [r['distance'] for r in results] == pytest.approx([r['distance'] for r in expected], rel=1e-5)
+    assert loaded.query(query, k=1)[0]['outcome'] == 'WIN'
+    assert loaded.refresh_outcomes({'m5': 'LOSS', 'not_indexed': 'WIN'}) == 1
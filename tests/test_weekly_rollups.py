@@ -0,0 +1,86 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from weekly_rollups import RollupStore, WeeklyRollup, analysis_signals, week_key
+
+# =============================================================================
+# AGREGATELE SĂPTĂMÂNALE: MERGE ȘI PERSISTENȚĂ
+# =============================================================================
+
+
+def _signals(decision='PLAY', conflict=False, steam=None, kld=0.02, traps=()):
+    return {'league': 'NBA', 'week': '2024-W07', 'decision': decision, 'historic_conflict': conflict,
+            'markets': {'TOTAL': {'steam': steam, 'kld': kld, 'traps': list(traps)},
+                        'HANDICAP': {'steam': None, 'kld': 0.01, 'traps': []}}}
+
+
+SIGNALS = [
+    _signals(steam='OVER', kld=0.08, traps=('REAL',)),
+    _signals(decision='SKIP', conflict=True, kld=0.01),
+    _signals(steam='UNDER', kld=0.05, traps=('CONTRARION', 'AMBIGUOUS')),
+    _signals(steam='OVER', conflict=True),
+    _signals(decision='SKIP', kld=None),
+]
+
+
+def _rollup(signals):
+    rollup = WeeklyRollup('NBA', '2024-W07')
+    for entry in signals:
+        rollup.add(entry)
+    return rollup
+
+
+@pytest.mark.parametrize('split', range(len(SIGNALS) + 1))
+def test_merge_equals_single_pass(split):
+    merged = _rollup(SIGNALS[:split]).merge(_rollup(SIGNALS[split:]))
+    assert merged.to_dict() == _rollup(SIGNALS).to_dict()
+
+
+def test_merge_into_empty_and_with_new_market():
+    extra = dict(_signals(), markets={'H1_TOTAL': {'steam': 'UNDER', 'kld': 0.03, 'traps': ['REAL']}})
+    merged = WeeklyRollup('NBA', '2024-W07').merge(_rollup(SIGNALS)).merge(_rollup([extra]))
+    assert merged.analyses == len(SIGNALS) + 1
+    assert merged.markets['H1_TOTAL'] == {'analyses': 1, 'steam': {'UNDER': 1}, 'kld_sum': 0.03,
+                                          'kld_count': 1, 'traps': {'REAL': 1}}
+    assert merged.markets['TOTAL'] == _rollup(SIGNALS).markets['TOTAL']
+
+
+def test_from_dict_round_trip_through_json():
+    rollup = _rollup(SIGNALS)
+    restored = WeeklyRollup.from_dict(json.loads(json.dumps(rollup.to_dict())))
+    assert restored.to_dict() == rollup.to_dict()
+    assert restored.summary() == rollup.summary()
+
+    summary = restored.summary()
+    assert summary['analyses'] == 5
+    assert summary['historic_conflict_rate'] == pytest.approx(0.4)
+    assert summary['markets']['TOTAL']['steam_directions'] == {'OVER': pytest.approx(2 / 3),
+                                                              'UNDER': pytest.approx(1 / 3)}
+    assert summary['markets']['TOTAL']['mean_kld'] == pytest.approx((0.08 + 0.01 + 0.05 + 0.02) / 4)
+
+
+def test_from_dict_missing_document_is_empty_rollup():
+    rollup = WeeklyRollup.from_dict(None, league='NBA', week='2024-W07')
+    assert (rollup.league, rollup.week, rollup.analyses) == ('NBA', '2024-W07', 0)
+    # Firestore întoarce contoarele ca float după increment
+    rollup = WeeklyRollup.from_dict({'League': 'NBA', 'Week': '2024-W07', 'analyses': 2.0,
+                                     'decisions': {'PLAY': 2.0}, 'markets': {'TOTAL': {'steam': {'OVER': 1.0}}}})
+    assert rollup.decisions == {'PLAY': 2} and rollup.markets['TOTAL']['steam'] == {'OVER': 1}
+
+
+def test_store_groups_by_league_and_iso_week():
+    documents = [
+        {'League': 'NBA', 'Decision_Type': 'PLAY', 'Data_Analiza_Salvare': '2024-02-12T10:00:00', 'Market_Signals': {}},
+        {'League': 'NBA', 'Decision_Type': 'PLAY', 'Data_Analiza_Salvare': datetime(2024, 2, 18, 23, 0), 'Market_Signals': {}},
+        {'League': 'NBA', 'Decision_Type': 'PLAY', 'Data_Analiza_Salvare': '2024-02-19T01:00:00', 'Market_Signals': {}},
+        {'League': 'EURO', 'Decision_Type': 'PLAY', 'Data_Analiza_Salvare': '2024-02-19T01:00:00', 'Market_Signals': {}},
+        {'League': 'NBA', 'Decision_Type': 'PLAY', 'Version': 'V0'},  # fără semnale, versiune necunoscută
+    ]
+    store = RollupStore.rebuild(documents)
+    assert store.skipped == 1
+    assert store.weeks('NBA') == ['2024-W08', '2024-W07']
+    assert store.get('NBA', '2024-W07').analyses == 2
+    assert store.leagues() == ['EURO', 'NBA']
+    assert analysis_signals(documents[0])['week'] == week_key('2024-02-12T10:00:00') == '2024-W07'
@@ -0,0 +1,276 @@
+from datetime import date, datetime
+from saved_reports import ANALYZER_VERSIONS
+
+# =============================================================================
+# AGREGATE SĂPTĂMÂNALE INCREMENTALE (REGIMUL PIEȚEI PER LIGĂ ȘI SĂPTĂMÂNĂ)
+# =============================================================================
+
+ROLLUP_COLLECTION = 'baschet_rollups'
+TRAP_TYPES = ('REAL', 'CONTRARION', 'AMBIGUOUS')
+
+
+def week_key(when=None):
+    """Săptămâna ISO a analizei ('2024-W07'); acceptă datetime / date / text ISO (datele salvate)."""
+    if when is None:
+        when = datetime.now()
+    elif isinstance(when, str):
+        when = datetime.fromisoformat(when.strip())
+    elif not isinstance(when, date):
+        raise ValueError(f"Dată invalidă pentru săptămână: {when!r}")
+    year, week, _ = when.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def rollup_id(league, week):
+    """ID-ul documentului de agregat (o ligă, o săptămână)."""
+    return f"{league}_{week}"
+
+
+def _legacy_signals(decision_data):
+    """Documente salvate înainte de Market_Signals: re-analiza ladder-elor cu versiunea înregistrată."""
+    version = decision_data.get('Version')
+    analyzer_cls = ANALYZER_VERSIONS.get(version)
+    if analyzer_cls is None or not decision_data.get('All_Total_Lines') or not decision_data.get('All_Handicap_Lines'):
+        raise ValueError(f"Documentul nu are Market_Signals și nu poate fi re-analizat (versiune {version!r})")
+    analyzer = analyzer_cls(
+        decision_data.get('League', 'N/A'), decision_data.get('HomeTeam', 'N/A'), decision_data.get('AwayTeam', 'N/A'),
+        decision_data['All_Total_Lines'], decision_data['All_Handicap_Lines'],
+        markets=decision_data.get('All_Market_Lines')
+    )
+    analyzer.generate_prediction()
+    return analyzer.decision.get('Market_Signals', {}), analyzer.decision.get('Decision_Historic_Conflict', False)
+
+
+def analysis_signals(decision_data):
+    """
+    Semnalele unei analize salvate (dict-ul _save_decision_data / documentul Firebase): Market_Signals
+    per market (direcția Steam sau None, KLD maxim, tipurile de trap), decizia și conflictul istoric
+    al direcției alese.
+    """
+    if 'Market_Signals' in decision_data:
+        markets = decision_data['Market_Signals'] or {}
+        historic_conflict = decision_data.get('Decision_Historic_Conflict') in (True, 'True')
+    else:
+        markets, historic_conflict = _legacy_signals(decision_data)
+    return {
+        'league': decision_data.get('League') or 'N/A',
+        'week': week_key(decision_data.get('Data_Analiza_Salvare')),
+        'decision': decision_data.get('Decision_Type') or 'N/A',
+        'historic_conflict': bool(historic_conflict),
+        'markets': markets,
+    }
+
+
+class WeeklyRollup:
+    """
+    Agregatul unei (ligi, săptămâni):
+    1. ✅ Doar contoare și sume - add() e O(1) (O(market-uri)), fără re-scanarea arhivei
+    2. ✅ Frecvența și direcția Steam, KLD mediu per market, mixul de trap-uri (REAL/CONTRARION/AMBIGUOUS)
+    3. ✅ Rata conflictelor istorice și distribuția deciziilor
+    4. ✅ to_dict() / from_dict() pentru persistență (un document per ligă și săptămână); merge() între agregate
+    """
+
+    __slots__ = ('league', 'week', 'analyses', 'historic_conflicts', 'decisions', 'markets')
+
+    def __init__(self, league=None, week=None):
+        self.league = league
+        self.week = week
+        self.analyses = 0
+        self.historic_conflicts = 0
+        self.decisions = {}  # tip decizie -> analize
+        self.markets = {}    # market -> {'analyses', 'steam': {direcție: n}, 'kld_sum', 'kld_count', 'traps': {tip: n}}
+
+    @staticmethod
+    def _new_market():
+        return {'analyses': 0, 'steam': {}, 'kld_sum': 0.0, 'kld_count': 0, 'traps': {}}
+
+    def add(self, signals):
+        """Adaugă o analiză (rezultatul analysis_signals)."""
+        self.analyses += 1
+        self.historic_conflicts += int(signals['historic_conflict'])
+        self.decisions[signals['decision']] = self.decisions.get(signals['decision'], 0) + 1
+        for market, entry in signals['markets'].items():
+            stats = self.markets.setdefault(market, self._new_market())
+            stats['analyses'] += 1
+            if entry.get('steam'):
+                stats['steam'][entry['steam']] = stats['steam'].get(entry['steam'], 0) + 1
+            if entry.get('kld') is not None:
+                stats['kld_sum'] += float(entry['kld'])
+                stats['kld_count'] += 1
+            for trap_type in entry.get('traps', ()):
+                stats['traps'][trap_type] = stats['traps'].get(trap_type, 0) + 1
+        return self
+
+    def merge(self, other):
+        """Combină alt agregat (ex. aceeași săptămână din alt proces / altă sursă)."""
+        self.analyses += other.analyses
+        self.historic_conflicts += other.historic_conflicts
+        for decision, count in other.decisions.items():
+            self.decisions[decision] = self.decisions.get(decision, 0) + count
+        for market, theirs in other.markets.items():
+            stats = self.markets.setdefault(market, self._new_market())
+            stats['analyses'] += theirs['analyses']
+            stats['kld_sum'] += theirs['kld_sum']
+            stats['kld_count'] += theirs['kld_count']
+            for field in ('steam', 'traps'):
+                for key, count in theirs[field].items():
+                    stats[field][key] = stats[field].get(key, 0) + count
+        return self
+
+    def summary(self):
+        """Ratele și mediile săptămânii (pentru dashboard)."""
+        n = self.analyses
+        markets = {}
+        for market, stats in self.markets.items():
+            steam_total = sum(stats['steam'].values())
+            trap_total = sum(stats['traps'].values())
+            markets[market] = {
+                'analyses': stats['analyses'],
+                'steam_rate': steam_total / stats['analyses'] if stats['analyses'] else 0.0,
+                'steam_directions': {d: c / steam_total for d, c in stats['steam'].items()} if steam_total else {},
+                'mean_kld': stats['kld_sum'] / stats['kld_count'] if stats['kld_count'] else None,
+                'trap_mix': {t: stats['traps'].get(t, 0) / trap_total for t in TRAP_TYPES} if trap_total else {},
+                'traps': trap_total,
+            }
+        return {
+            'league': self.league,
+            'week': self.week,
+            'analyses': n,
+            'historic_conflict_rate': self.historic_conflicts / n if n else 0.0,
+            'decisions': {d: c / n for d, c in self.decisions.items()} if n else {},
+            'decision_counts': dict(self.decisions),
+            'markets': markets,
+        }
+
+    def to_dict(self):
+        return {
+            'League': self.league,
+            'Week': self.week,
+            'analyses': self.analyses,
+            'historic_conflicts': self.historic_conflicts,
+            'decisions': dict(self.decisions),
+            'markets': {market: {**stats, 'steam': dict(stats['steam']), 'traps': dict(stats['traps'])}
+                        for market, stats in self.markets.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data, league=None, week=None):
+        """Agregatul salvat (sau unul gol, dacă data e None)."""
+        data = data or {}
+        rollup = cls(data.get('League', league), data.get('Week', week))
+        rollup.analyses = int(data.get('analyses', 0))
+        rollup.historic_conflicts = int(data.get('historic_conflicts', 0))
+        rollup.decisions = {d: int(c) for d, c in (data.get('decisions') or {}).items()}
+        for market, stats in (data.get('markets') or {}).items():
+            rollup.markets[market] = {
+                'analyses': int(stats.get('analyses', 0)),
+                'steam': {d: int(c) for d, c in (stats.get('steam') or {}).items()},
+                'kld_sum': float(stats.get('kld_sum', 0.0)),
+                'kld_count': int(stats.get('kld_count', 0)),
+                'traps': {t: int(c) for t, c in (stats.get('traps') or {}).items()},
+            }
+        return rollup
+
+
+class RollupStore:
+    """Agregatele în memorie, indexate (ligă, săptămână)."""
+
+    def __init__(self):
+        self._rollups = {}
+        self.skipped = 0  # documente care nu au putut fi agregate la rebuild()
+
+    def record(self, decision_data):
+        """Actualizare O(1) cu o analiză nouă; întoarce agregatul atins."""
+        signals = analysis_signals(decision_data)
+        key = (signals['league'], signals['week'])
+        rollup = self._rollups.get(key)
+        if rollup is None:
+            rollup = self._rollups[key] = WeeklyRollup(*key)
+        return rollup.add(signals)
+
+    def put(self, rollup):
+        self._rollups[(rollup.league, rollup.week)] = rollup
+
+    def get(self, league, week):
+        return self._rollups.get((league, week))
+
+    def rollups(self):
+        return list(self._rollups.values())
+
+    def leagues(self):
+        return sorted({league for league, _ in self._rollups})
+
+    def weeks(self, league):
+        """Săptămânile unei ligi, cele mai recente primele."""
+        return sorted((week for lg, week in self._rollups if lg == league), reverse=True)
+
+    @classmethod
+    def rebuild(cls, documents):
+        """
+        Reconstruiește toate agregatele dintr-o arhivă de analize salvate (backfill, o singură trecere).
+        Documentele fără Market_Signals care nu pot fi re-analizate (versiune necunoscută, ladder-e
+        lipsă sau invalide, dată ilizibilă) sunt sărite și numărate în `skipped`.
+        """
+        store = cls()
+        for document in documents:
+            if not document.get('Decision_Type'):
+                continue
+            try:
+                store.record(document)
+            except (KeyError, TypeError, ValueError, ZeroDivisionError):
+                store.skipped += 1
+        return store
+
+
+# =============================================================================
+# PERSISTENȚĂ FIREBASE (UN DOCUMENT PER LIGĂ ȘI SĂPTĂMÂNĂ)
+# =============================================================================
+
+def _increments(values, increment):
+    """Contoarele unui agregat ca incremente Firestore (map-urile goale sunt omise, ca merge să nu le golească)."""
+    fields = {}
+    for name, value in values.items():
+        if isinstance(value, dict):
+            nested = _increments(value, increment)
+            if nested:
+                fields[name] = nested
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            fields[name] = increment(value)
+        else:
+            fields[name] = value
+    return fields
+
+
+def update_firestore_rollup(db, decision_data, collection=ROLLUP_COLLECTION):
+    """
+    Hook-ul de salvare: o singură scriere în documentul de agregat al (ligii, săptămânii) analizei, deci costul
+    e constant indiferent de mărimea arhivei. Contoarele sunt trimise ca incremente atomice (fără citire
+    + rescriere), așa că două salvări simultane în aceeași ligă și săptămână nu pierd nicio actualizare.
+    """
+    from firebase_admin import firestore
+
+    signals = analysis_signals(decision_data)
+    delta = WeeklyRollup(signals['league'], signals['week']).add(signals)
+    reference = db.collection(collection).document(rollup_id(signals['league'], signals['week']))
+    reference.set(_increments(delta.to_dict(), firestore.Increment), merge=True)
+    return delta
+
+
+def load_firestore_rollups(db, collection=ROLLUP_COLLECTION):
+    """Toate agregatele salvate (documente ligă × săptămână, nu analizele individuale)."""
+    store = RollupStore()
+    for document in db.collection(collection).stream():
+        store.put(WeeklyRollup.from_dict(document.to_dict()))
+    return store
+
+
+def rebuild_firestore_rollups(db, source='baschet', collection=ROLLUP_COLLECTION):
+    """
+    Backfill: recalculează agregatele din toată arhiva și le rescrie.
+    Întoarce (agregate scrise, analize sărite - fără semnale și imposibil de re-analizat).
+    """
+    store = RollupStore.rebuild(document.to_dict() for document in db.collection(source).stream())
+    rollups = store.rollups()
+    for rollup in rollups:
+        db.collection(collection).document(rollup_id(rollup.league, rollup.week)).set(rollup.to_dict())
+    return len(rollups), store.skipped